@@ -0,0 +1,237 @@
+"""
+Provides the AnimationScheduler class that animates the tile moves of every board.
+
+Classes:
+    - AnimationScheduler: Advances every running tile animation and solution playback in one timer tick.
+"""
+
+from collections import deque
+import math
+
+
+class _TileAnimation:
+    """
+    A tile sliding from one square to the next.
+
+    Attributes:
+        tile (Tile): The tile being moved.
+        total_x (float): The distance to move along the x-axis.
+        total_y (float): The distance to move along the y-axis.
+        total_frames (int): The number of frames the move takes.
+        frame (int): The number of frames already played.
+    """
+
+    def __init__(self, tile, total_x, total_y, total_frames):
+        self.tile = tile
+        self.total_x = total_x
+        self.total_y = total_y
+        self.total_frames = total_frames
+        self.frame = 0
+
+    def step(self):
+        """
+        Plays the next frame. Every frame moves the tile to the exact fraction of the distance it should be at,
+        so the tile always ends exactly on its square.
+
+        Returns:
+            bool: True if the animation is over.
+        """
+        prev_fraction = self.frame / self.total_frames
+        self.frame += 1
+        fraction = self.frame / self.total_frames
+        self.tile.move(self.total_x * (fraction - prev_fraction), self.total_y * (fraction - prev_fraction))
+        return self.frame >= self.total_frames
+
+    def finish(self):
+        """ Moves the tile straight to the end of the animation. """
+        fraction = 1 - self.frame / self.total_frames
+        self.frame = self.total_frames
+        self.tile.move(self.total_x * fraction, self.total_y * fraction)
+
+
+class _Playback:
+    """
+    A queue of moves played one after the other on a board.
+
+    Attributes:
+        moves (collections.deque): The moves that were not played yet.
+        play_move (function): Plays one move, it gets the move and the number of frames to animate it over.
+        frames_per_move (int): The number of frames each move is animated over.
+        moves_per_tick (int): The number of moves played at once when the playback is compressed.
+        animation (_TileAnimation): The animation of the last move that was played, if it is still running.
+    """
+
+    def __init__(self, moves, play_move, frames_per_move, moves_per_tick):
+        self.moves = deque(moves)
+        self.play_move = play_move
+        self.frames_per_move = frames_per_move
+        self.moves_per_tick = moves_per_tick
+        self.animation = None
+
+
+class AnimationScheduler:
+    """
+    Advances every running tile animation and solution playback in one timer tick.
+
+    A single Tk timer is running only while something is moving, each tick moves every active tile once
+    and never forces a synchronous redraw, Tk redraws the canvases once it is idle.
+    Long playbacks are sped up so they never last more than max_playback_frames frames:
+    first by using fewer frames per move and then by playing several moves per tick.
+
+    Attributes:
+        widget: Any Tk widget, used to schedule the timer.
+        frame_ms (int): The time between two frames in milliseconds.
+        default_total_frames (int): The number of frames a move is animated over.
+        max_playback_frames (int): The maximal number of frames a playback can last.
+        animations (list): The running animations of single moves.
+        playbacks (dict): The running playback of each board.
+        timer_id: The id of the scheduled tick, None while idle.
+    """
+
+    def __init__(self, widget, frame_ms=10, default_total_frames=10, max_playback_frames=1000):
+        """
+        Initializes an AnimationScheduler object.
+
+        Args:
+            widget: Any Tk widget, used to schedule the timer.
+            frame_ms (int): The time between two frames in milliseconds.
+            default_total_frames (int): The number of frames a move is animated over.
+            max_playback_frames (int): The maximal number of frames a playback can last.
+        """
+        self.widget = widget
+        self.frame_ms = frame_ms
+        self.default_total_frames = default_total_frames
+        self.max_playback_frames = max_playback_frames
+        self.animations = []
+        self.playbacks = {}
+        self.timer_id = None
+
+    def animate(self, tile, total_x, total_y, total_frames=None):
+        """
+        Starts sliding a tile.
+
+        Args:
+            tile (Tile): The tile to move.
+            total_x (float): The distance to move along the x-axis.
+            total_y (float): The distance to move along the y-axis.
+            total_frames (int): The number of frames the move takes, 0 moves the tile at once.
+
+        Returns:
+            _TileAnimation: The animation, or None if the tile was moved at once.
+        """
+        total_frames = self.default_total_frames if total_frames is None else total_frames
+        if total_frames <= 0:
+            tile.move(total_x, total_y)
+            return None
+
+        animation = _TileAnimation(tile, total_x, total_y, total_frames)
+        self.animations.append(animation)
+        self._schedule()
+        return animation
+
+    def play(self, board, moves, play_move):
+        """
+        Plays a sequence of moves on a board one after the other, replacing the board's running playback.
+
+        Args:
+            board: The board the moves are played on, used as the key of its playback.
+            moves (list): The moves to play.
+            play_move (function): Plays one move, it gets the move and the number of frames to animate it over
+                and returns the move's animation (or None).
+        """
+        moves = list(moves)
+        if not moves:
+            return
+
+        budget = max(1, self.max_playback_frames)
+        frames_per_move = max(1, min(self.default_total_frames, budget // len(moves)))
+        moves_per_tick = max(1, math.ceil(len(moves) / budget))
+        if moves_per_tick > 1:
+            # too many moves to animate each of them, so jump the tiles
+            frames_per_move = 0
+
+        self.playbacks[board] = _Playback(moves, play_move, frames_per_move, moves_per_tick)
+        self._schedule()
+
+    def queue(self, board, moves, play_move):
+        """
+        Adds moves to the end of a board's playback, or starts one. Used for moves that arrive one at a time,
+        every move is animated over the default number of frames.
+
+        Args:
+            board: The board the moves are played on, used as the key of its playback.
+            moves (list): The moves to play.
+            play_move (function): Plays one move, as for play. A running playback keeps its own.
+        """
+        playback = self.playbacks.get(board)
+        if playback is None:
+            playback = _Playback((), play_move, self.default_total_frames, 1)
+            self.playbacks[board] = playback
+        playback.moves.extend(moves)
+        self._schedule()
+
+    def cancel(self, board):
+        """
+        Stops the playback of a board. Tiles that are in the middle of a move finish it.
+
+        Args:
+            board: The board whose playback should stop.
+        """
+        self.playbacks.pop(board, None)
+
+    def finish_animations(self, tiles):
+        """
+        Lands the given tiles on their squares at once if they are in the middle of a move.
+
+        Args:
+            tiles (iterable of Tile): The tiles.
+        """
+        tiles = set(tiles)
+        running = []
+        for animation in self.animations:
+            if animation.tile in tiles:
+                animation.finish()
+            else:
+                running.append(animation)
+
+        self.animations = running
+
+    def is_playing(self, board):
+        """
+        Checks if a board has a running playback.
+
+        Args:
+            board: The board.
+
+        Returns:
+            bool: True if moves are still waiting to be played on the board.
+        """
+        return board in self.playbacks
+
+    def _schedule(self):
+        """ Schedules the next tick unless one is already scheduled. """
+        if self.timer_id is None:
+            self.timer_id = self.widget.after(self.frame_ms, self._tick)
+
+    def _tick(self):
+        """ Plays one frame of every running animation and starts the next moves of every playback. """
+        self.timer_id = None
+        self.animations = [animation for animation in self.animations if not animation.step()]
+
+        for board, playback in list(self.playbacks.items()):
+            if playback.animation is not None and playback.animation.frame < playback.animation.total_frames:
+                continue
+
+            for _ in range(playback.moves_per_tick):
+                if not playback.moves:
+                    break
+                playback.animation = playback.play_move(playback.moves.popleft(), playback.frames_per_move)
+
+            # a move can end the game and cancel the playback, so look it up again,
+            # and the playback stays until its last move landed so that moves queued meanwhile wait for it
+            landed = playback.animation is None or playback.animation.frame >= playback.animation.total_frames
+            if not playback.moves and landed and self.playbacks.get(board) is playback:
+                del self.playbacks[board]
+
+        if self.animations or self.playbacks:
+            self._schedule()
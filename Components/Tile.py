@@ -1,4 +1,10 @@
 LEFT_CLICK = "<Button-1>"
+# tag shared by the rectangles of all the tiles of a canvas, so they can be recolored with one call
+RECT_TAG = "tile_rect"
+ENABLED_FILL = "#3da9f9"
+DISABLED_FILL = "lightgray"
+# the fill of the tile a hint suggests moving
+HINT_FILL = "#f9c33d"
 
 
 class Tile:
@@ -19,6 +25,10 @@ class Tile:
         number (int): The number displayed on the tile.
         canvas_id (int): The ID of the tile's canvas object.
         text_id (int): The ID of the tile's text object.
+        tag (str): The canvas tag shared by the tile's canvas object and text object.
+        x1 (float): The x-coordinate of the top-left corner of the tile as drawn now.
+        y1 (float): The y-coordinate of the top-left corner of the tile as drawn now.
+        visible (bool): Indicates whether the tile's canvas objects are shown.
         row (int): The row index of the tile.
         col (int): The column index of the tile.
         size (int): The size of the tile.
@@ -32,6 +42,10 @@ class Tile:
         self.number = number
         self.canvas_id = None
         self.text_id = None
+        self.tag = f"tile{number}"
+        self.x1 = None
+        self.y1 = None
+        self.visible = False
         self.row = row
         self.col = col
         self.size = size
@@ -49,28 +63,61 @@ class Tile:
             y2 (int): The y-coordinate of the bottom-right corner of the tile.
 
         """
-        self.canvas_id = self.canvas.create_rectangle(x1, y1, x2, y2, fill="lightgray")
-        self.text_id = self.canvas.create_text((x1 + x2) / 2, (y1 + y2) / 2, text=self.number)
-        self.canvas.tag_bind(self.canvas_id, LEFT_CLICK, self.on_click)
-        self.canvas.tag_bind(self.text_id, LEFT_CLICK, self.on_click)
+        fill = ENABLED_FILL if self.enabled else DISABLED_FILL
+        self.canvas_id = self.canvas.create_rectangle(x1, y1, x2, y2, fill=fill, tags=(self.tag, RECT_TAG))
+        self.text_id = self.canvas.create_text((x1 + x2) / 2, (y1 + y2) / 2, text=self.number, tags=(self.tag,))
+        self.x1 = x1
+        self.y1 = y1
+        self.visible = True
+
+    def place(self, x1, y1):
+        """
+        Places the tile with its top-left corner at the given point, drawing it the first time.
+        Only the canvas calls needed to get there are made, a tile that is already in place costs none.
+
+        Args:
+            x1 (int): The x-coordinate of the top-left corner of the tile.
+            y1 (int): The y-coordinate of the top-left corner of the tile.
+
+        """
+        if self.canvas_id is None:
+            self.draw(x1, x1 + self.size, y1, y1 + self.size)
+            return
+
+        if not self.visible:
+            self.canvas.itemconfig(self.tag, state="normal")
+            self.visible = True
+
+        if x1 != self.x1 or y1 != self.y1:
+            self.move(x1 - self.x1, y1 - self.y1)
+
+    def hide(self):
+        """ Hides the tile's canvas objects while keeping them for later use. """
+        if self.visible:
+            self.canvas.itemconfig(self.tag, state="hidden")
+            self.visible = False
 
     def move(self, move_x, move_y):
         """
         Moves the tile on the canvas by the specified amount.
+        The canvas is not redrawn here, Tk redraws it once the event loop is idle.
 
         Args:
             move_x (int): The amount to move the tile in the x-direction.
             move_y (int): The amount to move the tile in the y-direction.
 
         """
-        self.canvas.move(self.canvas_id, move_x, move_y)
-        self.canvas.move(self.text_id, move_x, move_y)
-        self.canvas.update()
+        # the rectangle and the text share the tile's tag so one call moves both
+        self.canvas.move(self.tag, move_x, move_y)
+        self.x1 += move_x
+        self.y1 += move_y
 
     def clear(self):
         """ Clears the tile from the canvas. """
-        self.canvas.delete(self.canvas_id)
-        self.canvas.delete(self.text_id)
+        self.canvas.delete(self.tag)
+        self.canvas_id = None
+        self.text_id = None
+        self.visible = False
 
     def copy(self, dest_canvas, enabled=True):
         """
@@ -91,16 +138,16 @@ class Tile:
     def disable(self):
         """ Disables the tile. """
         self.enabled = False
-        self.canvas.itemconfig(self.canvas_id, fill="lightgray")
+        self.canvas.itemconfig(self.canvas_id, fill=DISABLED_FILL)
 
     def enable(self):
         """ Enables the tile. """
         self.enabled = True
-        self.canvas.itemconfig(self.canvas_id, fill="#3da9f9")
+        self.canvas.itemconfig(self.canvas_id, fill=ENABLED_FILL)
 
     def on_click(self, event):
         """
-        Handles the tile click event.
+        Handles the tile click event. The board hit-tests its clicks and forwards them here.
 
         Args:
             event: The event object.
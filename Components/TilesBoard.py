@@ -6,9 +6,11 @@ Classes:
 """
 
 import numpy as np
-from Components.Tile import Tile
+from Components.Tile import Tile, LEFT_CLICK, RECT_TAG, ENABLED_FILL, DISABLED_FILL, HINT_FILL
 import tkinter as tk
-import random
+# the pure board functions live with the solver so the solver process does not need to import tkinter,
+# they are re-exported here for the GUI
+from Solver.TilesBoardCore import generate_num_board, generate_goal_state, make_random_moves, find_possible_moves
 
 
 class TilesBoard(tk.Canvas):
@@ -19,14 +21,19 @@ class TilesBoard(tk.Canvas):
         name (str): The name of the board.
         enabled (bool): Indicates whether the board is enabled.
         check_solved (function): A function to check if the game is solved.
-        board (numpy.ndarray): A numpy array representing the board.
+        board (numpy.ndarray): A numpy array of the Tile objects of the board, a view over num_board.
+        num_board (numpy.ndarray): An int8 numpy array of the tile values, the board's source of truth.
+        misplaced (int): The number of squares whose tile is not its goal tile, 0 when the board is solved.
         zero_tile (Tile): The tile representing the empty space.
         btn_size (int): The size of each tile.
-        default_total_frames (int): The default number of frames for animation.
-        distance_per_frame (float): The distance to move per frame for animation.
+        board_start (float): The x-coordinate of the left edge of the board on the canvas.
+        tiles_pool (dict): The Tile objects of every number ever shown, kept with their canvas objects
+            so a new board only moves, shows or hides existing objects.
+        animation_scheduler (AnimationScheduler): The scheduler that animates the tile moves.
+        hint_tile (Tile): The tile highlighted by the last hint, None if no hint is shown.
     """
 
-    def __init__(self, parent, name, enabled, check_solved):
+    def __init__(self, parent, name, enabled, check_solved, animation_scheduler):
         """
         Initializes a TilesBoard object.
 
@@ -35,6 +42,7 @@ class TilesBoard(tk.Canvas):
             name (str): The name of the board.
             enabled (bool): Indicates whether the board is enabled.
             check_solved (function): A function to check if the game is solved.
+            animation_scheduler (AnimationScheduler): The scheduler that animates the tile moves.
         """
         super().__init__(parent, width=400, height=400, bg="white")
         self.parent = parent
@@ -42,11 +50,17 @@ class TilesBoard(tk.Canvas):
         self.board_id = None
         self.check_solved = check_solved
         self.board = np.array([])
+        self.num_board = np.array([], dtype=np.int8)
+        self.misplaced = 0
         self.enabled = enabled
         self.zero_tile = None
         self.btn_size = 40
-        self.default_total_frames = 10
-        self.distance_per_frame = self.btn_size / self.default_total_frames
+        self.board_start = 0
+        self.tiles_pool = {}
+        self.animation_scheduler = animation_scheduler
+        self.hint_tile = None
+        # one click handler for the whole board, the clicked tile is found from the click's position
+        self.bind(LEFT_CLICK, self.on_click)
 
     def copy_board(self, original_tiles_board):
         """
@@ -55,29 +69,31 @@ class TilesBoard(tk.Canvas):
         Args:
             original_tiles_board (TilesBoard): The original TilesBoard object to copy from.
         """
-        original_board = original_tiles_board.board
-        new_board = np.empty_like(original_board)
-
-        for i, row in enumerate(original_board):
-            for j, tile in enumerate(row):
-                new_board[i, j] = tile.copy(self, self.enabled)
-                if tile.number == 0:
-                    self.zero_tile = new_board[i, j]
-
-        self.board = new_board
+        self.board = self.num_board_to_tiles(original_tiles_board.num_board)
+        self.set_num_board(original_tiles_board.num_board)
         self.board_id = original_tiles_board.board_id
 
     def enable(self):
         """ Enables the board. """
-        for row in self.board:
-            for tile in row:
-                tile.enable()
+        self.set_tiles_enabled(True)
 
     def disable(self):
         """ Disables the board. """
+        self.set_tiles_enabled(False)
+
+    def set_tiles_enabled(self, enabled):
+        """
+        Enables or disables every tile of the board, recoloring all of them with a single canvas call.
+
+        Args:
+            enabled (bool): True to enable the tiles and False to disable them.
+        """
         for row in self.board:
             for tile in row:
-                tile.disable()
+                tile.enabled = enabled
+
+        self.hint_tile = None
+        self.itemconfig(RECT_TAG, fill=ENABLED_FILL if enabled else DISABLED_FILL)
 
     def create_board(self, board_size):
         """
@@ -88,12 +104,15 @@ class TilesBoard(tk.Canvas):
         """
         num_board = generate_num_board(board_size)
         self.board = self.num_board_to_tiles(num_board)
+        self.set_num_board(num_board)
         self.board_id = np.array2string(num_board)
         self.place_board()
 
     def num_board_to_tiles(self, num_board):
         """
         Converts an integer board to a board with tile objects.
+        Tiles are taken from the pool and only created for numbers that were never shown on this board,
+        pooled tiles whose numbers are not on the new board are hidden.
 
         Args:
             num_board (numpy.ndarray): The integer representation of the game board.
@@ -101,58 +120,111 @@ class TilesBoard(tk.Canvas):
         Returns:
             numpy.ndarray: A board with tile objects.
         """
-        tiles_board = np.empty_like(num_board, dtype=object)
+        tiles_board = np.empty(np.shape(num_board), dtype=object)
 
         for row_index, row in enumerate(num_board):
 
             for col, num in enumerate(row):
-
-                tileBtn = Tile(self, self.btn_size, num, row_index, col, self.enabled, self.game_move)
+                num = int(num)
+                tileBtn = self.tiles_pool.get(num)
+                if tileBtn is None:
+                    tileBtn = Tile(self, self.btn_size, num, row_index, col, self.enabled, self.game_move)
+                    self.tiles_pool[num] = tileBtn
+
+                tileBtn.row = row_index
+                tileBtn.col = col
+                tileBtn.enabled = self.enabled
                 tiles_board[row_index, col] = tileBtn
 
                 if num == 0:
                     self.zero_tile = tileBtn
 
+        tiles_count = tiles_board.size
+        for num, tile in self.tiles_pool.items():
+            if num >= tiles_count:
+                tile.hide()
+
         return tiles_board
 
+    def set_num_board(self, num_board):
+        """
+        Sets the integer representation of the board and counts its misplaced tiles.
+
+        Args:
+            num_board (numpy.ndarray): The integer representation of the game board.
+        """
+        self.num_board = np.array(num_board, dtype=np.int8)
+        goal = np.arange(self.num_board.size).reshape(self.num_board.shape)
+        self.misplaced = int(np.count_nonzero(self.num_board != goal))
+
     def get_num_board(self):
         """
          Retrieves the integer representation of the current game board.
 
          Returns:
-             numpy.ndarray: The integer representation of the game board.
+             numpy.ndarray: A copy of the int8 representation of the game board.
          """
-        num_board = np.empty_like(self.board)
+        return self.num_board.copy()
+
+    def is_solved(self):
+        """
+        Checks if every tile is in its goal position.
 
-        for i, row in enumerate(self.board):
+        Returns:
+            bool: True if the board is solved, False otherwise.
+        """
+        return self.misplaced == 0
 
-            for j, tile in enumerate(row):
-                num_board[i, j] = tile.number
+    def _is_misplaced(self, row, col):
+        """
+        Checks if the tile on a square is not the square's goal tile.
 
-        return num_board
+        :param row: The row of the square.
+        :param col: The column of the square.
+        :return: 1 if the tile is misplaced and 0 otherwise.
+        """
+        return int(self.num_board[row, col] != row * len(self.num_board) + col)
 
     def place_board(self):
         """
         Places the tiles of the board on the canvas.
 
         This method calculates the position of each tile on the canvas based on its row and column,
-        then draws each tile on the canvas accordingly.
+        then places each tile on the canvas accordingly, tiles that are already in place are not touched.
 
         """
-        tile_size = self.board[0, 0].size
-        board_start = (self.winfo_width() - (self.board.shape[0] * tile_size)) / 2
+        tile_size = self.btn_size
+        self.board_start = (self.winfo_width() - (self.board.shape[0] * tile_size)) / 2
+        self.hint_tile = None
+        self.itemconfig(RECT_TAG, fill=ENABLED_FILL if self.enabled else DISABLED_FILL)
 
         for row in self.board:
             for tile in row:
 
                 if tile.number != 0:
-                    x1 = board_start + (tile.col * tile_size)
+                    x1 = self.board_start + (tile.col * tile_size)
                     y1 = tile.row * tile_size
-                    x2 = x1 + tile_size
-                    y2 = y1 + tile_size
-                    tile.draw(x1, x2, y1, y2)
+                    tile.place(x1, y1)
+
+    def on_click(self, event):
+        """
+        Handles a click on the board by forwarding it to the tile under the click.
 
-    def game_move(self, tile):
+        Args:
+            event: The event object.
+        """
+        if self.board is None or self.board.size == 0:
+            return
+
+        col = int((event.x - self.board_start) // self.btn_size)
+        row = int(event.y // self.btn_size)
+        board_size = self.board.shape[0]
+        if 0 <= row < board_size and 0 <= col < board_size:
+            tile = self.board[row, col]
+            if tile is not self.zero_tile:
+                tile.on_click(event)
+
+    def game_move(self, tile, total_frames=None):
         """
         Plays a move in the game.
 
@@ -161,6 +233,8 @@ class TilesBoard(tk.Canvas):
         if the puzzle is solved after the move.
 
         :param tile: The tile to be moved.
+        :param total_frames: The number of frames to animate the move over, None for the scheduler's default.
+        :return: The animation of the move, or None if the tile could not be moved or was moved at once.
         """
         row = tile.row
         col = tile.col
@@ -170,7 +244,8 @@ class TilesBoard(tk.Canvas):
         col_diff = zero_col - col
 
         if abs(row_diff) + abs(col_diff) == 1:
-            self.animate_move(tile, col_diff, row_diff, self.default_total_frames)
+            self.clear_hint()
+            animation = self.animate_move(tile, col_diff, row_diff, total_frames)
 
             # update tile position
             tile.row = zero_row
@@ -183,33 +258,76 @@ class TilesBoard(tk.Canvas):
             self.board[row, col] = self.zero_tile
             self.board[zero_row, zero_col] = tile
 
+            # update the integer board and the misplaced count with only the two squares that changed
+            self.misplaced -= self._is_misplaced(row, col) + self._is_misplaced(zero_row, zero_col)
+            self.num_board[zero_row, zero_col] = self.num_board[row, col]
+            self.num_board[row, col] = 0
+            self.misplaced += self._is_misplaced(row, col) + self._is_misplaced(zero_row, zero_col)
+
             # After moving the tile, check if the puzzle is solved
             self.check_solved(self)
+            return animation
+
+        return None
+
+    def show_hint(self, number):
+        """
+        Highlights the tile a hint suggests moving, replacing the previous hint.
+
+        :param number: The value of the tile.
+        """
+        self.clear_hint()
+        tile = self.tiles_pool.get(number)
+        if tile is not None and tile.visible and tile is not self.zero_tile:
+            self.itemconfig(tile.canvas_id, fill=HINT_FILL)
+            self.hint_tile = tile
+
+    def clear_hint(self):
+        """ Removes the highlight of the last hint. """
+        if self.hint_tile is not None:
+            self.itemconfig(self.hint_tile.canvas_id, fill=ENABLED_FILL if self.hint_tile.enabled else DISABLED_FILL)
+            self.hint_tile = None
+
+    def play_moves(self, moves):
+        """
+        Plays a sequence of moves one after the other, long sequences are played faster.
+
+        :param moves: The values of the tiles to move, in order.
+        """
+        num_to_tiles = self.num_to_tiles_mapping()
+        self.animation_scheduler.play(self, moves,
+                                      lambda num, total_frames: self.game_move(num_to_tiles[num], total_frames))
+
+    def queue_moves(self, moves):
+        """
+        Plays moves after the ones that are still playing, for moves that arrive one at a time.
+
+        :param moves: The values of the tiles to move, in order.
+        """
+        num_to_tiles = self.num_to_tiles_mapping()
+        self.animation_scheduler.queue(self, moves,
+                                       lambda num, total_frames: self.game_move(num_to_tiles[num], total_frames))
+
+    def stop_moves(self):
+        """ Stops playing the moves given to play_moves and lands every moving tile on its square. """
+        self.animation_scheduler.cancel(self)
+        self.animation_scheduler.finish_animations(self.tiles_pool.values())
 
-    def animate_move(self, tile, x_direction, y_direction, total_frames):
+    def animate_move(self, tile, x_direction, y_direction, total_frames=None):
         """
         Animates the movement of a tile.
 
-        This method animates the movement of a tile by incrementally moving it in the specified direction
-        over a series of frames.
+        This method hands the move to the animation scheduler, which moves the tile a little on every frame
+        together with every other moving tile.
 
         :param tile: The tile to be moved.
         :param x_direction: The direction of movement along the x-axis (-1 for left, 1 for right).
         :param y_direction: The direction of movement along the y-axis (-1 for up, 1 for down).
-        :param total_frames: The total number of frames for the animation.
+        :param total_frames: The total number of frames for the animation, None for the scheduler's default.
+        :return: The animation, or None if the tile was moved at once.
         """
-        if total_frames > 0:
-            move_x = self.distance_per_frame * x_direction
-            move_y = self.distance_per_frame * y_direction
-
-            # Move the tile by the calculated amount
-            tile.move(move_x, move_y)
-
-            # Schedule the next frame of animation
-            self.after(10,
-                       lambda TILE=tile, X_DIRECTION=x_direction, Y_DIRECTION=y_direction,
-                              TOTAL_FRAMES=total_frames - 1
-                       : self.animate_move(TILE, X_DIRECTION, Y_DIRECTION, TOTAL_FRAMES))
+        return self.animation_scheduler.animate(tile, self.btn_size * x_direction, self.btn_size * y_direction,
+                                                total_frames)
 
     def num_to_tiles_mapping(self):
         """
@@ -232,113 +350,16 @@ class TilesBoard(tk.Canvas):
         Clears the game board.
 
         This method clears the game board by removing all tile objects from the canvas and resetting the board attribute
-        to None.
+        to None. Resetting a board does not need this, create_board and copy_board reuse the existing objects.
 
         """
-        for row in self.board:
-            for tile in row:
-                tile.clear()
-
-        self.board = None
-
-
-def generate_num_board(board_size):
-    """
-    Generates a random yet solvable game board.
-
-    This function generates a random game board of the specified size while ensuring that
-     the generated board is solvable.
-
-    Args:
-        board_size (int): The size of the game board (e.g., 3 for a 3x3 board).
-
-    Returns:
-        numpy.ndarray: A randomly generated yet solvable game board represented as a numpy array.
-
-    """
-    num_board = generate_goal_state(board_size)
-    # make board random yet solvable by playing 100 random moves
-    make_random_moves(num_board, board_size, 0, 0)
-    return num_board
-
-
-def generate_goal_state(board_size):
-    """
-    Generates the goal state of the game board.
-
-    This function generates the goal state of the game board,
-     which is a board with tiles arranged in ascending order
-    starting from 0.
+        self.stop_moves()
+        for tile in self.tiles_pool.values():
+            tile.clear()
 
-    Args:
-        board_size (int): The size of the game board (e.g., 3 for a 3x3 board).
+        self.tiles_pool = {}
+        self.hint_tile = None
 
-    Returns:
-        numpy.ndarray: The goal state of the game board represented as a numpy array.
-
-    """
-    return np.arange(board_size * board_size).reshape((board_size, board_size))
-
-
-def make_random_moves(board, board_size, zero_row, zero_col):
-    """
-    Makes random moves on the game board.
-
-    This function makes random moves on the game board by swapping tiles to increase
-     randomness while keeping the board solvable.
-
-    Args:
-        board (numpy.ndarray): The game board represented as a numpy array.
-        board_size (int): The size of the game board (e.g., 3 for a 3x3 board).
-        zero_row (int): The row index of the empty tile (0) on the game board.
-        zero_col (int): The column index of the empty tile (0) on the game board.
-
-    """
-    for _ in range(100):
-        possible_moves = find_possible_moves(board_size, zero_row, zero_col)
-        random_move = random.choice(possible_moves)
-        # swap tiles
-        row = random_move[0]
-        col = random_move[1]
-        num = board[row, col]
-        board[zero_row, zero_col] = num
-        board[row, col] = 0
-        zero_row = row
-        zero_col = col
-
-
-def find_possible_moves(board_size, zeroRow, zeroCol):
-    """
-    Generates a list of possible moves in a square game board.
-
-    This function creates a list of possible moves in a square game board based on the current location of the empty
-    space marked as 0. The location of the empty space is given by zeroRow and zeroCol.
-
-    Args:
-        board_size (int): The size of the game board (e.g., 3 for a 3x3 board).
-        zeroRow (int): The row index of the empty tile (0) on the game board.
-        zeroCol (int): The column index of the empty tile (0) on the game board.
-
-    Returns:
-        list of tuple: A list of tuples, where each tuple represents
-         a position of a tile on the board that can be moved.
-
-    """
-    possibleMoves = []
-    if zeroRow != 0:
-        # move zero up
-        possibleMoves.append((zeroRow - 1, zeroCol))
-
-    if zeroRow != board_size - 1:
-        # move zero down
-        possibleMoves.append((zeroRow + 1, zeroCol))
-
-    if zeroCol != 0:
-        # move zero left
-        possibleMoves.append((zeroRow, zeroCol - 1))
-
-    if zeroCol != board_size - 1:
-        # move zero right
-        possibleMoves.append((zeroRow, zeroCol + 1))
-
-    return possibleMoves
+        self.board = None
+        self.num_board = np.array([], dtype=np.int8)
+        self.misplaced = 0
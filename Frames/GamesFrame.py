@@ -6,11 +6,18 @@ Classes:
 """
 
 import tkinter as tk
-import queue
 import ttkbootstrap as ttb
 from ttkbootstrap.constants import *
-from Solver.TilesSolverMsgs import TilesSolverTask
+from Solver.RealTimeSearch import REALTIME_ALGO
+from Solver.TilesSolverMsgs import TilesSolverTask, TilesSolverHintRequest, TilesSolverHint, TilesSolverMove
+from Solver.TilesSolverProtocol import encode_task, encode_hint_request
 from Components.TilesBoard import TilesBoard
+from Components.AnimationScheduler import AnimationScheduler
+
+# the largest board the optimal search algorithms are used for
+MAX_SEARCH_BOARD_SIZE = 3
+# the algorithm used for larger boards, it is fast but its solutions are not optimal
+LARGE_BOARD_ALGO = "Constructive"
 
 
 class GamesFrame(tk.Frame):
@@ -28,6 +35,10 @@ class GamesFrame(tk.Frame):
         pad_x: Padding in the x-direction.
         reset_btn: A button for resetting the game.
         start_btn: A button for starting the game.
+        show_hints: A variable that is True while the next move of the user's board is highlighted.
+        hinted_board: The bytes of the user's board the last hint was requested for.
+        streamed_moves: The number of moves of the real-time opponent played before its solution arrived.
+        animation_scheduler: The scheduler animating the tile moves of both boards.
         user_board: The user's game board.
         computer_board: The computer's game board.
     """
@@ -58,9 +69,13 @@ class GamesFrame(tk.Frame):
 
         self.reset_btn = None
         self.start_btn = None
+        self.show_hints = tk.BooleanVar(value=False)
+        self.hinted_board = None
+        self.streamed_moves = 0
 
-        self.user_board = TilesBoard(self, "user", False, self.check_solved)
-        self.computer_board = TilesBoard(self, "computer", False, self.check_solved)
+        self.animation_scheduler = AnimationScheduler(self)
+        self.user_board = TilesBoard(self, "user", False, self.check_solved, self.animation_scheduler)
+        self.computer_board = TilesBoard(self, "computer", False, self.check_solved, self.animation_scheduler)
         self.create_layout()
 
     def create_layout(self):
@@ -75,9 +90,13 @@ class GamesFrame(tk.Frame):
         self.start_btn = ttb.Button(button_frame, text="start", command=self.start,
                                     padding=(self.pad_x, self.pad_y), bootstyle=SUCCESS)
 
+        hints_btn = ttb.Checkbutton(button_frame, text="hints", variable=self.show_hints, command=self.toggle_hints,
+                                    bootstyle="round-toggle")
+
         # Pack the buttons side by side in the button frame
         self.start_btn.pack(side=tk.LEFT, padx=self.pad_x)
         self.reset_btn.pack(side=tk.LEFT, padx=self.pad_x)
+        hints_btn.pack(side=tk.LEFT, padx=self.pad_x)
 
         ttb.Label(self, text="User", font=("Helvetica", 24)).pack(pady=self.pad_y)
         self.user_board.pack(fill="both", expand=1)
@@ -90,15 +109,61 @@ class GamesFrame(tk.Frame):
         Processes incoming messages.
 
         Args:
-            solution_msg: The message containing the solution.
+            solution_msg: The message containing the solution, a hint or a move of the real-time opponent.
+        """
+        if isinstance(solution_msg, TilesSolverHint):
+            self.show_hint(solution_msg)
+            return
+
+        if self.user_board.board_id != solution_msg.board_id or not self.playing:
+            return
+
+        if isinstance(solution_msg, TilesSolverMove):
+            # the real-time opponent plays every move as soon as it thought about it
+            self.computer_board.queue_moves([solution_msg.move])
+            self.streamed_moves += 1
+        elif solution_msg.solution and self.streamed_moves:
+            # the solution of the real-time opponent holds the moves already streamed too
+            self.computer_board.queue_moves(solution_msg.solution[self.streamed_moves:])
+        elif solution_msg.solution:
+            # play the moves one after the other so that it won't look like the computer is cheating
+            self.computer_board.play_moves(solution_msg.solution)
+
+    def toggle_hints(self):
+        """
+        Shows or hides the hint of the user's board.
+        """
+        if self.show_hints.get():
+            self.request_hint()
+        else:
+            self.hinted_board = None
+            self.user_board.clear_hint()
+
+    def request_hint(self):
+        """
+        Asks the solver for the next move of the user's board, if hints are shown and the user is playing.
+        """
+        if not (self.show_hints.get() and self.playing):
+            return
+
+        num_board = self.user_board.get_num_board()
+        self.hinted_board = num_board.tobytes()
+        self.gui_to_solver_queue.put(encode_hint_request(TilesSolverHintRequest(num_board,
+                                                                                self.user_board.board_id)))
+
+    def show_hint(self, hint):
+        """
+        Highlights the hinted tile, unless the user moved since the hint was requested.
+
+        Args:
+            hint (TilesSolverHint): The hint.
         """
-        if self.user_board.board_id == solution_msg.board_id and self.playing:
-            num_to_tiles = self.computer_board.num_to_tiles_mapping()
+        if (not self.show_hints.get() or not self.playing or hint.board_id != self.user_board.board_id
+                or self.hinted_board != self.user_board.num_board.tobytes()):
+            return
 
-            for i, num in enumerate(solution_msg.solution):
-                # insert events to main event loop to move the tiles so that it won't look like
-                # the computer is cheating
-                self.after(i * 100, lambda tile=num_to_tiles[num]: self.computer_board.game_move(tile))
+        if hint.move is not None:
+            self.user_board.show_hint(hint.move)
 
     def reset_game(self):
         """
@@ -110,10 +175,10 @@ class GamesFrame(tk.Frame):
             self.playing = False
         # enable start button
         self.start_btn.config(state="normal")
-        # remove old boards from GUI
-        self.computer_board.clear_board()
-        self.user_board.clear_board()
-        # create and place new Boards
+        # stop playing the old solution and land the moving tiles
+        self.computer_board.stop_moves()
+        self.user_board.stop_moves()
+        # create and place new Boards, reusing the canvas objects of the old ones
         self.user_board.create_board(self.board_size)
         self.computer_board.copy_board(self.user_board)
         self.computer_board.place_board()
@@ -125,23 +190,33 @@ class GamesFrame(tk.Frame):
         # disable start button
         self.start_btn.config(state="disabled")
         self.playing = True
-        # remove other boards to solve from the queue if they exist
-        self.clear_queue()
+        self.streamed_moves = 0
+        # the solver's scheduler drops the tasks of older games still waiting, so the queue is not cleared here
         self.user_board.enable()
         self.computer_play()
+        self.request_hint()
 
     def computer_play(self):
         """
         Handles computer's play.
         """
-        # the search space for a 4x4 board is too big for my computer and may crash it,
-        # so it has been limited for only user players
-        if self.board_size <= 3:
-            task = TilesSolverTask(self.get_options("algo"),
+        algo_name = self.get_options("algo")
+        if algo_name == REALTIME_ALGO:
+            # the real-time opponent thinks for a bounded time per move, so it plays boards of any size
+            task = TilesSolverTask(algo_name,
+                                   self.computer_board.get_num_board(),
+                                   self.computer_board.board_id,
+                                   move_time=self.get_options("move_time") / 1000)
+        else:
+            # the search space for a 4x4 board is too big for my computer and may crash it,
+            # so larger boards are solved by the constructive solver
+            if self.board_size > MAX_SEARCH_BOARD_SIZE:
+                algo_name = LARGE_BOARD_ALGO
+            task = TilesSolverTask(algo_name,
                                    self.computer_board.get_num_board(),
                                    self.computer_board.board_id)
 
-            self.gui_to_solver_queue.put(task)
+        self.gui_to_solver_queue.put(encode_task(task))
 
     def stop_game(self, winning_board):
         """
@@ -153,6 +228,7 @@ class GamesFrame(tk.Frame):
         if winning_board == self.user_board:
             # stop computer if user has won
             self.tiles_solver_interrupt_event.set()
+            self.computer_board.stop_moves()
 
         if self.playing:
             self.playing = False
@@ -169,22 +245,13 @@ class GamesFrame(tk.Frame):
         Returns:
             bool: True if the game is solved, False otherwise.
         """
-        # Check if all tiles are in their correct positions
-        board = tiles_board.board
-        board_size = len(board)
-        for i, row in enumerate(board):
-            for j, tile in enumerate(row):
-                if int(tile.number) != (i * board_size) + j:
-                    return False
+        # the board keeps count of its misplaced tiles as they move
+        if not tiles_board.is_solved():
+            if tiles_board is self.user_board:
+                # the user moved, so the last hint is outdated
+                self.request_hint()
+            return False
 
         self.stop_game(tiles_board)
         # tiles_board.disable()
         return True
-
-    def clear_queue(self):
-        """ Clears the solver queue. """
-        try:
-            while not self.gui_to_solver_queue.empty():
-                self.gui_to_solver_queue.get()
-        except queue.Empty:
-            pass
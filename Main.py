@@ -3,9 +3,16 @@ Main file for the sliding tiles game solver application.
 
 This script initializes and starts the MultiprocessingClient, which serves as the main GUI window
 for the tile game solver application.
+
+Usage:
+    python Main.py
+    python Main.py --server /tmp/tiles_solver.sock   (use a running Solver.TilesSolverServer)
+    python Main.py --metrics-port 9108               (serve the solver's metrics at http://127.0.0.1:9108/metrics)
+    python Main.py --learned-file learned.npz        (keep the real-time opponent's learned heuristic there)
+    python Main.py --checkpoint-dir checkpoints      (resume interrupted searches, also after a restart)
 """
 
-from Multiprocessing.MultiprocessingClient import MultiprocessingClient
+import argparse
 
 
 def main():
@@ -13,7 +20,26 @@ def main():
     Creates an instance of MultiprocessingClient with specified title and theme,
     then starts the main event loop.
     """
-    client = MultiprocessingClient(title="Tile game solver", theme_name="superhero")
+    parser = argparse.ArgumentParser(description="Tile game solver")
+    parser.add_argument("--server", default=None,
+                        help="Address of a running solver server, a Unix socket path or host:port")
+    parser.add_argument("--metrics-file", default=None,
+                        help="File the solver process rewrites its Prometheus metrics to every few seconds")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Localhost port the solver process serves its Prometheus metrics on")
+    parser.add_argument("--learned-file", default=None,
+                        help="File the real-time opponent keeps its learned heuristic in between runs")
+    parser.add_argument("--checkpoint-dir", default=None,
+                        help="Directory the solver saves interrupted searches to, to resume them after a restart")
+    args = parser.parse_args()
+
+    # imported here and not at module level because the spawned solver process re-imports this module,
+    # and it should not load the GUI
+    from Multiprocessing.MultiprocessingClient import MultiprocessingClient
+
+    client = MultiprocessingClient(title="Tile game solver", theme_name="superhero", server_address=args.server,
+                                   metrics_file=args.metrics_file, metrics_port=args.metrics_port,
+                                   learned_file=args.learned_file, checkpoint_dir=args.checkpoint_dir)
     client.mainloop()
 
 
@@ -2,13 +2,17 @@
 This class serves as the main controller for the GUI and communication between
 the GUI and the solver process.
 It initializes the GUI window, the solver process
-and manages periodic calls to update the GUI.
+and wakes the GUI up when the solver sends a message.
 
 """
 
 from UI.Window import Window
-import multiprocessing
-from Solver.TilesSolver import TilesSolver
+from Solver.TilesSolverProcess import get_solver_context, start_tiles_solver_process, stop_tiles_solver_process
+from Solver.TilesSolverClient import TilesSolverClient
+from Solver.SolverChannel import SolverChannel
+
+# how often the GUI checks for messages when Tk cannot watch the solver channel's file descriptor
+FALLBACK_POLL_MS = 50
 
 
 class MultiprocessingClient(object):
@@ -16,53 +20,94 @@ class MultiprocessingClient(object):
     MultiprocessingClient class manages the GUI and solver process communication.
 
     Attributes:
-    - solver_to_gui_queue: A multiprocessing.Queue for messages from the solver process to the GUI.
+    - solver_to_gui_queue: A SolverChannel for messages from the solver process to the GUI.
     - process_interrupt_event: A multiprocessing.Event to interrupt the solver process.
     - window: An instance of the Window class representing the GUI window.
-    - tilesSolver: An instance of the TilesSolver class for solving the tiles puzzle.
+    - tiles_solver_process: The multiprocessing.Process solving the tiles puzzle, None when using a server.
+    - solver_client: The TilesSolverClient connected to a shared solver server, None when using a local process.
     """
 
-    def __init__(self, title, theme_name):
+    def __init__(self, title, theme_name, server_address=None, metrics_file=None, metrics_port=None,
+                 learned_file=None, checkpoint_dir=None):
         """
         Initializes the MultiprocessingClient.
 
         Args:
         - title: A string representing the title of the GUI window.
         - theme_name: A string representing a ttkbootstrap theme for the GUI.
+        - server_address: The address of a running TilesSolverServer to use instead of a private solver process,
+          a Unix domain socket path or a "host:port" string.
+        - metrics_file: If given, the private solver process rewrites its metrics to this file every few seconds.
+        - metrics_port: If given, the private solver process serves its metrics on this localhost port.
+        - learned_file: The file the private solver process keeps the heuristic learned by the real-time search in.
+        - checkpoint_dir: If given, the private solver process saves interrupted searches there to resume them.
 
         Initializes communication queues, sets up the GUI window and solver process,
-        and starts the periodic call so that the GUI will check for messages from the solver process.
+        and makes the GUI handle messages from the solver process as soon as they arrive.
         """
 
-        # Set up objects for multiprocess communication
-        gui_to_solver_queue = multiprocessing.Queue()
-        self.solver_to_gui_queue = multiprocessing.Queue()
-        self.process_interrupt_event = multiprocessing.Event()
+        self.tiles_solver_process = None
+        self.solver_client = None
+
+        if server_address is not None:
+            # the shared server's client provides the same queue and event interface as a private process
+            self.solver_client = TilesSolverClient(server_address)
+            gui_to_solver_queue = self.solver_client.task_queue
+            self.solver_to_gui_queue = self.solver_client.solutions
+            self.process_interrupt_event = self.solver_client.interrupt_event
+        else:
+            # Set up objects for multiprocess communication, they must come from the same context
+            # the solver process is started with
+            context = get_solver_context()
+            gui_to_solver_queue = context.Queue()
+            self.solver_to_gui_queue = SolverChannel()
+            self.process_interrupt_event = context.Event()
 
-        # Set up the GUI part
-        self.window = Window(gui_to_solver_queue, self.solver_to_gui_queue, self.process_interrupt_event, title,
-                             theme_name)
-        self.tilesSolver = TilesSolver(self.process_interrupt_event, gui_to_solver_queue, self.solver_to_gui_queue)
+            # Start process for solving tiles, the solver is created inside the child process
+            # so no GUI state is pickled into it
+            self.tiles_solver_process = start_tiles_solver_process(context, self.process_interrupt_event,
+                                                                   gui_to_solver_queue, self.solver_to_gui_queue,
+                                                                   metrics_file, metrics_port, learned_file,
+                                                                   checkpoint_dir)
 
-        # Start process for solving tiles
-        tiles_solver_process = multiprocessing.Process(target=self.tilesSolver.solve_tiles)
-        tiles_solver_process.daemon = True
-        tiles_solver_process.start()
+        # Set up the GUI part, the solver process is not daemonic and would keep the interpreter from exiting
+        try:
+            self.window = Window(gui_to_solver_queue, self.solver_to_gui_queue, self.process_interrupt_event, title,
+                                 theme_name)
+        except BaseException:
+            self.close()
+            raise
 
-        # Start the periodic call in the GUI to check the queue
-        self.periodic_call()
+        # Wake the GUI up when the solver channel becomes readable, and poll only where Tk cannot watch it
+        if not self.window.watch_solver_channel():
+            self.periodic_call()
 
     def mainloop(self):
         """
-        Starts the main event loop of the GUI window.
+        Starts the main event loop of the GUI window and stops the solver process once the window is closed.
+        """
+        try:
+            self.window.mainloop()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Stops the private solver process or closes the connection to the shared server.
         """
-        self.window.mainloop()
+        if self.tiles_solver_process is not None:
+            stop_tiles_solver_process(self.tiles_solver_process)
+            self.tiles_solver_process = None
+        if self.solver_client is not None:
+            self.solver_client.close()
+            self.solver_client = None
 
     def periodic_call(self):
         """
         Periodically tells the GUI to check for messages from the solver process.
+        Only used when Tk cannot watch the solver channel's file descriptor (e.g. on Windows).
 
         Calls the processIncoming method of the GUI window to process incoming messages.
         """
-        self.window.after(200, self.periodic_call)
+        self.window.after(FALLBACK_POLL_MS, self.periodic_call)
         self.window.processIncoming()
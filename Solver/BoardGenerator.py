@@ -0,0 +1,258 @@
+"""
+Provides a vectorized generator of uniformly random solvable boards.
+
+Boards are drawn as uniformly random permutations with NumPy, a whole batch at a time. Half of all permutations
+are not solvable, those are fixed by swapping two non-empty tiles, which flips the permutation's parity
+without moving the empty tile. The swap is a one to one mapping between the unsolvable and the solvable boards
+with the same empty tile position, so the result is uniform over the solvable boards.
+Batches can be filtered to a range of the Manhattan distance heuristic, or of the optimal solution length for
+boards small enough to have a finish table, and come out as packed uint8 arrays that can be written to
+a SharedBoardBatch or to a board file for the batch CLI as they are.
+
+Usage:
+    python -m Solver.BoardGenerator 3 --count 1000 --difficulty hard > boards.txt
+
+Functions:
+    - random_solvable_boards: Draws a batch of uniformly random solvable boards.
+    - generate_boards: Draws random solvable boards that pass the requested filters.
+    - iter_board_batches: Yields batches of generated boards.
+    - difficulty_labels: Labels boards as easy, medium or hard.
+"""
+
+import argparse
+import sys
+import numpy as np
+from Solver import Heuristics
+from Solver.ConstructiveSolver import table_distance, FINISH_SIZE
+
+BOARD_DTYPE = np.uint8
+DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+# the largest number of boards whose pairwise inversion table is built at once
+_PARITY_CHUNK = 512
+
+
+def _permutation_parities(permutations):
+    """
+    Computes the parity of every permutation of a batch by counting inversions.
+
+    Args:
+        permutations (numpy.ndarray): A (count, cells) array of permutations.
+
+    Returns:
+        numpy.ndarray: A (count,) array holding 0 for even and 1 for odd permutations.
+    """
+    cells = permutations.shape[1]
+    upper = np.triu(np.ones((cells, cells), dtype=bool), k=1)
+    parities = np.empty(len(permutations), dtype=np.int64)
+    for start in range(0, len(permutations), _PARITY_CHUNK):
+        chunk = permutations[start:start + _PARITY_CHUNK]
+        # inversions[b, i, j] is set when i < j and chunk[b, i] > chunk[b, j]
+        inversions = (chunk[:, :, None] > chunk[:, None, :]) & upper
+        parities[start:start + len(chunk)] = inversions.sum(axis=(1, 2)) % 2
+    return parities
+
+
+def random_solvable_boards(board_size, count, rng=None):
+    """
+    Draws a batch of uniformly random solvable boards.
+
+    Args:
+        board_size (int): The size of the boards.
+        count (int): The number of boards.
+        rng (numpy.random.Generator): The random generator, a fresh one by default.
+
+    Returns:
+        numpy.ndarray: A (count, board_size, board_size) uint8 array of boards.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    cells = board_size * board_size
+    boards = rng.permuted(np.tile(np.arange(cells, dtype=BOARD_DTYPE), (count, 1)), axis=1)
+
+    zero_positions = np.argmax(boards == 0, axis=1)
+    zero_rows, zero_cols = np.divmod(zero_positions, board_size)
+    # a board is solvable when its permutation parity equals the parity of the empty tile's distance from the corner
+    unsolvable = np.nonzero(_permutation_parities(boards) != (zero_rows + zero_cols) % 2)[0]
+
+    # swap the tiles on the first two cells, or the first and third when the empty tile is on one of them
+    first = np.where(boards[unsolvable, 0] == 0, 2, 0)
+    second = np.where(boards[unsolvable, 1] == 0, 2, 1)
+    first_values = boards[unsolvable, first]
+    boards[unsolvable, first] = boards[unsolvable, second]
+    boards[unsolvable, second] = first_values
+
+    return boards.reshape((count, board_size, board_size))
+
+
+def manhattan_values(boards):
+    """
+    Computes the Manhattan distance heuristic of every board of a batch with one table lookup.
+
+    Args:
+        boards (numpy.ndarray): A (count, board_size, board_size) array of boards.
+
+    Returns:
+        numpy.ndarray: A (count,) array of heuristic values.
+    """
+    count, board_size = boards.shape[0], boards.shape[1]
+    flat = boards.reshape((count, board_size * board_size))
+    return Heuristics.batch_scores(flat, board_size, Heuristics.manhattan_heuristic)
+
+
+def optimal_depths(boards):
+    """
+    Computes the optimal solution length of every board of a batch, only for boards with a finish table.
+
+    Args:
+        boards (numpy.ndarray): A (count, board_size, board_size) array of boards of size at most FINISH_SIZE.
+
+    Returns:
+        numpy.ndarray: A (count,) array of solution lengths.
+    """
+    return np.array([table_distance(board) for board in boards], dtype=np.int64)
+
+
+def difficulty_labels(boards):
+    """
+    Labels boards as easy, medium or hard. The label is decided by the optimal solution length where it is known
+    and by the Manhattan distance heuristic otherwise, compared to the board size's scale:
+    below 40% of it is easy, below 60% is medium and the rest is hard.
+    The scale is the diameter of the board's graph where it is known (31 moves for 3x3, 6 for 2x2)
+    and the largest Manhattan distance a board of that size can have otherwise.
+
+    Args:
+        boards (numpy.ndarray): A (count, board_size, board_size) array of boards.
+
+    Returns:
+        list of str: The label of every board.
+    """
+    board_size = boards.shape[1]
+    if board_size <= FINISH_SIZE:
+        values = optimal_depths(boards)
+        scale = {2: 6, 3: 31}.get(board_size, 1)
+    else:
+        values = manhattan_values(boards)
+        scale = int(Heuristics.manhattan_table(board_size).max(axis=1).sum())
+
+    levels = np.digitize(values / scale, [0.4, 0.6])
+    return [DIFFICULTY_LEVELS[level] for level in levels]
+
+
+def generate_boards(board_size, count, rng=None, heuristic_range=None, depth_range=None, difficulty=None,
+                    max_batches=1000):
+    """
+    Draws uniformly random solvable boards that pass the requested filters.
+
+    Args:
+        board_size (int): The size of the boards.
+        count (int): The number of boards.
+        rng (numpy.random.Generator): The random generator, a fresh one by default.
+        heuristic_range (tuple): Inclusive (low, high) bounds on the Manhattan distance heuristic.
+        depth_range (tuple): Inclusive (low, high) bounds on the optimal solution length,
+            only for boards of size at most FINISH_SIZE.
+        difficulty (str): One of DIFFICULTY_LEVELS.
+        max_batches (int): The number of batches to draw before giving up on filling count.
+
+    Returns:
+        numpy.ndarray: A (count, board_size, board_size) uint8 array of boards,
+            fewer boards if the filters reject too many.
+    """
+    if depth_range is not None and board_size > FINISH_SIZE:
+        raise ValueError(f"optimal depth filtering is only available up to {FINISH_SIZE}x{FINISH_SIZE} boards")
+
+    rng = np.random.default_rng() if rng is None else rng
+    if heuristic_range is None and depth_range is None and difficulty is None:
+        return random_solvable_boards(board_size, count, rng)
+
+    accepted = []
+    accepted_count = 0
+    for _ in range(max_batches):
+        boards = random_solvable_boards(board_size, max(count, 64), rng)
+        keep = np.ones(len(boards), dtype=bool)
+        if heuristic_range is not None:
+            values = manhattan_values(boards)
+            keep &= (values >= heuristic_range[0]) & (values <= heuristic_range[1])
+        if depth_range is not None:
+            depths = optimal_depths(boards[keep])
+            keep[keep] = (depths >= depth_range[0]) & (depths <= depth_range[1])
+        if difficulty is not None:
+            labels = np.array(difficulty_labels(boards[keep]), dtype=object)
+            keep[keep] = labels == difficulty
+
+        accepted.append(boards[keep])
+        accepted_count += int(keep.sum())
+        if accepted_count >= count:
+            break
+
+    return np.concatenate(accepted)[:count]
+
+
+def iter_board_batches(board_size, total, batch_size, rng=None, **filters):
+    """
+    Yields batches of generated boards, so large benchmark sets never have to be held in memory at once.
+
+    Args:
+        board_size (int): The size of the boards.
+        total (int): The total number of boards.
+        batch_size (int): The number of boards in every batch but maybe the last.
+        rng (numpy.random.Generator): The random generator, a fresh one by default.
+        **filters: The filters of generate_boards.
+
+    Yields:
+        numpy.ndarray: A (count, board_size, board_size) uint8 array of boards.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    remaining = total
+    while remaining > 0:
+        batch = generate_boards(board_size, min(batch_size, remaining), rng, **filters)
+        if len(batch) == 0:
+            return
+        remaining -= len(batch)
+        yield batch
+
+
+def _parse_range(low, high):
+    """
+    Builds an inclusive range from optional bounds.
+
+    Args:
+        low (int): The lower bound or None.
+        high (int): The upper bound or None.
+
+    Returns:
+        tuple: The (low, high) range, or None if neither bound is given.
+    """
+    if low is None and high is None:
+        return None
+    return (0 if low is None else low, sys.maxsize if high is None else high)
+
+
+def main(argv=None, out=sys.stdout):
+    """
+    Writes generated boards, one per line, in the input format of the batch CLI.
+
+    Args:
+        argv (list of str): The arguments, defaults to sys.argv.
+        out: The output text stream.
+    """
+    parser = argparse.ArgumentParser(description="Generates uniformly random solvable sliding tile boards.")
+    parser.add_argument("size", type=int, help="The size of the boards")
+    parser.add_argument("--count", type=int, default=100, help="The number of boards")
+    parser.add_argument("--seed", type=int, default=None, help="The random seed")
+    parser.add_argument("--min-heuristic", type=int, default=None, help="The lowest Manhattan distance")
+    parser.add_argument("--max-heuristic", type=int, default=None, help="The highest Manhattan distance")
+    parser.add_argument("--min-depth", type=int, default=None, help="The shortest optimal solution (up to 3x3)")
+    parser.add_argument("--max-depth", type=int, default=None, help="The longest optimal solution (up to 3x3)")
+    parser.add_argument("--difficulty", choices=DIFFICULTY_LEVELS, default=None, help="The difficulty label")
+    args = parser.parse_args(argv)
+
+    heuristic_range = _parse_range(args.min_heuristic, args.max_heuristic)
+    depth_range = _parse_range(args.min_depth, args.max_depth)
+
+    rng = np.random.default_rng(args.seed)
+    for batch in iter_board_batches(args.size, args.count, 1024, rng, heuristic_range=heuristic_range,
+                                    depth_range=depth_range, difficulty=args.difficulty):
+        out.write("\n".join(" ".join(map(str, board.ravel())) for board in batch) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,528 @@
+"""
+Provides the coordinator of the cluster solver, which spreads the search of sliding tile boards over
+worker processes on any number of machines.
+
+Workers (see ClusterWorker) connect to the coordinator over TCP. The coordinator runs jobs on all of them:
+
+- A distributed IDA* solves one board. Every iteration of IDA* is a job: the board's search tree is split into
+  move prefixes a few moves deep, which are dealt out to the workers, and every worker searches the subtrees
+  below its prefixes within the iteration's bound. The bound is broadcast with the job, and the smallest number
+  of moves plus Manhattan distance above it reported by any unit is the bound of the next iteration. The first
+  solution reported is a shortest one, it is broadcast as a stop so every worker drops the rest of the job.
+  The constructive solver's path bounds the iterations, as in IDDFS.
+- A batch job solves many boards, each whole on one worker with one of the solver's algorithms.
+
+Work is balanced by stealing: a worker that runs out of units reports itself idle, and the coordinator asks a
+random busy worker to give it some. The busy worker gives half of its queued units, or splits the subtree it is
+searching, and the units it split off count as new work of the job, so the coordinator knows the job is done
+when every unit dealt out or split off has been answered. If a worker disconnects, the running job is started
+again on the workers left.
+
+The command line reads boards like TilesSolverCli and writes one JSON line per board. It can start worker
+processes on this machine with --local-workers, which is also the way to try it out on one machine.
+
+Usage:
+    python -m Solver.ClusterCoordinator boards.txt --local-workers 4
+    python -m Solver.ClusterCoordinator boards.txt --algo A* --local-workers 4
+    python -m Solver.ClusterCoordinator boards.txt --host 0.0.0.0 --port 8770 --min-workers 8
+    python -m Solver.ClusterWorker coordinator-host:8770    (on every worker machine)
+
+Classes:
+    - ClusterCoordinator: The asyncio coordinator of the cluster solver.
+
+Functions:
+    - start_local_workers: Starts worker processes on this machine.
+    - main: Runs the command line interface.
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import sys
+import time
+from collections import deque
+from Solver import TilesBoardCore
+from Solver.ClusterWorker import SubtreeSearch, run_worker
+from Solver.TilesSolver import ALGO_MAP, iddfs_depth_cap
+from Solver.TilesSolverCli import PORTFOLIO_ALGOS, parse_board_line, read_jobs, write_result
+from Solver.TilesSolverProcess import get_solver_context
+from Solver.TilesSolverProtocol import (encode_cluster_job, encode_units, encode_steal, decode_units,
+                                        decode_unit_result, pack_board, pack_frame, unpack_frame_header,
+                                        FRAME_HEADER, FRAME_JOB, FRAME_UNITS, FRAME_STEAL, FRAME_STOP,
+                                        FRAME_UNIT_DONE, FRAME_IDLE, FRAME_GIVE, JOB_IDA, JOB_BATCH, NO_BOUND,
+                                        ProtocolError)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8770
+# the name of the distributed IDA* on the command line, the other names are those of TilesSolver.ALGO_MAP
+DISTRIBUTED_IDA = "IDA*"
+# the number of move prefixes an IDA* iteration is split into per worker, stealing balances the rest
+UNITS_PER_WORKER = 8
+# how long an idle worker waits before stealing again after a busy worker had nothing to give, in seconds
+STEAL_RETRY_DELAY = 0.01
+
+
+class _WorkerLink:
+    """
+    The coordinator's side of a worker connection.
+
+    Attributes:
+        worker_id (int): The id of the worker.
+        writer (asyncio.StreamWriter): The connection's writer.
+        idle (bool): True while the worker has no units of the running job.
+        waiting (bool): True while a steal for the idle worker is unanswered.
+        stolen_from (bool): True while a steal sent to the worker is unanswered.
+    """
+
+    def __init__(self, worker_id, writer):
+        self.worker_id = worker_id
+        self.writer = writer
+        self.idle = False
+        self.waiting = False
+        self.stolen_from = False
+
+    def send(self, kind, job_id, payload=b""):
+        """ Sends one frame, frames are small and the worker reads them all, so it is buffered without waiting. """
+        self.writer.write(pack_frame(kind, job_id, payload))
+
+
+class _Job:
+    """
+    A job running on the workers.
+
+    Attributes:
+        job_id (int): The id of the job, frames of other jobs are ignored.
+        mode (int): JOB_IDA or JOB_BATCH.
+        remaining (dict): The units dealt out at the start that were not answered yet, by unit id.
+        outstanding (int): The number of units dealt out or split off that were not answered yet.
+        pool (collections.deque): Units no worker holds, given to the next idle worker.
+        next_bound (int): The smallest number of moves plus Manhattan distance above the bound met (IDA*).
+        path (list): The solution found (IDA*).
+        checks (int): The number of states the answered units checked.
+        on_result (function): Called with the unit id, path, checks and seconds of every answered unit (batch).
+        lost (bool): True if a worker holding units of the job disconnected.
+        done (asyncio.Event): Set when the job is done or lost.
+    """
+
+    def __init__(self, job_id, mode, units, on_result=None):
+        self.job_id = job_id
+        self.mode = mode
+        self.remaining = dict(units)
+        self.outstanding = len(units)
+        self.pool = deque()
+        self.next_bound = NO_BOUND
+        self.path = None
+        self.checks = 0
+        self.on_result = on_result
+        self.lost = False
+        self.done = asyncio.Event()
+
+
+class ClusterCoordinator:
+    """
+    The asyncio coordinator of the cluster solver.
+
+    Attributes:
+        workers (dict): The connected workers by id.
+        job (_Job): The running job, None between jobs.
+        server (asyncio.AbstractServer): The listening server once started.
+        steals (int): The number of steals that moved units to an idle worker.
+        splits (int): The number of steals answered by splitting a running search.
+    """
+
+    def __init__(self):
+        """ Initializes a ClusterCoordinator object. """
+        self.workers = {}
+        self.job = None
+        self.server = None
+        self.steals = 0
+        self.splits = 0
+        self._worker_ids = itertools.count(1)
+        self._job_ids = itertools.count(1)
+        self._joined = asyncio.Event()
+        self._left = asyncio.Event()
+        self._job_payload = b""
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Starts listening for workers.
+
+        Args:
+            host (str): The address to listen on, an address other machines reach for remote workers.
+            port (int): The port to listen on, 0 picks a free port.
+
+        Returns:
+            int: The port the coordinator listens on.
+        """
+        self.server = await asyncio.start_server(self.handle_connection, host=host, port=port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def wait_for_workers(self, count):
+        """
+        Waits until at least count workers are connected.
+
+        Args:
+            count (int): The number of workers.
+        """
+        while len(self.workers) < count:
+            self._joined.clear()
+            await self._joined.wait()
+
+    def close(self):
+        """ Stops listening and closes every worker connection, which ends the workers. """
+        if self.server is not None:
+            self.server.close()
+        for link in list(self.workers.values()):
+            link.writer.close()
+
+    async def wait_closed(self):
+        """ Waits until every worker connection closed by close is served to its end. """
+        while self.workers:
+            self._left.clear()
+            await self._left.wait()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves one worker connection until it is closed.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's reader.
+            writer (asyncio.StreamWriter): The connection's writer.
+        """
+        link = _WorkerLink(next(self._worker_ids), writer)
+        self.workers[link.worker_id] = link
+        self._joined.set()
+        if self.job is not None:
+            # the worker reports itself idle and steals its share
+            link.send(FRAME_JOB, self.job.job_id, self._job_payload)
+
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                payload_length, kind, job_id = unpack_frame_header(header)
+                payload = await reader.readexactly(payload_length)
+                if self.job is None or job_id != self.job.job_id:
+                    # an answer to a job that is over
+                    continue
+                if kind == FRAME_UNIT_DONE:
+                    self._unit_done(payload)
+                elif kind == FRAME_IDLE:
+                    link.idle = True
+                    self._balance()
+                elif kind == FRAME_GIVE:
+                    self._give(link, payload)
+
+        except (asyncio.IncompleteReadError, ConnectionError, ProtocolError):
+            pass
+        finally:
+            del self.workers[link.worker_id]
+            self._left.set()
+            writer.close()
+            if self.job is not None:
+                # the units the worker held are lost, so the job starts over on the workers left
+                self.job.lost = True
+                self._finish(self.job)
+
+    def _start_job(self, mode, units, algo_name="", bound=NO_BOUND, board=None, on_result=None):
+        """
+        Starts a job and deals its units out to the workers.
+
+        Args:
+            mode (int): JOB_IDA or JOB_BATCH.
+            units (list of tuple): The id and the data of every unit.
+            algo_name (str): The algorithm the boards of a batch job are solved with.
+            bound (int): The bound of an IDA* iteration.
+            board (numpy.ndarray): The board of an IDA* iteration.
+            on_result (function): Called with every answered unit of a batch job.
+
+        Returns:
+            _Job: The job.
+        """
+        job = _Job(next(self._job_ids), mode, units, on_result)
+        self.job = job
+        self._job_payload = encode_cluster_job(mode, algo_name, bound, board)
+        links = list(self.workers.values())
+        for index, link in enumerate(links):
+            link.idle = link.waiting = link.stolen_from = False
+            link.send(FRAME_JOB, job.job_id, self._job_payload)
+            dealt = units[index::len(links)]
+            if dealt:
+                link.send(FRAME_UNITS, job.job_id, encode_units(dealt))
+        if not links:
+            job.pool.extend(units)
+        if not units:
+            self._finish(job)
+        return job
+
+    def _finish(self, job):
+        """ Ends a job and stops it on every worker. """
+        if self.job is job:
+            self.job = None
+            for link in self.workers.values():
+                link.send(FRAME_STOP, job.job_id)
+        job.done.set()
+
+    def _unit_done(self, payload):
+        """ Takes the result of a unit of the running job. """
+        job = self.job
+        unit_id, path, checks, seconds, next_bound = decode_unit_result(payload)
+        job.outstanding -= 1
+        job.checks += checks
+        if job.mode == JOB_IDA:
+            job.next_bound = min(job.next_bound, next_bound)
+            if path is not None:
+                job.path = path
+                self._finish(job)
+                return
+        elif job.remaining.pop(unit_id, None) is not None and job.on_result is not None:
+            job.on_result(unit_id, path, checks, seconds)
+        if job.outstanding == 0:
+            self._finish(job)
+
+    def _give(self, victim, payload):
+        """ Hands the units a worker gave away to the idle worker that stole them. """
+        job = self.job
+        thief_id, created, units = decode_units(payload, give=True)
+        victim.stolen_from = False
+        job.outstanding += created
+        thief = self.workers.get(thief_id)
+        if thief is not None:
+            thief.waiting = False
+        if not units:
+            # the victim had nothing to give, try again after a while rather than asking round in circles
+            asyncio.get_running_loop().call_later(STEAL_RETRY_DELAY, self._balance)
+            return
+
+        self.steals += 1
+        self.splits += created > 0
+        if thief is not None and thief.idle:
+            thief.idle = False
+            thief.send(FRAME_UNITS, job.job_id, encode_units(units))
+        else:
+            job.pool.extend(units)
+        self._balance()
+
+    def _balance(self):
+        """ Gives every idle worker units from the pool, or sends a random busy worker a steal for it. """
+        job = self.job
+        if job is None:
+            return
+        thieves = [link for link in self.workers.values() if link.idle and not link.waiting]
+        for count, thief in enumerate(thieves):
+            if job.pool:
+                share = max(1, len(job.pool) // (len(thieves) - count))
+                thief.idle = False
+                thief.send(FRAME_UNITS, job.job_id, encode_units([job.pool.popleft() for _ in range(share)]))
+                continue
+            victims = [link for link in self.workers.values() if not link.idle and not link.stolen_from]
+            if not victims:
+                break
+            victim = random.choice(victims)
+            victim.stolen_from = True
+            thief.waiting = True
+            victim.send(FRAME_STEAL, job.job_id, encode_steal(thief.worker_id))
+
+    async def _run_job(self, mode, units, algo_name="", bound=NO_BOUND, board=None, on_result=None):
+        """
+        Runs a job until it is done, starting it again whenever a worker holding its units disconnects.
+
+        Returns:
+            _Job: The last run of the job.
+        """
+        checks = 0
+        while True:
+            job = self._start_job(mode, units, algo_name, bound, board, on_result)
+            await job.done.wait()
+            checks += job.checks
+            if not job.lost:
+                job.checks = checks
+                return job
+            if mode == JOB_BATCH:
+                # the boards already answered are not solved again
+                units = [unit for unit in units if unit[0] in job.remaining]
+            await self.wait_for_workers(1)
+
+    async def solve_board(self, board):
+        """
+        Solves a board with the distributed IDA*.
+
+        Args:
+            board (numpy.ndarray): A solvable board.
+
+        Returns:
+            tuple: A shortest solution path and the number of states checked.
+        """
+        search = SubtreeSearch(board)
+        prefixes, path = search.expand(max(1, len(self.workers)) * UNITS_PER_WORKER)
+        checks = search.checks
+        if path is not None:
+            return path, checks
+
+        _, constructive_path, _ = iddfs_depth_cap(board)
+        units = [(unit_id, bytes(prefix)) for unit_id, prefix in enumerate(prefixes)]
+        bound = search.distance
+        while bound < len(constructive_path):
+            job = await self._run_job(JOB_IDA, units, bound=bound, board=board)
+            checks += job.checks
+            if job.path is not None:
+                return job.path, checks
+            bound = job.next_bound
+        # no shorter solution than the constructive one exists
+        return constructive_path, checks
+
+    async def solve_batch(self, boards, algo_name, on_result):
+        """
+        Solves a batch of boards, each whole on one worker.
+
+        Args:
+            boards (list of numpy.ndarray): The boards.
+            algo_name (str): The name of the search algorithm to be used.
+            on_result (function): Called with the index, path, checks and seconds of every board as it is solved.
+
+        Returns:
+            int: The number of states checked.
+        """
+        units = [(index, pack_board(board)) for index, board in enumerate(boards)]
+        job = await self._run_job(JOB_BATCH, units, algo_name, on_result=on_result)
+        return job.checks
+
+
+def start_local_workers(address, count):
+    """
+    Starts worker processes on this machine.
+
+    Args:
+        address (str): The host:port of the coordinator.
+        count (int): The number of workers.
+
+    Returns:
+        list: The started processes.
+    """
+    context = get_solver_context()
+    processes = [context.Process(target=run_worker, args=(address,), name=f"ClusterWorker-{index}", daemon=True)
+                 for index in range(count)]
+    for process in processes:
+        process.start()
+    return processes
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments.
+
+    Args:
+        argv (list of str): The arguments, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Solves sliding tile boards, one per input line, on a cluster "
+                                                 "of workers and streams one JSON line per result.")
+    parser.add_argument("input", nargs="?", default="-", help="A file with one board per line, - for stdin")
+    parser.add_argument("--algo", default=DISTRIBUTED_IDA,
+                        choices=[DISTRIBUTED_IDA] + [name for name in ALGO_MAP if name not in PORTFOLIO_ALGOS],
+                        help="IDA* searches every board on all workers, any other algorithm solves the boards "
+                             "side by side, each on one worker")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="The address to listen on for workers")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="The port to listen on, 0 picks a free one")
+    parser.add_argument("--local-workers", type=int, default=0, help="The number of workers to start on this machine")
+    parser.add_argument("--min-workers", type=int, default=None,
+                        help="The number of workers to wait for before solving, defaults to the local workers or 1")
+    return parser.parse_args(argv)
+
+
+async def _solve(args, coordinator, out):
+    """
+    Solves the boards of the input and writes their results.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        coordinator (ClusterCoordinator): The started coordinator.
+        out: The output text stream.
+    """
+    stream = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        jobs = list(read_jobs(stream))
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    await coordinator.wait_for_workers(args.min_workers or args.local_workers or 1)
+    results, boards = [], []
+    for line_number, line in jobs:
+        result = {"line": line_number, "algo": args.algo}
+        try:
+            board = parse_board_line(line)
+        except ValueError as error:
+            write_result(dict(result, error=str(error)), out)
+            continue
+        result["board"] = board.ravel().tolist()
+        if not TilesBoardCore.is_solvable(board):
+            write_result(dict(result, error="board is not solvable"), out)
+            continue
+        results.append(result)
+        boards.append(board)
+
+    def finish(result, path, checks, seconds, **stats):
+        result["path"] = None if path is None else [int(move) for move in path]
+        result["length"] = None if path is None else len(path)
+        result["stats"] = dict({"checks": checks, "seconds": round(seconds, 6),
+                                "checks_per_second": round(checks / seconds) if seconds > 0 else None}, **stats)
+        write_result(result, out)
+
+    if args.algo != DISTRIBUTED_IDA:
+        await coordinator.solve_batch(boards, args.algo, lambda index, *answer: finish(results[index], *answer))
+        return
+
+    for result, board in zip(results, boards):
+        steals, splits = coordinator.steals, coordinator.splits
+        start = time.perf_counter()
+        path, checks = await coordinator.solve_board(board)
+        finish(result, path, checks, time.perf_counter() - start, workers=len(coordinator.workers),
+               steals=coordinator.steals - steals, splits=coordinator.splits - splits)
+
+
+async def _run(args, out):
+    """
+    Runs the coordinator and its local workers until the input is solved.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        out: The output text stream.
+    """
+    coordinator = ClusterCoordinator()
+    port = await coordinator.start(args.host, args.port)
+    print(f"Cluster coordinator listening on {args.host}:{port}", file=sys.stderr, flush=True)
+    host = "127.0.0.1" if args.host in ("0.0.0.0", "") else args.host
+    processes = start_local_workers(f"{host}:{port}", args.local_workers)
+    try:
+        await _solve(args, coordinator, out)
+    finally:
+        coordinator.close()
+        await coordinator.wait_closed()
+        loop = asyncio.get_running_loop()
+        for process in processes:
+            # joined off the loop, which still has to close the connections the workers wait on
+            await loop.run_in_executor(None, process.join, 5)
+            if process.is_alive():
+                process.terminate()
+
+
+def main(argv=None, out=sys.stdout):
+    """
+    Runs the command line interface.
+
+    Args:
+        argv (list of str): The arguments, defaults to sys.argv.
+        out: The output text stream.
+    """
+    args = parse_args(argv)
+    try:
+        asyncio.run(_run(args, out))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
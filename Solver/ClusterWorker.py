@@ -0,0 +1,477 @@
+"""
+Provides the worker of the cluster solver, which solves the units of work a ClusterCoordinator sends it.
+
+A worker connects to the coordinator over TCP and is told about every job with a job frame: one iteration of a
+distributed IDA* on a board, or a batch of boards solved whole with one of the solver's algorithms. Its units
+(move prefixes of the IDA* board or packed boards) are kept in a local deque and solved one at a time, each
+answered with its result. A worker that runs out of units reports itself idle, and the coordinator asks a busy
+worker to give it some: the busy worker hands over half of its queued units, or, if it has none left,
+splits the subtree its IDA* is searching and hands over the unexplored moves at the shallowest level.
+When a solution is found the coordinator stops the job on every worker.
+
+A reader thread handles the frames as they arrive, so a busy worker answers steals from its deque at once;
+a split is made by the searching thread on its next poll, every POLL_INTERVAL states.
+
+Usage:
+    python -m Solver.ClusterWorker coordinator-host:8770
+
+Classes:
+    - SubtreeSearch: The bounded depth-first search of IDA* below move prefixes of one board.
+    - ClusterWorker: A connection to a ClusterCoordinator and the loop solving its units.
+
+Functions:
+    - run_worker: Connects to a coordinator and solves its units until it closes the connection.
+    - main: Runs a worker from the command line.
+"""
+
+import argparse
+import functools
+import math
+import threading
+import time
+from collections import deque
+from Solver import Heuristics
+from Solver import TilesBoardCore
+from Solver.MovePruning import move_pruning, PRUNED
+from Solver.TilesSolver import ALGO_MAP, neighbour_table
+from Solver.TilesSolverClient import connect
+from Solver.TilesSolverProtocol import (decode_cluster_job, decode_units, decode_steal, encode_units,
+                                        encode_unit_result, pack_frame, unpack_frame_header, unpack_board,
+                                        FRAME_HEADER, FRAME_JOB, FRAME_UNITS, FRAME_STEAL, FRAME_STOP,
+                                        FRAME_UNIT_DONE, FRAME_IDLE, FRAME_GIVE, JOB_IDA, NO_BOUND)
+
+# how many states a subtree search checks between two polls for steals and stops
+POLL_INTERVAL = 1024
+# how long a worker keeps trying to reach a coordinator that is not listening yet, in seconds
+DEFAULT_CONNECT_TIMEOUT = 30.0
+
+
+class _Stopped(Exception):
+    """ Raised inside a running unit when its job was stopped. """
+
+
+class SubtreeSearch:
+    """
+    The bounded depth-first search of IDA* below move prefixes of one board.
+
+    A unit of a distributed IDA* iteration is a move prefix from the board. The search replays the prefix,
+    then checks every state below it whose number of moves plus Manhattan distance is within the bound,
+    skipping the move sequences the pruning automaton of the board size prunes, prefix included.
+    The prefixes handed out by expand and split together cover exactly the states the search would
+    have checked below the prefix they came from.
+
+    Attributes:
+        board_size (int): The size of the board.
+        root (list): The board as a flat list, row by row.
+        distance (int): The Manhattan distance of the board.
+        checks (int): The number of states checked by the search so far.
+    """
+
+    def __init__(self, board):
+        """
+        Initializes a SubtreeSearch object.
+
+        Args:
+            board (numpy.ndarray): The board the prefixes start from.
+        """
+        self.board_size = len(board)
+        self.root = [int(value) for value in board.ravel()]
+        self.checks = 0
+        self._cells = len(self.root)
+        self._neighbours = neighbour_table(self.board_size)
+        self._table = Heuristics.manhattan_table(self.board_size).tolist()
+        pruning = move_pruning(self.board_size)
+        self._transitions, self._directions = pruning.transitions, pruning.directions
+        self.distance = sum(self._table[value][cell] for cell, value in enumerate(self.root))
+        # the running search, which split hands parts of away
+        self._prefix = []
+        self._path = []
+        self._frames = []
+
+    def _replay(self, prefix):
+        """
+        Plays a prefix from the board.
+
+        Args:
+            prefix (list of int): The values of the moved tiles.
+
+        Returns:
+            tuple: The state, the cell of the empty tile, the pruning automaton's state and the Manhattan distance
+                after the prefix, or None if the automaton prunes the prefix.
+        """
+        state = list(self.root)
+        zero = state.index(0)
+        automaton = 0
+        for tile in prefix:
+            cell = state.index(tile)
+            automaton = self._transitions[automaton][self._directions[zero * self._cells + cell]]
+            if automaton == PRUNED:
+                return None
+            state[zero], state[cell] = tile, 0
+            zero = cell
+        distance = sum(self._table[value][cell] for cell, value in enumerate(state))
+        return state, zero, automaton, distance
+
+    def _children(self, state, zero, automaton):
+        """ Lists the cell, tile and automaton state of every move from a state the automaton does not prune. """
+        children = []
+        for cell in self._neighbours[zero]:
+            nextState = self._transitions[automaton][self._directions[zero * self._cells + cell]]
+            if nextState != PRUNED:
+                children.append((cell, state[cell], nextState))
+        # the children are popped from the end, so the search tries them in direction order
+        children.reverse()
+        return children
+
+    def expand(self, count):
+        """
+        Splits the search of the board into move prefixes of equal length, breadth-first.
+
+        Args:
+            count (int): The number of prefixes wanted, the first level with at least as many is returned.
+
+        Returns:
+            tuple: The prefixes, and the path of a solution met on the way, None if there is none.
+                A solution met breadth-first is a shortest one.
+        """
+        root = self._replay([])
+        self.checks += 1
+        if root[3] == 0:
+            return [], []
+        level = [([], root)]
+        while len(level) < count:
+            nextLevel = []
+            for prefix, (state, zero, automaton, distance) in level:
+                for cell, tile, nextState in reversed(self._children(state, zero, automaton)):
+                    child = list(state)
+                    child[zero], child[cell] = tile, 0
+                    childDistance = distance - self._table[tile][cell] + self._table[tile][zero]
+                    self.checks += 1
+                    if childDistance == 0:
+                        return [], prefix + [tile]
+                    nextLevel.append((prefix + [tile], (child, cell, nextState, childDistance)))
+            level = nextLevel
+        return [prefix for prefix, _ in level], None
+
+    def search(self, prefix, bound, poll=None):
+        """
+        Searches the states below a prefix within a bound.
+
+        Args:
+            prefix (list of int): The values of the moved tiles from the board to the root of the subtree.
+            bound (int): The largest number of moves plus Manhattan distance of a checked state.
+            poll (function): If given, called every POLL_INTERVAL states, it may call split.
+
+        Returns:
+            tuple: The path of a solution from the board (None if there is none within the bound)
+                and the smallest number of moves plus Manhattan distance above the bound of a state met.
+        """
+        root = self._replay(prefix)
+        if root is None:
+            # an earlier sequence of moves leads to the same state
+            return None, NO_BOUND
+        state, zero, automaton, distance = root
+        depth = len(prefix)
+        self.checks += 1
+        if depth + distance > bound:
+            return None, depth + distance
+        if distance == 0:
+            return list(prefix), NO_BOUND
+
+        table = self._table
+        checks = self.checks
+        nextBound = NO_BOUND
+        # frames[i] is the cell of the empty tile, the Manhattan distance and the moves left to try
+        # after i moves below the prefix, path[:i] are those moves
+        path = []
+        frames = [[zero, distance, self._children(state, zero, automaton)]]
+        self._prefix, self._path, self._frames = prefix, path, frames
+        try:
+            while frames:
+                frame = frames[-1]
+                children = frame[2]
+                if not children:
+                    frames.pop()
+                    if path:
+                        # unmake the last move
+                        tile = path.pop()
+                        state[frame[0]] = tile
+                        state[frames[-1][0]] = 0
+                    continue
+
+                zero, distance = frame[0], frame[1]
+                cell, tile, nextState = children.pop()
+                childDistance = distance - table[tile][cell] + table[tile][zero]
+                f = depth + len(path) + 1 + childDistance
+                checks += 1
+                if checks % POLL_INTERVAL == 0 and poll is not None:
+                    self.checks = checks
+                    poll()
+                if f > bound:
+                    if f < nextBound:
+                        nextBound = f
+                    continue
+
+                # make the move
+                state[zero] = tile
+                state[cell] = 0
+                path.append(tile)
+                if childDistance == 0:
+                    return prefix + path, NO_BOUND
+                frames.append([cell, childDistance, self._children(state, cell, nextState)])
+            return None, nextBound
+        finally:
+            self.checks = checks
+            self._frames = []
+
+    def split(self):
+        """
+        Hands away half the moves left to try at the shallowest level of the running search.
+
+        Returns:
+            list: The prefixes of the subtrees handed away, the running search no longer searches them.
+        """
+        for depth, frame in enumerate(self._frames):
+            children = frame[2]
+            if children:
+                # the moves at the start of the list are the ones the search would try last
+                given = children[:(len(children) + 1) // 2]
+                del children[:len(given)]
+                base = list(self._prefix) + self._path[:depth]
+                return [base + [tile] for _, tile, _ in given]
+        return []
+
+
+class ClusterWorker:
+    """
+    A connection to a ClusterCoordinator and the loop solving its units.
+
+    Attributes:
+        sock (socket.socket): The connection to the coordinator.
+        job_id (int): The id of the running job, None between jobs.
+        units (collections.deque): The units of the running job not started yet, as (unit id, data) tuples.
+        units_done (int): The number of units solved.
+        units_given (int): The number of units given to idle workers, split ones included.
+    """
+
+    def __init__(self, address, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+        """
+        Initializes a ClusterWorker object and connects to the coordinator.
+
+        Args:
+            address (str or tuple): A "host:port" string or a (host, port) tuple.
+            connect_timeout (float): How long to keep trying to connect, in seconds.
+        """
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            try:
+                self.sock = connect(address)
+                break
+            except ConnectionRefusedError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.2)
+        self.job_id = None
+        self.units = deque()
+        self.units_done = 0
+        self.units_given = 0
+        self._mode = None
+        self._algo_name = None
+        self._bound = NO_BOUND
+        self._search = None
+        self._running = False
+        self._idle_reported = False
+        self._closed = False
+        # the thieves waiting for a split of the running search
+        self._steals = []
+        # set to interrupt the running unit, it is also the interrupt event of the batch algorithms
+        self._stop = threading.Event()
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._reader = threading.Thread(target=self._read_frames, name="ClusterWorker", daemon=True)
+        self._reader.start()
+
+    def _send(self, kind, job_id, payload=b""):
+        """ Sends one frame. """
+        with self._send_lock:
+            self.sock.sendall(pack_frame(kind, job_id, payload))
+
+    def _recv_exactly(self, size):
+        """ Reads exactly size bytes from the connection. """
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("coordinator closed the connection")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _read_frames(self):
+        """ Reads the coordinator's frames until the connection is closed. """
+        try:
+            while True:
+                payload_length, kind, job_id = unpack_frame_header(self._recv_exactly(FRAME_HEADER.size))
+                payload = self._recv_exactly(payload_length)
+                if kind == FRAME_JOB:
+                    self._start_job(job_id, payload)
+                elif kind == FRAME_UNITS:
+                    with self._work:
+                        if job_id == self.job_id:
+                            self.units.extend(decode_units(payload))
+                            self._idle_reported = False
+                            self._work.notify()
+                elif kind == FRAME_STEAL:
+                    self._answer_steal(job_id, decode_steal(payload))
+                elif kind == FRAME_STOP:
+                    with self._work:
+                        if job_id == self.job_id:
+                            self.job_id = None
+                            self.units.clear()
+                            self._stop.set()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self._work:
+                self._closed = True
+                self._stop.set()
+                self._work.notify()
+
+    def _start_job(self, job_id, payload):
+        """ Starts a job, dropping whatever is left of the previous one. """
+        mode, algo_name, bound, board = decode_cluster_job(payload)
+        search = SubtreeSearch(board) if mode == JOB_IDA else None
+        with self._work:
+            self.job_id = job_id
+            self._mode, self._algo_name, self._bound, self._search = mode, algo_name, bound, search
+            self.units.clear()
+            self._steals.clear()
+            self._idle_reported = False
+            self._stop.set()
+            self._work.notify()
+
+    def _answer_steal(self, job_id, thief):
+        """ Gives half of the queued units to a thief, or leaves it to the running search to split. """
+        with self._work:
+            if job_id == self.job_id and self.units:
+                given = [self.units.pop() for _ in range((len(self.units) + 1) // 2)]
+            elif job_id == self.job_id and self._running and self._mode == JOB_IDA:
+                self._steals.append(thief)
+                return
+            else:
+                given = []
+            self.units_given += len(given)
+            self._send(FRAME_GIVE, job_id, encode_units(given, thief))
+
+    def _poll(self, job_id, search):
+        """ Stops the running unit if its job was stopped, and splits its search for the thieves waiting. """
+        if self._stop.is_set():
+            raise _Stopped()
+        if self._steals:
+            with self._work:
+                thieves, self._steals = self._steals, []
+            for thief in thieves:
+                prefixes = search.split()
+                self.units_given += len(prefixes)
+                self._send(FRAME_GIVE, job_id, encode_units([(0, bytes(prefix)) for prefix in prefixes], thief,
+                                                            len(prefixes)))
+
+    def _solve_unit(self, job, unit_id, data):
+        """
+        Solves one unit.
+
+        Args:
+            job (tuple): The id, mode, algorithm name, bound and SubtreeSearch of the unit's job.
+            unit_id (int): The id of the unit.
+            data (bytes): The move prefix or the packed board of the unit.
+
+        Returns:
+            bytes: The payload of the unit's result frame.
+        """
+        job_id, mode, algo_name, bound, search = job
+        start = time.perf_counter()
+        if mode == JOB_IDA:
+            checks = search.checks
+            path, next_bound = search.search(list(data), bound, functools.partial(self._poll, job_id, search))
+            return encode_unit_result(unit_id, path, search.checks - checks, time.perf_counter() - start, next_bound)
+
+        board = unpack_board(data, 0, math.isqrt(len(data)))[0]
+        if not TilesBoardCore.is_solvable(board):
+            return encode_unit_result(unit_id, None, 0, 0.0)
+        path, checks = ALGO_MAP[algo_name](board, self._stop)
+        if self._stop.is_set():
+            raise _Stopped()
+        return encode_unit_result(unit_id, path, checks, time.perf_counter() - start)
+
+    def run(self):
+        """ Solves the units of the coordinator's jobs until the coordinator closes the connection. """
+        while True:
+            with self._work:
+                while not self._closed and not (self.units and self.job_id is not None):
+                    if self.job_id is not None and not self._idle_reported:
+                        self._idle_reported = True
+                        self._send(FRAME_IDLE, self.job_id)
+                    self._work.wait()
+                if self._closed:
+                    return
+                job = (self.job_id, self._mode, self._algo_name, self._bound, self._search)
+                unit_id, data = self.units.popleft()
+                self._running = True
+                self._stop.clear()
+
+            try:
+                result = self._solve_unit(job, unit_id, data)
+            except _Stopped:
+                result = None
+
+            with self._work:
+                self._running = False
+                thieves, self._steals = self._steals, []
+            # the unit ended before the next poll, the thieves get queued units or nothing
+            for thief in thieves:
+                self._answer_steal(job[0], thief)
+            if result is not None:
+                self.units_done += 1
+                self._send(FRAME_UNIT_DONE, job[0], result)
+
+    def close(self):
+        """ Closes the connection. """
+        self.sock.close()
+
+
+def run_worker(address, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+    """
+    Connects to a coordinator and solves its units until it closes the connection.
+    This is the target of the local worker processes of ClusterCoordinator.
+
+    Args:
+        address (str or tuple): A "host:port" string or a (host, port) tuple.
+        connect_timeout (float): How long to keep trying to connect, in seconds.
+    """
+    worker = ClusterWorker(address, connect_timeout)
+    try:
+        worker.run()
+    finally:
+        worker.close()
+
+
+def main(argv=None):
+    """
+    Runs a worker from the command line.
+
+    Args:
+        argv (list of str): The arguments, defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="A worker of the cluster sliding tiles solver.")
+    parser.add_argument("address", help="The host:port the coordinator listens on")
+    parser.add_argument("--connect-timeout", type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help="How long to keep trying to reach the coordinator, in seconds")
+    args = parser.parse_args(argv)
+    try:
+        run_worker(args.address, args.connect_timeout)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
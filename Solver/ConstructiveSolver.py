@@ -0,0 +1,460 @@
+"""
+Provides a fast, suboptimal, constructive solver for boards of any size.
+
+The solver works on the board rotated by 180 degrees, where the empty tile's goal is the bottom-right corner.
+It places the top row and then the left column of the unsolved region one tile at a time,
+shrinking the region until only a 3x3 (or 2x2) region is left, which is finished optimally from a
+precomputed table. Every tile is placed by walking it along a shortest path while the empty tile is routed
+around the already placed tiles. The last two tiles of a row or column cannot be placed one by one,
+so they are first brought into a small window next to their goal and then finished by a breadth-first search
+over the positions of the two tiles and the empty tile inside that window.
+
+Moves are the values of the moved tiles, so they do not depend on the rotation.
+The solver takes milliseconds for a 10x10 board and its memory is bounded by the size of the board
+and the 3x3 table. The table only holds one state of every pair of states mirrored about the main diagonal
+(see Symmetry), which about halves it, the other state's move is the mirror of its pair's.
+
+Functions:
+    - constructive_solve: Solves a board constructively.
+    - finish_table: Returns the optimal move table of a small square region.
+    - next_zero: Looks up the next move of a state in a finish table.
+    - table_distance: Returns the optimal number of moves of a 2x2 or 3x3 board.
+    - table_path: Returns a shortest solution of a 2x2 or 3x3 board.
+"""
+
+from collections import deque
+import numpy as np
+from Solver.Symmetry import mirror_state, transpose_cells
+
+# the size of the region that is finished optimally from a table
+FINISH_SIZE = 3
+
+_FINISH_TABLES = {}
+
+
+def _neighbours(position, size):
+    """
+    Returns the positions next to a position on a square board.
+
+    Args:
+        position (tuple): The (row, col) position.
+        size (int): The size of the board.
+
+    Returns:
+        list of tuple: The neighbouring positions.
+    """
+    row, col = position
+    result = []
+    if row > 0:
+        result.append((row - 1, col))
+    if row < size - 1:
+        result.append((row + 1, col))
+    if col > 0:
+        result.append((row, col - 1))
+    if col < size - 1:
+        result.append((row, col + 1))
+    return result
+
+
+def finish_table(size):
+    """
+    Returns the optimal move table of a size x size region, built on first use with a breadth-first search
+    from the goal. A state is the bytes of the labels of the cells row by row, the label of a tile is the index
+    of its goal cell and the empty tile's goal is the last cell. The table maps every canonical solvable state,
+    the smaller of a state and its mirror, to the index of the cell the empty tile should move to next.
+    Use next_zero to look up any state.
+
+    Args:
+        size (int): The size of the region, 2 or 3.
+
+    Returns:
+        dict: The table.
+    """
+    table = _FINISH_TABLES.get(size)
+    if table is not None:
+        return table
+
+    cells = size * size
+    blank = cells - 1
+    transpose = transpose_cells(size)
+    neighbours = [[r * size + c for r, c in _neighbours(divmod(i, size), size)] for i in range(cells)]
+    goal = bytes(range(cells))
+    table = {goal: None}
+    frontier = deque([(goal, blank)])
+
+    while frontier:
+        state, zero = frontier.popleft()
+        for position in neighbours[zero]:
+            child = bytearray(state)
+            child[zero], child[position] = child[position], blank
+            child = bytes(child)
+            mirror = mirror_state(child, size)
+            if mirror < child:
+                # the mirrored child is kept, its empty tile stands on the mirrored cells
+                child, zero_cell, position = mirror, transpose[zero], transpose[position]
+            else:
+                zero_cell = zero
+            if child not in table:
+                # from the child the empty tile goes back to where it was in the parent
+                table[child] = zero_cell
+                frontier.append((child, position))
+
+    _FINISH_TABLES[size] = table
+    return table
+
+
+def next_zero(table, state, size):
+    """
+    Looks up the next move of a state in a finish table, through its mirror if the state is not canonical.
+
+    Args:
+        table (dict): The table returned by finish_table.
+        state (bytes): The labels of the cells row by row.
+        size (int): The size of the region.
+
+    Returns:
+        int: The cell the empty tile should move to next, None at the goal.
+
+    Raises:
+        KeyError: If the state cannot be solved.
+    """
+    mirror = mirror_state(state, size)
+    if mirror >= state:
+        return table[state]
+    cell = table[mirror]
+    return None if cell is None else transpose_cells(size)[cell]
+
+
+def table_distance(board):
+    """
+    Returns the optimal number of moves of a 2x2 or 3x3 board by following its finish table.
+
+    Args:
+        board (numpy.ndarray): A solvable board of size at most FINISH_SIZE.
+
+    Returns:
+        int: The length of a shortest solution.
+    """
+    return len(table_path(board))
+
+
+def table_path(board):
+    """
+    Returns a shortest solution of a 2x2 or 3x3 board by following its finish table.
+
+    Args:
+        board (numpy.ndarray): A board of size at most FINISH_SIZE.
+
+    Returns:
+        list of int: The values of the moved tiles, or None if the board is not solvable.
+    """
+    board_size = len(board)
+    cells = board_size * board_size
+    table = finish_table(board_size)
+    # on the rotated board the tile with value v belongs on cell cells - 1 - v, which is its label
+    state = bytearray(cells - 1 - int(value) for value in np.asarray(board).ravel()[::-1])
+    try:
+        cell = next_zero(table, bytes(state), board_size)
+    except KeyError:
+        return None
+
+    zero = state.index(cells - 1)
+    path = []
+    while cell is not None:
+        path.append(cells - 1 - state[cell])
+        state[zero], state[cell] = state[cell], state[zero]
+        zero = cell
+        cell = next_zero(table, bytes(state), board_size)
+
+    return path
+
+
+class _ConstructiveSearch:
+    """
+    The state of one constructive solve, on the rotated board.
+
+    Attributes:
+        board (numpy.ndarray): The rotated board, changed in place.
+        size (int): The size of the board.
+        targets (dict): The goal position of every tile value on the rotated board.
+        zero (tuple): The position of the empty tile.
+        locked (set): The positions of the tiles that are already placed.
+        path (list): The values of the moved tiles, in order.
+        moves_made (int): The number of moves made, including the ones that cancelled out of the path.
+    """
+
+    def __init__(self, board):
+        self.board = np.rot90(np.asarray(board, dtype=int), 2).copy()
+        self.size = len(self.board)
+        n = self.size
+        self.targets = {}
+        for value in range(n * n):
+            goal_row, goal_col = divmod(value, n)
+            self.targets[value] = (n - 1 - goal_row, n - 1 - goal_col)
+        zero_row, zero_col = np.argwhere(self.board == 0)[0]
+        self.zero = (int(zero_row), int(zero_col))
+        self.locked = set()
+        self.path = []
+        self.moves_made = 0
+
+    def find(self, value):
+        """ Returns the position of a tile value. """
+        row, col = np.argwhere(self.board == value)[0]
+        return int(row), int(col)
+
+    def slide(self, position):
+        """ Moves the tile at position into the empty square next to it. """
+        value = int(self.board[position])
+        self.board[self.zero] = value
+        self.board[position] = 0
+        self.zero = position
+        self.moves_made += 1
+        if self.path and self.path[-1] == value:
+            # moving the same tile twice in a row puts it back, so both moves cancel out
+            self.path.pop()
+        else:
+            self.path.append(value)
+
+    def shortest_path(self, start, goals, blocked, allowed=None):
+        """
+        Finds a shortest path between cells with a breadth-first search.
+
+        Args:
+            start (tuple): The first cell.
+            goals (set): The cells the path may end at.
+            blocked (set): The cells the path may not pass through.
+            allowed (set): If given, the only cells the path may pass through.
+
+        Returns:
+            list of tuple: The cells of the path after start, or None if no goal can be reached.
+        """
+        if start in goals:
+            return []
+        parents = {start: None}
+        frontier = deque([start])
+        while frontier:
+            cell = frontier.popleft()
+            for child in _neighbours(cell, self.size):
+                if child in parents or child in blocked or (allowed is not None and child not in allowed):
+                    continue
+                parents[child] = cell
+                if child in goals:
+                    path = [child]
+                    while parents[path[-1]] != start:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                frontier.append(child)
+        return None
+
+    def move_blank(self, targets, blocked):
+        """ Routes the empty tile to the nearest of the targets without passing through blocked cells. """
+        path = self.shortest_path(self.zero, targets, blocked)
+        if path is None:
+            raise RuntimeError(f"empty tile cannot reach {targets}")
+        for cell in path:
+            self.slide(cell)
+
+    def move_tile(self, value, goals):
+        """
+        Walks a tile into one of the goal cells without disturbing the locked tiles.
+
+        Args:
+            value (int): The value of the tile.
+            goals (set): The cells the tile may end at.
+
+        Returns:
+            tuple: The cell the tile ended at.
+        """
+        position = self.find(value)
+        tile_path = self.shortest_path(position, goals, self.locked)
+        if tile_path is None:
+            raise RuntimeError(f"tile {value} cannot reach its goal")
+        for cell in tile_path:
+            self.move_blank({cell}, self.locked | {position})
+            self.slide(position)
+            position = cell
+        return position
+
+    def place(self, value):
+        """ Places a tile on its goal cell and locks it. """
+        target = self.targets[value]
+        self.move_tile(value, {target})
+        self.locked.add(target)
+
+    def gather(self, first, second, window):
+        """
+        Brings two tiles and the empty tile into a window.
+        Locking the first tile that arrives can wall the empty tile off from the cell the second tile needs,
+        so every order of the tiles and every window cell for the tile that arrives first is tried,
+        undoing the moves of a failed try.
+
+        Args:
+            first (int): The value of one of the tiles.
+            second (int): The value of the other tile.
+            window (list of tuple): The cells of the window.
+
+        Returns:
+            tuple: The positions of the first and of the second tile inside the window.
+        """
+        window_cells = set(window)
+        saved = (self.board.copy(), self.zero, list(self.path), self.moves_made)
+        for leading, trailing in ((first, second), (second, first)):
+            for cell in window:
+                try:
+                    leading_position = self.move_tile(leading, {cell})
+                    self.locked.add(leading_position)
+                    trailing_position = self.move_tile(trailing, window_cells - {leading_position})
+                    self.locked.add(trailing_position)
+                    self.move_blank(window_cells - {leading_position, trailing_position}, self.locked)
+                except RuntimeError:
+                    board, self.zero, path, self.moves_made = saved
+                    self.board = board.copy()
+                    self.path = list(path)
+                    continue
+                finally:
+                    self.locked -= window_cells
+
+                if leading == first:
+                    return leading_position, trailing_position
+                return trailing_position, leading_position
+
+        raise RuntimeError("tiles cannot be brought into the window")
+
+    def place_pair(self, first, second, window):
+        """
+        Places the last two tiles of a row or column.
+        The tiles and the empty tile are brought into the window, then a breadth-first search over their positions
+        inside the window finds the moves that put both tiles on their goal cells.
+
+        Args:
+            first (int): The value of one of the tiles.
+            second (int): The value of the other tile.
+            window (list of tuple): A 3x2 or 2x3 block of unlocked cells holding both goal cells.
+        """
+        window_cells = set(window)
+        first_position, second_position = self.gather(first, second, window)
+
+        goal = (self.targets[first], self.targets[second])
+        start = (first_position, second_position, self.zero)
+        parents = {start: None}
+        frontier = deque([start])
+        while frontier:
+            state = frontier.popleft()
+            if state[:2] == goal:
+                break
+            first_position, second_position, zero = state
+            for cell in _neighbours(zero, self.size):
+                if cell not in window_cells:
+                    continue
+                child = (zero if cell == first_position else first_position,
+                         zero if cell == second_position else second_position,
+                         cell)
+                if child not in parents:
+                    parents[child] = state
+                    frontier.append(child)
+        else:
+            raise RuntimeError("tiles cannot be placed inside the window")
+
+        blank_moves = []
+        while parents[state] is not None:
+            blank_moves.append(state[2])
+            state = parents[state]
+        for cell in reversed(blank_moves):
+            self.slide(cell)
+
+        self.locked |= set(goal)
+
+    def finish(self, offset):
+        """
+        Solves the last region optimally from the table.
+
+        Args:
+            offset (int): The row and column of the region's top-left cell.
+        """
+        region_size = self.size - offset
+        table = finish_table(region_size)
+        labels = {}
+        for value, (row, col) in self.targets.items():
+            if row >= offset and col >= offset:
+                labels[value] = (row - offset) * region_size + (col - offset)
+
+        region = self.board[offset:, offset:]
+        state = bytearray(labels[int(value)] for value in region.ravel())
+        zero = state.index(region_size * region_size - 1)
+        cell = next_zero(table, bytes(state), region_size)
+        while cell is not None:
+            self.slide((cell // region_size + offset, cell % region_size + offset))
+            state[zero], state[cell] = state[cell], state[zero]
+            zero = cell
+            cell = next_zero(table, bytes(state), region_size)
+
+    def solve(self, interrupt_event):
+        """
+        Solves the board.
+
+        Args:
+            interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+
+        Returns:
+            bool: True if the board was solved and False if the search was interrupted.
+        """
+        n = self.size
+        offset = 0
+        while n - offset > FINISH_SIZE:
+            if interrupt_event.is_set():
+                return False
+
+            # the top row of the region, its last two tiles are placed together
+            row_values = [int(self.board_value_for((offset, col))) for col in range(offset, n)]
+            for value in row_values[:-2]:
+                self.place(value)
+            self.place_pair(row_values[-2], row_values[-1],
+                            [(row, col) for row in range(offset, offset + 3) for col in range(n - 2, n)])
+
+            if interrupt_event.is_set():
+                return False
+
+            # the left column of the region, below the row that was just placed
+            col_values = [int(self.board_value_for((row, offset))) for row in range(offset + 1, n)]
+            for value in col_values[:-2]:
+                self.place(value)
+            self.place_pair(col_values[-2], col_values[-1],
+                            [(row, col) for row in range(n - 2, n) for col in range(offset, offset + 3)])
+            offset += 1
+
+        self.finish(offset)
+        return True
+
+    def board_value_for(self, position):
+        """ Returns the tile value whose goal is position on the rotated board. """
+        row, col = position
+        n = self.size
+        return (n - 1 - row) * n + (n - 1 - col)
+
+
+def constructive_solve(board, interrupt_event):
+    """
+    Solves a board constructively, row by row and column by column.
+
+    Parameters:
+    - board (numpy.ndarray): The current state of the sliding tile board.
+    - interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+
+    Returns:
+    - tuple: A tuple containing the path (list) and the total number of moves made while solving,
+      including the moves that cancelled out of the path. The path is None if the board cannot be solved.
+    """
+    # imported here and not at module level because TilesBoardCore imports BoardGenerator, which imports this module
+    from Solver import TilesBoardCore
+
+    if len(board) < 2:
+        return [], 0
+    if not TilesBoardCore.is_solvable(board):
+        # couldn't reach goal state from given board state
+        return None, 0
+
+    search = _ConstructiveSearch(board)
+    if not search.solve(interrupt_event):
+        return None, search.moves_made
+
+    return search.path, search.moves_made
@@ -0,0 +1,608 @@
+"""
+Provides a breadth-first search that keeps its layers on disk, for state spaces that do not fit in memory.
+
+A state is packed into one uint64 as the positions of its tracked tiles, 4 bits each, the empty tile first.
+Tracking every tile packs whole boards (up to 4x4), tracking the empty tile and a few others packs the abstract
+states of a pattern database. Each layer is a file of sorted, unique packed states in a scratch directory.
+The next layer is built chunk by chunk: the children of a chunk of the layer are generated with NumPy,
+sorted and written as a run file, then the runs are merged into the new layer while every state of
+the previous two layers is removed (delayed duplicate detection). Layers are read through np.memmap and
+written with large buffered sequential writes, so memory is bounded by the chunk size and not by the layer.
+A manifest written after every layer lets an interrupted search resume from its last finished layer.
+A symmetric search keeps one state of every pair of states mirrored about the main diagonal (see Symmetry),
+the smaller packed one, which about halves the layers of a distance table whose tracked tiles are mirrored
+onto each other.
+
+Usage:
+    python -m Solver.ExternalBFS solve 3 "8 7 6 5 4 3 2 1 0" --dir /tmp/bfs
+    python -m Solver.ExternalBFS table 4 --tiles 1 2 3 4 5 --dir /tmp/pdb
+    python -m Solver.ExternalBFS table 4 --tiles 1 4 5 --symmetric --dir /tmp/pdb_sym
+
+Classes:
+    - ExternalBFS: A resumable breadth-first search with its layers on disk.
+
+Functions:
+    - pack_positions: Packs the positions of the tracked tiles of boards.
+    - external_bfs_solve: Solves a board with a disk-backed breadth-first search.
+    - build_distance_table: Builds a distance table or pattern database on disk.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+from Solver import TilesBoardCore
+from Solver.Symmetry import transpose_cells
+
+# the number of states expanded, sorted or merged at once
+DEFAULT_CHUNK_RECORDS = 1 << 20
+# the buffer of every sequential write
+WRITE_BUFFER_BYTES = 1 << 22
+# boards of up to 16 cells fit 4 bits per position
+MAX_CELLS = 16
+RECORD_DTYPE = np.dtype("<u8")
+MANIFEST_NAME = "manifest.json"
+
+_SHIFTS = {}
+
+
+def _shifts(count):
+    """ Returns the bit offsets of count packed positions. """
+    shifts = _SHIFTS.get(count)
+    if shifts is None:
+        shifts = (np.arange(count, dtype=np.uint64) * np.uint64(4))
+        _SHIFTS[count] = shifts
+    return shifts
+
+
+def pack_positions(positions):
+    """
+    Packs positions into uint64 states.
+
+    Args:
+        positions (numpy.ndarray): A (count, tracked) array of the positions of the tracked tiles.
+
+    Returns:
+        numpy.ndarray: A (count,) uint64 array of packed states.
+    """
+    positions = positions.astype(np.uint64)
+    return np.bitwise_or.reduce(positions << _shifts(positions.shape[1]), axis=1)
+
+
+def unpack_positions(states, tracked):
+    """
+    Unpacks uint64 states into positions.
+
+    Args:
+        states (numpy.ndarray): A (count,) uint64 array of packed states.
+        tracked (int): The number of tracked tiles.
+
+    Returns:
+        numpy.ndarray: A (count, tracked) intp array of the positions of the tracked tiles.
+    """
+    return ((states[:, None] >> _shifts(tracked)) & np.uint64(0xF)).astype(np.intp)
+
+
+def board_positions(board, tiles):
+    """
+    Finds the positions of the tracked tiles of a board.
+
+    Args:
+        board (numpy.ndarray): A square board.
+        tiles (list of int): The tracked tiles, the empty tile first.
+
+    Returns:
+        numpy.ndarray: A (1, tracked) array of positions.
+    """
+    flat = np.asarray(board).ravel()
+    positions = np.empty(len(flat), dtype=np.intp)
+    positions[flat.astype(np.intp)] = np.arange(len(flat))
+    return positions[tiles][None, :]
+
+
+def _write_records(path, records):
+    """ Writes records to a new file with one large buffered sequential write, replacing it atomically. """
+    partial = path + ".partial"
+    with open(partial, "wb", buffering=WRITE_BUFFER_BYTES) as file:
+        records.astype(RECORD_DTYPE, copy=False).tofile(file)
+    os.replace(partial, path)
+
+
+def _read_records(path):
+    """ Maps a file of records into memory without reading it. """
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r")
+
+
+class _SortedReader:
+    """
+    Reads a sorted file of records in order, one buffer at a time.
+
+    Attributes:
+        records (numpy.ndarray): The memory mapped records.
+        position (int): The index of the first record that was not taken yet.
+        buffer_records (int): The number of records read at once.
+    """
+
+    def __init__(self, path, buffer_records):
+        self.records = _read_records(path)
+        self.position = 0
+        self.buffer_records = buffer_records
+        self.buffer = np.empty(0, dtype=RECORD_DTYPE)
+
+    def _fill(self):
+        """ Reads the next buffer if the current one is used up. """
+        if len(self.buffer) == 0 and self.position < len(self.records):
+            end = min(self.position + self.buffer_records, len(self.records))
+            self.buffer = np.array(self.records[self.position:end])
+            self.position = end
+
+    def exhausted(self):
+        """ Checks if every record was taken. """
+        self._fill()
+        return len(self.buffer) == 0
+
+    def last_buffered(self):
+        """ Returns the largest record of the buffer, every record up to it can be taken without reading. """
+        self._fill()
+        return self.buffer[-1]
+
+    def take_upto(self, bound):
+        """
+        Takes the records up to a bound from the buffer.
+
+        Args:
+            bound (numpy.uint64): The largest record to take.
+
+        Returns:
+            numpy.ndarray: The records, sorted.
+        """
+        self._fill()
+        count = int(np.searchsorted(self.buffer, bound, side="right"))
+        taken, self.buffer = self.buffer[:count], self.buffer[count:]
+        return taken
+
+    def take_all_upto(self, bound):
+        """ Takes every record up to a bound, reading more buffers as needed. """
+        parts = []
+        while not self.exhausted():
+            parts.append(self.take_upto(bound))
+            if len(self.buffer) > 0:
+                break
+        return np.concatenate(parts) if parts else np.empty(0, dtype=RECORD_DTYPE)
+
+
+def _merge_runs(run_paths, exclude_paths, out_path, buffer_records):
+    """
+    Merges sorted runs into one sorted file of unique records that are not in any of the excluded files.
+    Every step takes, from every run, the records up to the smallest of the runs' largest buffered records,
+    so a step only holds about one buffer per run.
+
+    Args:
+        run_paths (list of str): The sorted run files.
+        exclude_paths (list of str): Sorted files of records to leave out.
+        out_path (str): The merged file.
+        buffer_records (int): The number of records every reader buffers.
+
+    Returns:
+        int: The number of records written.
+    """
+    runs = [_SortedReader(path, buffer_records) for path in run_paths]
+    excluded = [_SortedReader(path, buffer_records) for path in exclude_paths]
+    written = 0
+    partial = out_path + ".partial"
+    with open(partial, "wb", buffering=WRITE_BUFFER_BYTES) as file:
+        while True:
+            runs = [run for run in runs if not run.exhausted()]
+            if not runs:
+                break
+            bound = min(run.last_buffered() for run in runs)
+            merged = np.unique(np.concatenate([run.take_upto(bound) for run in runs]))
+            for reader in excluded:
+                seen = reader.take_all_upto(bound)
+                if len(seen):
+                    merged = merged[~np.isin(merged, seen, assume_unique=True)]
+            merged.astype(RECORD_DTYPE, copy=False).tofile(file)
+            written += len(merged)
+    os.replace(partial, out_path)
+    return written
+
+
+class ExternalBFS:
+    """
+    A resumable breadth-first search with its layers on disk.
+
+    Attributes:
+        directory (str): The scratch directory holding the manifest, the layers and the runs.
+        board_size (int): The size of the board.
+        tiles (list of int): The tracked tiles, the empty tile first.
+        start (int): The packed start state.
+        chunk_records (int): The number of states expanded, sorted or merged at once.
+        layers (list of int): The number of states of every finished layer.
+        complete (bool): True when the search ran out of new states.
+        symmetric (bool): True if the layers only hold canonical states.
+    """
+
+    def __init__(self, directory, board_size, start_board, tiles=None, chunk_records=DEFAULT_CHUNK_RECORDS,
+                 symmetric=False):
+        """
+        Initializes an ExternalBFS object, resuming the search already in the directory if it has the same
+        board size, tracked tiles, start state and symmetry.
+
+        Args:
+            directory (str): The scratch directory, created if missing.
+            board_size (int): The size of the board, at most 4.
+            start_board (numpy.ndarray): The board the search starts from.
+            tiles (list of int): The tracked tiles besides the empty tile, all tiles by default.
+            chunk_records (int): The number of states expanded, sorted or merged at once.
+            symmetric (bool): True to keep one state of every mirrored pair, the mirror of every tracked tile
+                must be tracked too and the start board must be its own mirror. Only distances are kept then,
+                path_to cannot walk back.
+
+        Raises:
+            ValueError: If the board is too large or a symmetric search is asked for that would get distances wrong.
+        """
+        cells = board_size * board_size
+        if cells > MAX_CELLS:
+            raise ValueError(f"external BFS packs boards of up to {MAX_CELLS} cells")
+
+        self.directory = directory
+        self.board_size = board_size
+        self.tiles = [0] + sorted(set(range(1, cells) if tiles is None else tiles) - {0})
+        self.symmetric = symmetric
+        if symmetric:
+            transpose = transpose_cells(board_size)
+            mirrored = sorted(transpose[tile] for tile in self.tiles)
+            if mirrored != self.tiles:
+                raise ValueError(f"the mirrors {mirrored[1:]} of the tracked tiles {self.tiles[1:]} "
+                                 f"must be tracked for a symmetric search")
+            # a mirrored state has the mirror of tile tiles[k] on the mirror of the cell of tiles[k]
+            self._mirror_columns = [self.tiles.index(transpose[tile]) for tile in self.tiles]
+            self._mirror_cells = np.frombuffer(transpose, dtype=np.uint8).astype(np.intp)
+        start = pack_positions(board_positions(start_board, self.tiles))
+        # merging a state with its mirror keeps the distances only if the start is as far from both
+        if symmetric and self.mirror(start)[0] != start[0]:
+            raise ValueError("a symmetric search must start from a board that is its own mirror, like the goal")
+        self.start = int(start[0])
+        self.chunk_records = chunk_records
+        self.layers = []
+        self.complete = False
+        self._neighbours = self._neighbour_array()
+        os.makedirs(directory, exist_ok=True)
+        self._load_manifest()
+
+    def _neighbour_array(self):
+        """ Returns the (cells, 4) array of the neighbours of every cell, padded with -1. """
+        table = np.full((self.board_size * self.board_size, 4), -1, dtype=np.intp)
+        for cell in range(self.board_size * self.board_size):
+            row, col = divmod(cell, self.board_size)
+            moves = TilesBoardCore.find_possible_moves(self.board_size, row, col)
+            table[cell, :len(moves)] = [move_row * self.board_size + move_col for move_row, move_col in moves]
+        return table
+
+    def _manifest(self):
+        """ Returns the manifest of the search. """
+        return {"board_size": self.board_size, "tiles": self.tiles, "start": self.start,
+                "symmetric": self.symmetric, "layers": self.layers, "complete": self.complete}
+
+    def _load_manifest(self):
+        """ Resumes the search of the directory, or starts a new one with the start state as layer 0. """
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        if os.path.exists(path):
+            with open(path) as file:
+                manifest = json.load(file)
+            if (manifest["board_size"], manifest["tiles"], manifest["start"], manifest.get("symmetric", False)) != \
+                    (self.board_size, self.tiles, self.start, self.symmetric):
+                raise ValueError(f"{self.directory} holds a different search")
+            self.layers = manifest["layers"]
+            self.complete = manifest["complete"]
+            return
+
+        _write_records(self.layer_path(0), np.array([self.start], dtype=RECORD_DTYPE))
+        self.layers = [1]
+        self._save_manifest()
+
+    def _save_manifest(self):
+        """ Writes the manifest atomically. """
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        with open(path + ".partial", "w") as file:
+            json.dump(self._manifest(), file)
+        os.replace(path + ".partial", path)
+
+    def layer_path(self, depth):
+        """ Returns the path of a layer's file. """
+        return os.path.join(self.directory, f"layer_{depth:03d}.bin")
+
+    def layer(self, depth):
+        """
+        Maps a finished layer into memory.
+
+        Args:
+            depth (int): The depth of the layer.
+
+        Returns:
+            numpy.ndarray: The sorted packed states of the layer.
+        """
+        return _read_records(self.layer_path(depth))
+
+    def mirror(self, states):
+        """
+        Mirrors packed states about the main diagonal, the search must be symmetric.
+
+        Args:
+            states (numpy.ndarray): A (count,) uint64 array of packed states.
+
+        Returns:
+            numpy.ndarray: The packed mirrored states.
+        """
+        positions = unpack_positions(states, len(self.tiles))
+        mirrored = np.empty_like(positions)
+        mirrored[:, self._mirror_columns] = self._mirror_cells[positions]
+        return pack_positions(mirrored)
+
+    def canonical(self, states):
+        """
+        Replaces every packed state by the smaller of itself and its mirror, when the search is symmetric.
+
+        Args:
+            states (numpy.ndarray): A (count,) uint64 array of packed states.
+
+        Returns:
+            numpy.ndarray: The canonical states, the given array if the search is not symmetric.
+        """
+        if not self.symmetric:
+            return states
+        return np.minimum(states, self.mirror(states))
+
+    def expand(self, states):
+        """
+        Generates the children of packed states.
+
+        Args:
+            states (numpy.ndarray): A (count,) uint64 array of packed states.
+
+        Returns:
+            tuple: (children, parents), a uint64 array of the packed children and the index of every child's parent.
+        """
+        positions = unpack_positions(states, len(self.tiles))
+        targets = self._neighbours[positions[:, 0]]
+        parents, directions = np.nonzero(targets >= 0)
+        targets = targets[parents, directions]
+
+        children = positions[parents]
+        # the tracked tile on the target cell, if any, takes the empty tile's cell
+        moved = children[:, 1:] == targets[:, None]
+        children[:, 1:][moved] = np.repeat(children[:, 0], moved.sum(axis=1))
+        children[:, 0] = targets
+        return pack_positions(children), parents
+
+    def _next_layer(self, interrupt_event):
+        """
+        Builds the next layer from the last one.
+
+        Returns:
+            bool: False if the search was interrupted, the partial layer is thrown away then.
+        """
+        depth = len(self.layers)
+        layer = self.layer(depth - 1)
+        runs = []
+        for start in range(0, len(layer), self.chunk_records):
+            if interrupt_event is not None and interrupt_event.is_set():
+                for run in runs:
+                    os.remove(run)
+                return False
+            children, _ = self.expand(np.array(layer[start:start + self.chunk_records]))
+            # the mirrors of a layer's states are as deep as them, so canonical children never skip a layer
+            children = self.canonical(children)
+            run = os.path.join(self.directory, f"run_{depth:03d}_{len(runs):05d}.bin")
+            _write_records(run, np.unique(children))
+            runs.append(run)
+
+        excluded = [self.layer_path(previous) for previous in range(max(0, depth - 2), depth)]
+        count = _merge_runs(runs, excluded, self.layer_path(depth), self.chunk_records)
+        for run in runs:
+            os.remove(run)
+
+        if count == 0:
+            os.remove(self.layer_path(depth))
+            self.complete = True
+        else:
+            self.layers.append(count)
+        self._save_manifest()
+        return True
+
+    def find(self, state):
+        """
+        Finds the depth of a packed state among the finished layers with a binary search per layer.
+
+        Args:
+            state (int): The packed state, canonical or not.
+
+        Returns:
+            int: The depth, or None if no finished layer holds the state.
+        """
+        state = self.canonical(np.array([state], dtype=np.uint64))[0]
+        for depth in range(len(self.layers)):
+            layer = self.layer(depth)
+            index = int(np.searchsorted(layer, state))
+            if index < len(layer) and layer[index] == state:
+                return depth
+        return None
+
+    def run(self, interrupt_event=None, goal=None, max_depth=None):
+        """
+        Builds layers until the goal is found, max_depth is reached, the states run out or the search is interrupted.
+
+        Args:
+            interrupt_event (multiprocessing.Event): An event to interrupt the search.
+            goal (int): A packed state to stop at.
+            max_depth (int): The deepest layer to build.
+
+        Returns:
+            int: The depth of the goal, or None if it was not found.
+        """
+        if goal is not None:
+            goal = self.canonical(np.array([goal], dtype=np.uint64))[0]
+            depth = self.find(goal)
+            if depth is not None:
+                return depth
+
+        while not self.complete and (max_depth is None or len(self.layers) <= max_depth):
+            if not self._next_layer(interrupt_event):
+                return None
+            if goal is not None and not self.complete:
+                layer = self.layer(len(self.layers) - 1)
+                index = int(np.searchsorted(layer, np.uint64(goal)))
+                if index < len(layer) and layer[index] == goal:
+                    return len(self.layers) - 1
+        return None
+
+    def path_to(self, state, depth):
+        """
+        Walks back from a state to the start, each step finds a child of the state in the layer above it.
+        Only valid when every tile is tracked, then a step back undoes exactly one move.
+
+        Args:
+            state (int): The packed state.
+            depth (int): The depth of the state.
+
+        Returns:
+            list of int: The values of the tiles moved from the start to the state.
+
+        Raises:
+            ValueError: If the search is symmetric.
+        """
+        if self.symmetric:
+            raise ValueError("a symmetric search keeps the distances but cannot walk back a path")
+        moves = []
+        state = np.uint64(state)
+        for previous in range(depth - 1, -1, -1):
+            layer = self.layer(previous)
+            children, _ = self.expand(np.array([state], dtype=np.uint64))
+            indexes = np.searchsorted(layer, children)
+            found = np.nonzero((indexes < len(layer)) & (layer[np.minimum(indexes, len(layer) - 1)] == children))[0]
+            parent = children[found[0]]
+            # the tile that moved from the parent to the state stands where the parent's empty tile was
+            positions = unpack_positions(np.array([state, parent], dtype=np.uint64), len(self.tiles))
+            moved = np.nonzero(positions[0, 1:] == positions[1, 0])[0]
+            moves.append(self.tiles[1 + int(moved[0])])
+            state = parent
+        moves.reverse()
+        return moves
+
+    def histogram(self):
+        """ Returns the number of states of every finished layer. """
+        return list(self.layers)
+
+
+def external_bfs_solve(board, interrupt_event, directory=None, chunk_records=DEFAULT_CHUNK_RECORDS):
+    """
+    Solves a board with a disk-backed breadth-first search.
+
+    Parameters:
+    - board (numpy.ndarray): The current state of the sliding tile board, at most 4x4.
+    - interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+    - directory (str): The scratch directory, a search already in it is resumed. A temporary directory
+      that is removed afterwards is used by default.
+    - chunk_records (int): The number of states expanded, sorted or merged at once.
+
+    Returns:
+    - tuple: A tuple containing the path (list) and the total number of states in the layers that were built.
+    """
+    if not TilesBoardCore.is_solvable(board):
+        return None, 0
+
+    scratch = directory or tempfile.mkdtemp(prefix="external_bfs_")
+    try:
+        search = ExternalBFS(scratch, len(board), board, chunk_records=chunk_records)
+        goal_board = TilesBoardCore.generate_goal_state(len(board))
+        goal = int(pack_positions(board_positions(goal_board, search.tiles))[0])
+        depth = search.run(interrupt_event, goal=goal)
+        if depth is None:
+            return None, sum(search.layers)
+        return search.path_to(goal, depth), sum(search.layers)
+    finally:
+        if directory is None:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def build_distance_table(directory, board_size, tiles=None, interrupt_event=None,
+                         chunk_records=DEFAULT_CHUNK_RECORDS, symmetric=False):
+    """
+    Builds a distance table or pattern database on disk by searching back from the goal.
+    With every tile tracked layer d holds the boards whose shortest solution has d moves,
+    with a few tiles tracked it holds the patterns that take d moves of any tile to place the tracked tiles.
+    The goal is its own mirror, so a mirrored board is as far from it as the board and a symmetric table
+    only stores one of them.
+
+    Args:
+        directory (str): The scratch directory, a build already in it is resumed.
+        board_size (int): The size of the board, at most 4.
+        tiles (list of int): The tracked tiles besides the empty tile, all tiles by default.
+        interrupt_event (multiprocessing.Event): An event to interrupt the build, it can be resumed later.
+        chunk_records (int): The number of states expanded, sorted or merged at once.
+        symmetric (bool): True to store one board or pattern of every mirrored pair,
+            the mirror of every tracked tile must be tracked too.
+
+    Returns:
+        ExternalBFS: The search, complete unless it was interrupted.
+    """
+    goal = TilesBoardCore.generate_goal_state(board_size)
+    search = ExternalBFS(directory, board_size, goal, tiles, chunk_records, symmetric)
+    search.run(interrupt_event)
+    return search
+
+
+def table_distance(search, board):
+    """
+    Looks a board up in a distance table or pattern database.
+
+    Args:
+        search (ExternalBFS): A search built by build_distance_table.
+        board (numpy.ndarray): The board.
+
+    Returns:
+        int: The distance of the board's tracked tiles, or None if it is not in the finished layers.
+    """
+    return search.find(int(pack_positions(board_positions(board, search.tiles))[0]))
+
+
+def main(argv=None):
+    """
+    Solves a board or builds a distance table from the command line.
+
+    Args:
+        argv (list of str): The arguments, defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="Disk-backed breadth-first search for sliding tile boards.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    solve_parser = subparsers.add_parser("solve", help="Solves a board")
+    solve_parser.add_argument("size", type=int, help="The size of the board")
+    solve_parser.add_argument("board", help="The tiles of the board row by row, separated by spaces")
+    table_parser = subparsers.add_parser("table", help="Builds a distance table or pattern database")
+    table_parser.add_argument("size", type=int, help="The size of the board")
+    table_parser.add_argument("--tiles", type=int, nargs="+", default=None, help="The tiles of the pattern")
+    table_parser.add_argument("--symmetric", action="store_true",
+                              help="Store one of every pair of mirrored states, the tiles must include their mirrors")
+    for subparser in (solve_parser, table_parser):
+        subparser.add_argument("--dir", default=None, help="The scratch directory, resumed if it holds a search")
+        subparser.add_argument("--chunk", type=int, default=DEFAULT_CHUNK_RECORDS,
+                               help="The number of states handled at once")
+    args = parser.parse_args(argv)
+
+    if args.command == "solve":
+        board = np.array([int(value) for value in args.board.split()]).reshape((args.size, args.size))
+        path, total = external_bfs_solve(board, None, args.dir, args.chunk)
+        print(json.dumps({"path": path, "length": None if path is None else len(path), "states": total}))
+    else:
+        directory = args.dir or tempfile.mkdtemp(prefix="distance_table_")
+        search = build_distance_table(directory, args.size, args.tiles, chunk_records=args.chunk,
+                                      symmetric=args.symmetric)
+        print(json.dumps({"directory": directory, "complete": search.complete, "layers": search.histogram()}))
+
+
+if __name__ == "__main__":
+    main()
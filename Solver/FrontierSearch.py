@@ -0,0 +1,253 @@
+"""
+Provides a breadth-first frontier search that keeps only the layers it is expanding in memory.
+
+The sliding tile graph is undirected and has no odd cycles, so the children of a layer are either in the layer
+before it or in the layer after it. Every state of a layer remembers which operators (directions of the empty
+tile) lead back to the layer before it, and those operators are never applied again, so the next layer is built
+without storing the previous one. A layer maps the packed state to its used operators and its empty tile's cell.
+
+A frontier search does not keep parents, so a solution is rebuilt by divide and conquer: a bidirectional
+frontier search finds the length of a shortest solution and a state in its middle, then both halves are solved
+the same way until every part is a single move.
+
+Classes:
+    - FrontierSearch: Frontier searches on boards of one size.
+
+Functions:
+    - frontier_bfs: Solves a board with a bidirectional frontier search.
+    - frontier_histogram: Counts the states of every layer of a breadth-first search.
+"""
+
+import numpy as np
+from Solver import TilesBoardCore
+
+# the directions of the empty tile, opposite directions differ in the lowest bit
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+# the bits of a layer's value below the empty tile's cell hold the used operators
+_USED_BITS = 4
+_USED_MASK = (1 << _USED_BITS) - 1
+# how many states are expanded between two checks of the interrupt event
+INTERRUPT_CHECK_INTERVAL = 4096
+
+
+class _Interrupted(Exception):
+    """ Raised inside a search when its interrupt event is set. """
+
+
+class FrontierSearch:
+    """
+    Frontier searches on boards of one size.
+
+    A state is packed into an int with width bits per cell, the value of the tile on cell c in bits
+    c * width to (c + 1) * width, so a move is two XORs.
+
+    Attributes:
+        board_size (int): The size of the boards.
+        width (int): The number of bits per cell.
+        moves (list): For every cell of the empty tile, the (direction, cell) pairs it can move to.
+        expanded (int): The number of states expanded so far.
+        interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+    """
+
+    def __init__(self, board_size, interrupt_event=None):
+        """
+        Initializes a FrontierSearch object.
+
+        Args:
+            board_size (int): The size of the boards.
+            interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+        """
+        self.board_size = board_size
+        self.width = 4 if board_size * board_size <= 16 else 8
+        self._mask = (1 << self.width) - 1
+        self.moves = []
+        for cell in range(board_size * board_size):
+            row, col = divmod(cell, board_size)
+            cell_moves = []
+            for direction, (move_row, move_col) in ((UP, (row - 1, col)), (DOWN, (row + 1, col)),
+                                                    (LEFT, (row, col - 1)), (RIGHT, (row, col + 1))):
+                if 0 <= move_row < board_size and 0 <= move_col < board_size:
+                    cell_moves.append((direction, move_row * board_size + move_col))
+            self.moves.append(cell_moves)
+        self.expanded = 0
+        self.interrupt_event = interrupt_event
+
+    def pack(self, board):
+        """
+        Packs a board into an int.
+
+        Args:
+            board (numpy.ndarray): The board.
+
+        Returns:
+            tuple: The packed state and the cell of its empty tile.
+        """
+        state = 0
+        zero = 0
+        for cell, value in enumerate(np.asarray(board).ravel().tolist()):
+            state |= value << (cell * self.width)
+            if value == 0:
+                zero = cell
+        return state, zero
+
+    def expand(self, layer):
+        """
+        Builds the layer after a layer.
+
+        Args:
+            layer (dict): Maps every state of the layer to its used operators and its empty tile's cell.
+
+        Returns:
+            dict: The next layer.
+        """
+        width = self.width
+        mask = self._mask
+        moves = self.moves
+        next_layer = {}
+        for state, info in layer.items():
+            self.expanded += 1
+            if self.interrupt_event is not None and self.expanded % INTERRUPT_CHECK_INTERVAL == 0 \
+                    and self.interrupt_event.is_set():
+                raise _Interrupted()
+
+            used = info & _USED_MASK
+            zero = info >> _USED_BITS
+            for direction, cell in moves[zero]:
+                if used >> direction & 1:
+                    # this operator leads back to the previous layer
+                    continue
+                tile = (state >> (cell * width)) & mask
+                child = state ^ (tile << (cell * width)) ^ (tile << (zero * width))
+                back = 1 << (direction ^ 1)
+                known = next_layer.get(child)
+                next_layer[child] = (cell << _USED_BITS | back) if known is None else known | back
+
+        return next_layer
+
+    def midpoint(self, start, start_zero, goal, goal_zero):
+        """
+        Searches from both ends at once, always expanding the smaller frontier, until the frontiers share a state.
+
+        Args:
+            start (int): The packed first state.
+            start_zero (int): The cell of its empty tile.
+            goal (int): The packed last state.
+            goal_zero (int): The cell of its empty tile.
+
+        Returns:
+            tuple: (start_depth, goal_depth, middle, middle_zero), a state on a shortest path start_depth moves
+            from the start and goal_depth moves from the goal, or None if the states are not connected.
+        """
+        if start == goal:
+            return 0, 0, start, start_zero
+
+        forward = {start: start_zero << _USED_BITS}
+        backward = {goal: goal_zero << _USED_BITS}
+        forward_depth = backward_depth = 0
+        while forward and backward:
+            if len(forward) <= len(backward):
+                forward = self.expand(forward)
+                forward_depth += 1
+            else:
+                backward = self.expand(backward)
+                backward_depth += 1
+
+            # layers only meet once their depths add up to the distance, so the first shared state is on a shortest path
+            smaller, larger = (forward, backward) if len(forward) <= len(backward) else (backward, forward)
+            for state in smaller:
+                if state in larger:
+                    return forward_depth, backward_depth, state, forward[state] >> _USED_BITS
+
+        return None
+
+    def solve(self, start, start_zero, goal, goal_zero):
+        """
+        Finds a shortest path between two states by divide and conquer.
+
+        Args:
+            start (int): The packed first state.
+            start_zero (int): The cell of its empty tile.
+            goal (int): The packed last state.
+            goal_zero (int): The cell of its empty tile.
+
+        Returns:
+            list of int: The values of the moved tiles, or None if the states are not connected.
+        """
+        found = self.midpoint(start, start_zero, goal, goal_zero)
+        if found is None:
+            return None
+
+        start_depth, goal_depth, middle, middle_zero = found
+        if start_depth + goal_depth == 0:
+            return []
+        if start_depth + goal_depth == 1:
+            # the tile next to the start's empty tile that the goal's empty tile replaced
+            return [(start >> (goal_zero * self.width)) & self._mask]
+
+        return (self.solve(start, start_zero, middle, middle_zero) +
+                self.solve(middle, middle_zero, goal, goal_zero))
+
+    def histogram(self, start, start_zero, max_depth=None):
+        """
+        Counts the states of every layer of a breadth-first search from a state.
+
+        Args:
+            start (int): The packed first state.
+            start_zero (int): The cell of its empty tile.
+            max_depth (int): The deepest layer to count, all layers by default.
+
+        Returns:
+            list of int: The number of states at every depth.
+        """
+        layer = {start: start_zero << _USED_BITS}
+        counts = []
+        while layer and (max_depth is None or len(counts) <= max_depth):
+            counts.append(len(layer))
+            layer = self.expand(layer)
+        return counts
+
+
+def frontier_bfs(board, interrupt_event):
+    """
+    Solves a board with a bidirectional frontier search, which keeps only the frontiers in memory
+    and rebuilds a shortest path by divide and conquer.
+
+    Parameters:
+    - board (numpy.ndarray): The current state of the sliding tile board.
+    - interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+
+    Returns:
+    - tuple: A tuple containing the path (list) and the total number of states expanded during the search.
+    """
+    if not TilesBoardCore.is_solvable(board):
+        return None, 0
+
+    search = FrontierSearch(len(board), interrupt_event)
+    start, start_zero = search.pack(board)
+    goal, goal_zero = search.pack(TilesBoardCore.generate_goal_state(len(board)))
+    try:
+        path = search.solve(start, start_zero, goal, goal_zero)
+    except _Interrupted:
+        return None, search.expanded
+
+    return path, search.expanded
+
+
+def frontier_histogram(board, max_depth=None, interrupt_event=None):
+    """
+    Counts the states of every layer of a breadth-first search from a board, holding only two layers at a time.
+
+    Args:
+        board (numpy.ndarray): The board the search starts from, the goal state gives the distance histogram.
+        max_depth (int): The deepest layer to count, all layers by default.
+        interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+
+    Returns:
+        list of int: The number of states at every depth, None if the search was interrupted.
+    """
+    search = FrontierSearch(len(board), interrupt_event)
+    start, start_zero = search.pack(board)
+    try:
+        return search.histogram(start, start_zero, max_depth)
+    except _Interrupted:
+        return None
@@ -0,0 +1,208 @@
+"""
+Provides precomputed heuristic tables for the sliding tile search algorithms.
+
+A table for a board size is a (tiles, positions) array where table[tile, position] is the heuristic
+cost of that tile standing on that position (positions are numbered row by row),
+so the heuristic of a whole board is a single lookup and sum.
+Tables are built once per process and cached, preload_tables lets the solver process build them
+before it starts taking tasks.
+
+Functions:
+    - misplaced_axes_table: Returns the table counting the rows and columns a tile is out of place in.
+    - manhattan_table: Returns the table of the Manhattan distance of a tile from its goal position.
+    - preload_tables: Builds the tables for the given board sizes.
+    - board_heuristic: Calculates the misplaced axes heuristic score of a board.
+    - manhattan_heuristic: Calculates the Manhattan distance heuristic score of a board.
+    - heuristic_table: Returns the table behind a heuristic function.
+    - batch_scores: Calculates the heuristic scores of a batch of boards at once.
+"""
+
+import numpy as np
+
+# board sizes the solver process builds tables for before taking any task
+DEFAULT_PRELOAD_SIZES = tuple(range(2, 11))
+
+_MISPLACED_AXES_TABLES = {}
+_MANHATTAN_TABLES = {}
+_POSITIONS = {}
+
+
+def _build_misplaced_axes_table(board_size):
+    """
+    Builds the misplaced axes table for a board size.
+
+    Args:
+        board_size (int): The size of the board.
+
+    Returns:
+        numpy.ndarray: The table.
+    """
+    cells = np.arange(board_size * board_size)
+    rows, cols = np.divmod(cells, board_size)
+    # table[tile, position]: the tile's goal position is its own value
+    table = (rows[:, None] != rows[None, :]).astype(np.int32) + (cols[:, None] != cols[None, :])
+    # the zero tile is not counted
+    table[0, :] = 0
+    table.setflags(write=False)
+    return table
+
+
+def _build_manhattan_table(board_size):
+    """
+    Builds the Manhattan distance table for a board size.
+
+    Args:
+        board_size (int): The size of the board.
+
+    Returns:
+        numpy.ndarray: The table.
+    """
+    cells = np.arange(board_size * board_size)
+    rows, cols = np.divmod(cells, board_size)
+    table = np.abs(rows[:, None] - rows[None, :]).astype(np.int32) + np.abs(cols[:, None] - cols[None, :])
+    table[0, :] = 0
+    table.setflags(write=False)
+    return table
+
+
+def _get_table(tables, build_table, board_size):
+    """
+    Returns a cached table, building it on first use.
+
+    Args:
+        tables (dict): The cache of the table kind.
+        build_table (function): Builds the table kind for a board size.
+        board_size (int): The size of the board.
+
+    Returns:
+        numpy.ndarray: The table.
+    """
+    table = tables.get(board_size)
+    if table is None:
+        table = build_table(board_size)
+        tables[board_size] = table
+        _POSITIONS[board_size] = np.arange(board_size * board_size)
+
+    return table
+
+
+def misplaced_axes_table(board_size):
+    """
+    Returns the table that scores a tile with 1 for being out of its goal row
+    and 1 for being out of its goal column.
+
+    Args:
+        board_size (int): The size of the board.
+
+    Returns:
+        numpy.ndarray: A read only (tiles, positions) table.
+    """
+    return _get_table(_MISPLACED_AXES_TABLES, _build_misplaced_axes_table, board_size)
+
+
+def manhattan_table(board_size):
+    """
+    Returns the table that scores a tile with the number of rows plus the number of columns
+    between it and its goal position.
+
+    Args:
+        board_size (int): The size of the board.
+
+    Returns:
+        numpy.ndarray: A read only (tiles, positions) table.
+    """
+    return _get_table(_MANHATTAN_TABLES, _build_manhattan_table, board_size)
+
+
+def preload_tables(board_sizes=DEFAULT_PRELOAD_SIZES):
+    """
+    Builds the tables for the given board sizes so that no task pays for building them.
+
+    Args:
+        board_sizes (iterable of int): The board sizes to build tables for.
+    """
+    for board_size in board_sizes:
+        misplaced_axes_table(board_size)
+        manhattan_table(board_size)
+
+
+def _table_score(board, table):
+    """
+    Sums the scores of every tile of a board in a (tiles, positions) table.
+
+    Args:
+        board (numpy.ndarray): A square board of tile values.
+        table (numpy.ndarray): The table of the board's size.
+
+    Returns:
+        int: The score.
+    """
+    return int(table[np.asarray(board, dtype=int).ravel(), _POSITIONS[len(board)]].sum())
+
+
+def board_heuristic(board):
+    """
+    Calculates the misplaced axes heuristic score of a board.
+
+    Args:
+        board (numpy.ndarray): A square board of tile values.
+
+    Returns:
+        int: The heuristic score for the board.
+    """
+    return _table_score(board, misplaced_axes_table(len(board)))
+
+
+def manhattan_heuristic(board):
+    """
+    Calculates the Manhattan distance heuristic score of a board.
+
+    Args:
+        board (numpy.ndarray): A square board of tile values.
+
+    Returns:
+        int: The heuristic score for the board.
+    """
+    return _table_score(board, manhattan_table(len(board)))
+
+
+HEURISTIC_MAP = {"misplaced-axes": board_heuristic, "manhattan": manhattan_heuristic}
+# the table every table based heuristic function sums
+_HEURISTIC_TABLES = {board_heuristic: misplaced_axes_table, manhattan_heuristic: manhattan_table}
+
+
+def heuristic_table(heuristic_func, board_size):
+    """
+    Returns the table behind a heuristic function.
+
+    Args:
+        heuristic_func (function): A heuristic function, one of HEURISTIC_MAP.
+        board_size (int): The size of the board.
+
+    Returns:
+        numpy.ndarray: The (tiles, positions) table, or None if the function is not table based.
+    """
+    get_table = _HEURISTIC_TABLES.get(heuristic_func)
+    return None if get_table is None else get_table(board_size)
+
+
+def batch_scores(boards, board_size, heuristic_func=board_heuristic):
+    """
+    Calculates the heuristic scores of a batch of boards at once.
+    Table based heuristics are a single fancy-indexed lookup and sum over the whole batch,
+    any other heuristic function is called on every board.
+
+    Args:
+        boards (numpy.ndarray): A (count, cells) array of boards flattened row by row.
+        board_size (int): The size of the boards.
+        heuristic_func (function): The heuristic function.
+
+    Returns:
+        numpy.ndarray: A (count,) array of scores.
+    """
+    table = heuristic_table(heuristic_func, board_size)
+    if table is None:
+        return np.array([heuristic_func(board.reshape((board_size, board_size))) for board in boards],
+                        dtype=np.int64)
+
+    return table[boards, _POSITIONS[board_size]].sum(axis=1)
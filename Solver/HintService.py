@@ -0,0 +1,175 @@
+"""
+Provides the HintService class that answers hint requests for the board the user is playing.
+
+A hint is the next move of a solution of the user's current position. The service remembers the solution
+it last computed for every board id together with the position after each of its moves,
+so as long as the user follows the hints, the next one is a dictionary lookup. The mirror of a remembered
+position about the main diagonal (see Symmetry) is as far from the goal, so it is answered from the remembered
+solution too, with every move mirrored.
+When the user deviates, 2x2 and 3x3 boards are re-solved optimally from the finish table in microseconds.
+On larger boards, a position one move away from the remembered solution gets the solution spliced
+(the move back, then the rest of the old solution); only positions further away are re-solved
+by the constructive solver.
+
+Classes:
+    - HintService: Answers hint requests, reusing the solution of the previous position.
+"""
+
+from collections import OrderedDict
+import threading
+import numpy as np
+from Solver import TilesBoardCore
+from Solver.ConstructiveSolver import constructive_solve, table_path, FINISH_SIZE
+from Solver.Symmetry import mirror_board, mirror_moves
+from Solver.TilesSolverMsgs import TilesSolverHint
+
+# the number of boards whose solutions are remembered
+DEFAULT_MAX_BOARDS = 8
+
+
+class _CachedSolution:
+    """
+    A solution and the position after each of its moves.
+
+    Attributes:
+        moves (list of int): The values of the moved tiles.
+        positions (dict): Maps the bytes of every position along the solution to the index of its next move.
+    """
+
+    def __init__(self, board, moves):
+        self.moves = moves
+        self.positions = {}
+        state = bytearray(np.asarray(board, dtype=np.uint8).tobytes())
+        zero = state.index(0)
+        self.positions[bytes(state)] = 0
+        for index, move in enumerate(moves):
+            cell = state.index(move)
+            state[zero], state[cell] = move, 0
+            zero = cell
+            self.positions[bytes(state)] = index + 1
+
+
+class HintService:
+    """
+    Answers hint requests, reusing the solution of the previous position of the same board id.
+    It is safe to use from several threads.
+
+    Attributes:
+        max_boards (int): The number of boards whose solutions are remembered.
+        solutions (collections.OrderedDict): The remembered solution of every board id, least recently used first.
+        hits (int): The number of hints answered from a remembered solution.
+        splices (int): The number of hints answered by splicing a remembered solution.
+        solves (int): The number of hints that needed a new solution.
+    """
+
+    def __init__(self, max_boards=DEFAULT_MAX_BOARDS):
+        """
+        Initializes a HintService object.
+
+        Args:
+            max_boards (int): The number of boards whose solutions are remembered.
+        """
+        self.max_boards = max_boards
+        self.solutions = OrderedDict()
+        self.hits = 0
+        self.splices = 0
+        self.solves = 0
+        self._lock = threading.Lock()
+        # the hint solvers are never interrupted, they run for milliseconds at most
+        self._never_set = threading.Event()
+
+    def hint(self, hint_request):
+        """
+        Answers a hint request.
+
+        Args:
+            hint_request (TilesSolverHintRequest): The request.
+
+        Returns:
+            TilesSolverHint: The next move of the board.
+        """
+        board = np.asarray(hint_request.tiles_board)
+        key = board.astype(np.uint8).tobytes()
+        with self._lock:
+            cached = self.solutions.get(hint_request.board_id)
+            if cached is not None:
+                self.solutions.move_to_end(hint_request.board_id)
+                index = cached.positions.get(key)
+                if index is not None:
+                    self.hits += 1
+                    return self._make_hint(cached, index, hint_request.board_id)
+
+                index = cached.positions.get(mirror_board(board).astype(np.uint8).tobytes())
+                if index is not None:
+                    # the mirrored rest of the solution solves the mirror of a position on it
+                    self.hits += 1
+                    cached = _CachedSolution(board, mirror_moves(cached.moves[index:], len(board)))
+                    self.solutions[hint_request.board_id] = cached
+                    return self._make_hint(cached, 0, hint_request.board_id)
+
+            cached = self._splice(board, cached) if cached is not None else None
+            if cached is None:
+                moves = self._solve(board)
+                if moves is None:
+                    return TilesSolverHint(None, None, hint_request.board_id)
+                cached = _CachedSolution(board, moves)
+                self.solves += 1
+            else:
+                self.splices += 1
+
+            self.solutions[hint_request.board_id] = cached
+            self.solutions.move_to_end(hint_request.board_id)
+            while len(self.solutions) > self.max_boards:
+                self.solutions.popitem(last=False)
+
+            return self._make_hint(cached, 0, hint_request.board_id)
+
+    @staticmethod
+    def _make_hint(cached, index, board_id):
+        """ Builds the hint of the position before move index of a solution. """
+        if index == len(cached.moves):
+            return TilesSolverHint(None, 0, board_id)
+        return TilesSolverHint(int(cached.moves[index]), len(cached.moves) - index - 1, board_id)
+
+    def _splice(self, board, cached):
+        """
+        Reuses a remembered solution for a position one move away from it, on boards too large for the table.
+
+        Args:
+            board (numpy.ndarray): The position.
+            cached (_CachedSolution): The remembered solution.
+
+        Returns:
+            _CachedSolution: The move back followed by the rest of the remembered solution, or None.
+        """
+        board_size = len(board)
+        if board_size <= FINISH_SIZE:
+            return None
+
+        zero_row, zero_col = np.argwhere(board == 0)[0]
+        for row, col in TilesBoardCore.find_possible_moves(board_size, zero_row, zero_col):
+            neighbour = board.astype(np.uint8)
+            move = int(neighbour[row, col])
+            neighbour[zero_row, zero_col] = move
+            neighbour[row, col] = 0
+            index = cached.positions.get(neighbour.tobytes())
+            if index is not None:
+                return _CachedSolution(board, [move] + cached.moves[index:])
+        return None
+
+    def _solve(self, board):
+        """
+        Solves a position, optimally from the table for small boards and constructively for larger ones.
+
+        Args:
+            board (numpy.ndarray): The position.
+
+        Returns:
+            list of int: The values of the moved tiles, or None if the board cannot be solved.
+        """
+        if len(board) <= FINISH_SIZE:
+            return table_path(board)
+        if not TilesBoardCore.is_solvable(board):
+            return None
+        moves, _ = constructive_solve(board, self._never_set)
+        return moves
@@ -0,0 +1,233 @@
+"""
+Provides finite state machines that prune duplicate move sequences from depth-first searches.
+
+Many move sequences lead from a board to the same board: a move followed by its inverse leads back, and the
+empty tile going twelve times around a 2x2 square, or six times in either direction, gives the same board.
+A depth-first search that tries every sequence searches the subtree below such a board once per sequence.
+
+For a board size, every sequence of up to max_length moves of the empty tile is enumerated breadth-first from
+every cell of the empty tile, in shortlex order (shorter first, then by direction). A sequence is a duplicate
+from a cell if an earlier sequence from that cell leads to the same board, and it is pruned if it is a duplicate
+from every cell it can start from. An Aho-Corasick automaton over the pruned sequences then tells, one move at
+a time, whether the moves made so far end with a pruned sequence.
+
+Every pruned sequence can be replaced by an earlier one that is legal wherever it is, so the shortlex first
+sequence of each board is never pruned: a search still finds a shortest solution, and as it tries the moves in
+direction order, a transposition table never cuts that sequence off either.
+
+Classes:
+    - MovePruning: The pruning automaton of a board size.
+
+Functions:
+    - move_pruning: Returns the pruning automaton of a board size.
+"""
+
+from collections import deque
+
+# the directions of the empty tile, the order find_possible_moves lists its moves in
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+DIRECTIONS = (UP, DOWN, LEFT, RIGHT)
+# the longest pruned sequence, the enumeration from every cell grows about threefold with every move,
+# so boards of more than LARGE_BOARD_CELLS cells enumerate shorter sequences and are built in about a second too
+DEFAULT_MAX_LENGTH = 10
+LARGE_BOARD_MAX_LENGTH = 8
+LARGE_BOARD_CELLS = 25
+# the transition of a move that completes a pruned sequence
+PRUNED = -1
+
+_AUTOMATA = {}
+
+
+def _step(cell, direction, board_size):
+    """ Returns the cell the empty tile moves to, or None if it would leave the board. """
+    row, col = divmod(cell, board_size)
+    if direction == UP:
+        row -= 1
+    elif direction == DOWN:
+        row += 1
+    elif direction == LEFT:
+        col -= 1
+    else:
+        col += 1
+    if 0 <= row < board_size and 0 <= col < board_size:
+        return row * board_size + col
+    return None
+
+
+def _duplicate_sequences(board_size, max_length):
+    """
+    Enumerates the move sequences of up to max_length moves from every cell and finds the ones to prune.
+
+    Args:
+        board_size (int): The size of the board.
+        max_length (int): The longest sequence enumerated.
+
+    Returns:
+        set of tuple: The sequences of directions that are a duplicate from every cell they can start from.
+    """
+    cells = board_size * board_size
+    duplicates = set()
+    firsts = set()
+    for start in range(cells):
+        # the tiles are told apart by their start cell, the empty tile is cells
+        board = list(range(cells))
+        board[start] = cells
+        board = bytes(board)
+        seen = {board}
+        frontier = deque([((), board, start)])
+        while frontier:
+            sequence, board, zero = frontier.popleft()
+            if len(sequence) == max_length:
+                continue
+            for direction in DIRECTIONS:
+                cell = _step(zero, direction, board_size)
+                if cell is None:
+                    continue
+                child = bytearray(board)
+                child[zero], child[cell] = child[cell], cells
+                child = bytes(child)
+                childSequence = sequence + (direction,)
+                if child in seen:
+                    # every extension of a duplicate is a duplicate from this cell too, so it is not extended
+                    duplicates.add(childSequence)
+                else:
+                    seen.add(child)
+                    firsts.add(childSequence)
+                    frontier.append((childSequence, child, cell))
+
+    return duplicates - firsts
+
+
+class MovePruning:
+    """
+    The pruning automaton of a board size.
+
+    Starting from state 0, transitions[state][direction] is the state after moving the empty tile in that
+    direction, or PRUNED if the moves made so far end with a pruned sequence.
+
+    Attributes:
+        board_size (int): The size of the board.
+        max_length (int): The longest pruned sequence.
+        sequences (int): The number of pruned sequences, before the ones holding a shorter one are dropped.
+        transitions (list of list of int): The transitions of every state.
+        directions (list of int): The direction of the move of the empty tile from cell a to a neighbouring
+            cell b at index a * cells + b.
+    """
+
+    def __init__(self, board_size, max_length=None):
+        """
+        Initializes a MovePruning object, enumerating the move sequences of the board size.
+
+        Args:
+            board_size (int): The size of the board.
+            max_length (int): The longest pruned sequence, DEFAULT_MAX_LENGTH by default
+                or LARGE_BOARD_MAX_LENGTH for boards of more than LARGE_BOARD_CELLS cells.
+        """
+        if max_length is None:
+            large = board_size * board_size > LARGE_BOARD_CELLS
+            max_length = LARGE_BOARD_MAX_LENGTH if large else DEFAULT_MAX_LENGTH
+        self.board_size = board_size
+        self.max_length = max_length
+        sequences = _duplicate_sequences(board_size, max_length)
+        self.sequences = len(sequences)
+        self.transitions = self._build_automaton(sequences)
+
+        cells = board_size * board_size
+        self.directions = [PRUNED] * (cells * cells)
+        for cell in range(cells):
+            for direction in DIRECTIONS:
+                target = _step(cell, direction, board_size)
+                if target is not None:
+                    self.directions[cell * cells + target] = direction
+
+    @staticmethod
+    def _build_automaton(sequences):
+        """
+        Builds the Aho-Corasick automaton of the pruned sequences.
+
+        Args:
+            sequences (set of tuple): The pruned sequences.
+
+        Returns:
+            list of list of int: The transitions of every state.
+        """
+        # the trie, a sequence holding a shorter pruned sequence is never reached so it is not added
+        children = [{}]
+        pruned = [False]
+        for sequence in sorted(sequences, key=len):
+            node = 0
+            for direction in sequence:
+                if pruned[node]:
+                    break
+                if direction not in children[node]:
+                    children[node][direction] = len(children)
+                    children.append({})
+                    pruned.append(False)
+                node = children[node][direction]
+            else:
+                pruned[node] = True
+
+        # breadth-first over the trie, a state's failure is the longest proper suffix of it in the trie
+        transitions = [[0] * len(DIRECTIONS) for _ in children]
+        failure = [0] * len(children)
+        queue = deque()
+        for direction in DIRECTIONS:
+            child = children[0].get(direction)
+            if child is not None:
+                transitions[0][direction] = child
+                queue.append(child)
+        while queue:
+            node = queue.popleft()
+            # a state ending with a pruned sequence is pruned, whether the sequence is the state or a suffix of it
+            pruned[node] = pruned[node] or pruned[failure[node]]
+            for direction in DIRECTIONS:
+                child = children[node].get(direction)
+                if child is None:
+                    transitions[node][direction] = transitions[failure[node]][direction]
+                else:
+                    failure[child] = transitions[failure[node]][direction]
+                    transitions[node][direction] = child
+                    queue.append(child)
+
+        return [[PRUNED if pruned[target] else target for target in row] for row in transitions]
+
+    def branching_factor(self, depth):
+        """
+        Measures the average number of moves the automaton lets through, the empty tile starting from every cell.
+
+        Args:
+            depth (int): The number of moves of the sequences counted.
+
+        Returns:
+            float: The depth-th root of the average number of sequences of that many moves.
+        """
+        cells = self.board_size * self.board_size
+        counts = {(cell, 0): 1 for cell in range(cells)}
+        for _ in range(depth):
+            nextCounts = {}
+            for (cell, state), count in counts.items():
+                for direction in DIRECTIONS:
+                    target = _step(cell, direction, self.board_size)
+                    nextState = self.transitions[state][direction]
+                    if target is not None and nextState != PRUNED:
+                        key = (target, nextState)
+                        nextCounts[key] = nextCounts.get(key, 0) + count
+            counts = nextCounts
+        return (sum(counts.values()) / cells) ** (1 / depth)
+
+
+def move_pruning(board_size):
+    """
+    Returns the pruning automaton of a board size, built on first use.
+
+    Args:
+        board_size (int): The size of the board.
+
+    Returns:
+        MovePruning: The automaton.
+    """
+    pruning = _AUTOMATA.get(board_size)
+    if pruning is None:
+        pruning = MovePruning(board_size)
+        _AUTOMATA[board_size] = pruning
+    return pruning
@@ -0,0 +1,155 @@
+"""
+Provides a portfolio solver that races several search algorithms on one board.
+
+Which algorithm finishes first depends heavily on the board, so the portfolio starts every engine of a
+configurable set in a process of its own, takes the first solution that meets the requested quality and
+cancels the other engines. Its latency is bounded by the fastest engine for the board, at the price of
+one CPU per engine while it runs.
+
+The engines are started with the solver processes' context (see TilesSolverProcess), so they start with the
+heuristic tables in memory. A daemonic process cannot start processes, so a portfolio must run in the main
+process or in a non-daemonic one.
+
+Functions:
+    - engines_for_quality: Returns the engines of a set that can meet a quality.
+    - portfolio_solve: Races several search algorithms on a board and returns the first acceptable solution.
+"""
+
+import queue
+import time
+from Solver import TilesBoardCore
+
+QUALITY_ANY = "any"
+QUALITY_OPTIMAL = "optimal"
+# the engines raced by default
+DEFAULT_ENGINES = ("BFS", "IDDFS", "GBFS", "A*")
+# the engines whose solutions are always shortest
+OPTIMAL_ENGINES = frozenset({"BFS", "Frontier BFS", "IDDFS", "A*"})
+# the names the portfolios are listed under in TilesSolver.ALGO_MAP, they cannot be engines themselves
+PORTFOLIO_ANY = "Portfolio"
+PORTFOLIO_OPTIMAL = "Portfolio (optimal)"
+# how often the portfolio checks its interrupt event while it waits for the engines, in seconds
+POLL_INTERVAL = 0.05
+# how long a cancelled engine gets to stop on its own before it is terminated, in seconds
+CANCEL_GRACE = 1.0
+
+
+def _engine_map():
+    """
+    Returns the algorithms an engine can run.
+    Imported when called and not at module level because TilesSolver lists the portfolio among its algorithms.
+    """
+    from Solver.TilesSolver import ALGO_MAP
+    return ALGO_MAP
+
+
+def _run_engine(engine_name, board, cancel_event, results):
+    """
+    The target function of an engine process, solves the board and puts the result on the results queue.
+
+    Args:
+        engine_name (str): The name of the search algorithm.
+        board (numpy.ndarray): The board to solve.
+        cancel_event (multiprocessing.Event): Set by the portfolio to stop the engine.
+        results (multiprocessing.Queue): Gets (engine_name, path, total checks), path None if not solved.
+    """
+    path, totalChecks = _engine_map()[engine_name](board, cancel_event)
+    results.put((engine_name, None if path is None else [int(move) for move in path], totalChecks))
+
+
+def engines_for_quality(engines, quality):
+    """
+    Returns the engines of a set that can meet a quality.
+
+    Args:
+        engines (iterable of str): The names of the search algorithms.
+        quality (str): QUALITY_ANY for any solution or QUALITY_OPTIMAL for a shortest one.
+
+    Returns:
+        list of str: The engines, in the given order.
+
+    Raises:
+        ValueError: If the quality is unknown or none of the engines can meet it.
+    """
+    if quality not in (QUALITY_ANY, QUALITY_OPTIMAL):
+        raise ValueError(f"unknown quality {quality!r}, expected {QUALITY_ANY!r} or {QUALITY_OPTIMAL!r}")
+
+    algo_map = _engine_map()
+    selected = []
+    for engine_name in engines:
+        if engine_name not in algo_map or engine_name in (PORTFOLIO_ANY, PORTFOLIO_OPTIMAL):
+            raise ValueError(f"{engine_name!r} cannot be a portfolio engine")
+        if quality == QUALITY_ANY or engine_name in OPTIMAL_ENGINES:
+            selected.append(engine_name)
+
+    if not selected:
+        raise ValueError(f"none of the engines {list(engines)} finds {quality} solutions")
+    return selected
+
+
+def portfolio_solve(board, interrupt_event, engines=DEFAULT_ENGINES, quality=QUALITY_ANY, stats=None):
+    """
+    Races several search algorithms on a board, each in its own process, and returns the first solution
+    that meets the quality. The other engines are cancelled as soon as it arrives.
+    With QUALITY_OPTIMAL only the engines that find shortest solutions are started.
+
+    Parameters:
+    - board (numpy.ndarray): The current state of the sliding tile board.
+    - interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+    - engines (iterable of str): The names of the search algorithms to race.
+    - quality (str): QUALITY_ANY for the first solution or QUALITY_OPTIMAL for the first shortest one.
+    - stats (dict): If given, gets the "winner" engine (None if no engine solved the board), the "seconds"
+      until it answered and the "finished" engines with their solution length and checks.
+
+    Returns:
+    - tuple: A tuple containing the path (list) and the total number of states checked by the winning engine.
+    """
+    selected = engines_for_quality(engines, quality)
+    if not TilesBoardCore.is_solvable(board):
+        return None, 0
+
+    # imported here for the same reason as in _engine_map, TilesSolverProcess imports TilesSolver
+    from Solver.TilesSolverProcess import get_solver_context
+    context = get_solver_context()
+    cancel_event = context.Event()
+    results = context.Queue()
+    processes = [context.Process(target=_run_engine, args=(engine_name, board, cancel_event, results),
+                                 name=f"PortfolioEngine-{engine_name}", daemon=True)
+                 for engine_name in selected]
+
+    start = time.perf_counter()
+    finished = {}
+    winner = None
+    path, totalChecks = None, 0
+    try:
+        for process in processes:
+            process.start()
+
+        while len(finished) < len(processes) and not interrupt_event.is_set():
+            try:
+                engine_name, engine_path, engine_checks = results.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    # every engine is gone without answering, e.g. killed
+                    break
+                continue
+
+            finished[engine_name] = (None if engine_path is None else len(engine_path), engine_checks)
+            if engine_path is not None:
+                winner, path, totalChecks = engine_name, engine_path, engine_checks
+                break
+    finally:
+        cancel_event.set()
+        deadline = time.monotonic() + CANCEL_GRACE
+        for process in processes:
+            if process.pid is None:
+                continue
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        results.close()
+
+    if stats is not None:
+        stats.update(winner=winner, seconds=time.perf_counter() - start, finished=finished)
+    return path, totalChecks
@@ -0,0 +1,308 @@
+"""
+Provides a real-time search (LRTA*) that commits one move at a time within a fixed time per move.
+
+Every move is chosen by a bounded lookahead from the current board: a depth-first search scores the boards a few
+moves away with the number of moves to them plus their heuristic, one move deeper for as long as the move's time
+lasts, and the move towards the best score is committed. The current board then learns that score as its
+heuristic if it is higher than what it had (the learning step of LRTA*), so the search does not run in circles
+for long. The heuristic starts from the Manhattan distance and the learned values are kept in a LearnedHeuristic,
+which the solver process keeps across games and saves to a file, so a position met in an earlier game
+is played from what was learned about it then.
+
+The latency of a move is bounded by move_time whatever the board size, a larger board only gets a shallower
+lookahead.
+
+Classes:
+    - LearnedHeuristic: The heuristic values learned by the real-time search, persisted between games.
+
+Functions:
+    - realtime_solve: Plays a board with a real-time search, one move per move_time.
+"""
+
+import os
+import tempfile
+import time
+import numpy as np
+from Solver import Heuristics
+from Solver import TilesBoardCore
+from Solver.ConstructiveSolver import constructive_solve
+
+# the name the real-time search is listed under in TilesSolver.ALGO_MAP
+REALTIME_ALGO = "Real-time (LRTA*)"
+# the time the lookahead of every move may take, in seconds
+DEFAULT_MOVE_TIME = 0.1
+# the deepest lookahead, reached early on small boards
+MAX_LOOKAHEAD = 40
+# the number of moves after which a search that did not reach the goal is finished by the constructive solver
+DEFAULT_MAX_MOVES = 10000
+# the number of boards a LearnedHeuristic remembers, the least recently learned ones are forgotten first
+DEFAULT_MAX_STATES = 1 << 20
+# where the solver process keeps the learned heuristic between runs when no file is given
+DEFAULT_LEARNED_PATH = os.path.join(tempfile.gettempdir(), "tiles_solver_learned.npz")
+# how many boards the lookahead scores between two looks at the clock
+TIME_CHECK_INTERVAL = 256
+
+
+class _OutOfTime(Exception):
+    """ Raised inside a lookahead when the time of the move is up. """
+
+
+class LearnedHeuristic:
+    """
+    The heuristic values learned by the real-time search, persisted between games.
+
+    Attributes:
+        path (str): The file the values are loaded from and saved to, None to keep them in memory only.
+        max_states (int): The number of boards remembered.
+        values (dict): The learned value of every board, keyed by its bytes row by row, least recently learned first.
+        updates (int): The number of values learned since the object was created.
+    """
+
+    def __init__(self, path=None, max_states=DEFAULT_MAX_STATES):
+        """
+        Initializes a LearnedHeuristic object, loading the values saved in path if it exists.
+
+        Args:
+            path (str): The file the values are loaded from and saved to, None to keep them in memory only.
+            max_states (int): The number of boards remembered.
+        """
+        self.path = path
+        self.max_states = max_states
+        self.values = {}
+        self.updates = 0
+        self._dirty = False
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.values)
+
+    def get(self, state, default):
+        """
+        Returns the heuristic of a board, the learned value or the default if it is higher.
+
+        Args:
+            state (bytes): The board row by row.
+            default (int): The heuristic the search starts from.
+
+        Returns:
+            int: The heuristic.
+        """
+        learned = self.values.get(state)
+        return default if learned is None or learned < default else learned
+
+    def learn(self, state, value):
+        """
+        Stores a higher heuristic for a board.
+
+        Args:
+            state (bytes): The board row by row.
+            value (int): The new heuristic.
+        """
+        self.values.pop(state, None)
+        self.values[state] = value
+        if len(self.values) > self.max_states:
+            del self.values[next(iter(self.values))]
+        self.updates += 1
+        self._dirty = True
+
+    def load(self):
+        """ Loads the values saved in path, a file that cannot be read leaves the values empty. """
+        try:
+            with np.load(self.path) as data:
+                for name in data.files:
+                    if not name.startswith("states_"):
+                        continue
+                    cells = name[len("states_"):]
+                    for state, value in zip(data[name], data[f"values_{cells}"].tolist()):
+                        self.values[state.tobytes()] = value
+        except (OSError, ValueError, KeyError):
+            self.values = {}
+        self._dirty = False
+
+    def save(self):
+        """ Writes the values to path atomically, if any was learned since the last save. """
+        if self.path is None or not self._dirty:
+            return
+
+        by_cells = {}
+        for state, value in self.values.items():
+            states, values = by_cells.setdefault(len(state), ([], []))
+            states.append(state)
+            values.append(value)
+        arrays = {}
+        for cells, (states, values) in by_cells.items():
+            arrays[f"states_{cells}"] = np.frombuffer(b"".join(states), dtype=np.uint8).reshape((len(states), cells))
+            arrays[f"values_{cells}"] = np.array(values, dtype=np.uint16)
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # the process id keeps two solvers sharing the file from writing the same temporary file
+        partial = f"{self.path}.{os.getpid()}.partial"
+        with open(partial, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(partial, self.path)
+        self._dirty = False
+
+
+class _Lookahead:
+    """
+    The bounded lookahead of one board size, a depth-first minimin search with alpha pruning on a bytearray board
+    that is changed and restored in place.
+
+    Attributes:
+        neighbours (list): For every cell, the cells next to it.
+        table (list): The Manhattan distance of every tile on every cell, table[tile][cell].
+        learned (LearnedHeuristic): The learned heuristic.
+        deadline (float): The time.perf_counter() the lookahead must stop at, None for no limit.
+        checks (int): The number of boards scored.
+    """
+
+    def __init__(self, board_size, learned):
+        self.neighbours = [[row * board_size + col
+                            for row, col in TilesBoardCore.find_possible_moves(board_size, *divmod(cell, board_size))]
+                           for cell in range(board_size * board_size)]
+        self.table = Heuristics.manhattan_table(board_size).tolist()
+        self.learned = learned
+        self.deadline = None
+        self.checks = 0
+
+    def score(self, state, zero, distance, cost, depth, previous, alpha):
+        """
+        Scores a board with the best cost plus heuristic of the boards depth moves below it, but never below its
+        own cost plus heuristic, so what was learned about the boards inside the lookahead counts too.
+
+        Args:
+            state (bytearray): The board row by row, restored before returning.
+            zero (int): The cell of the empty tile.
+            distance (int): The Manhattan distance of the board.
+            cost (int): The number of moves from the current board to this one.
+            depth (int): The number of moves left to look ahead.
+            previous (int): The cell the empty tile came from, it does not go straight back.
+            alpha (int): The best score found so far, boards that cannot beat it are not searched.
+
+        Returns:
+            int: The score, at least alpha if no board below beats it.
+
+        Raises:
+            _OutOfTime: If the deadline passed.
+        """
+        self.checks += 1
+        if self.deadline is not None and self.checks % TIME_CHECK_INTERVAL == 0 \
+                and time.perf_counter() > self.deadline:
+            raise _OutOfTime()
+
+        if distance == 0:
+            # the goal, its cost is exact
+            return cost
+        score = cost + self.learned.get(bytes(state), distance)
+        if depth == 0 or score >= alpha:
+            return score
+
+        best = alpha
+        table = self.table
+        for cell in self.neighbours[zero]:
+            if cell == previous:
+                continue
+            tile = state[cell]
+            state[zero], state[cell] = tile, 0
+            try:
+                child = self.score(state, cell, distance - table[tile][cell] + table[tile][zero], cost + 1,
+                                   depth - 1, zero, best)
+            finally:
+                state[zero], state[cell] = 0, tile
+            if child < best:
+                best = child
+        return max(best, score)
+
+
+def realtime_solve(board, interrupt_event, move_time=DEFAULT_MOVE_TIME, learned=None, on_move=None,
+                   max_moves=DEFAULT_MAX_MOVES):
+    """
+    Plays a board with a real-time search (LRTA*), every move is committed after at most move_time of lookahead.
+    The moves are not a shortest solution, they get shorter as the heuristic learns.
+
+    Parameters:
+    - board (numpy.ndarray): The current state of the sliding tile board.
+    - interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+    - move_time (float): The time the lookahead of every move may take, in seconds.
+    - learned (LearnedHeuristic): The heuristic to learn into, a new one kept in memory by default.
+    - on_move (function): If given, called with the value of every moved tile as soon as the move is committed.
+    - max_moves (int): The number of moves after which the lookahead gives up and the board is finished
+      by the constructive solver from where it is.
+
+    Returns:
+    - tuple: A tuple containing the path (list) and the total number of states scored by the lookaheads.
+    """
+    if not TilesBoardCore.is_solvable(board):
+        return None, 0
+
+    learned = LearnedHeuristic() if learned is None else learned
+    board_size = len(board)
+    lookahead = _Lookahead(board_size, learned)
+    table = lookahead.table
+    state = bytearray(np.asarray(board, dtype=np.uint8).tobytes())
+    zero = state.index(0)
+    distance = sum(table[tile][cell] for cell, tile in enumerate(state))
+    previous = None
+    path = []
+
+    while distance != 0:
+        if interrupt_event.is_set():
+            return None, lookahead.checks
+        if len(path) >= max_moves:
+            # the moves played so far may already be on the screen, so the board is finished from where it is
+            current = np.frombuffer(bytes(state), dtype=np.uint8).reshape((board_size, board_size)).astype(int)
+            rest, _ = constructive_solve(current, interrupt_event)
+            if rest is None:
+                return None, lookahead.checks
+            for tile in rest:
+                path.append(tile)
+                if on_move is not None:
+                    on_move(tile)
+            return path, lookahead.checks
+
+        deadline = time.perf_counter() + move_time
+        moves = [(cell, distance - table[state[cell]][cell] + table[state[cell]][zero])
+                 for cell in lookahead.neighbours[zero]]
+        scores = exact = None
+        for depth in range(MAX_LOOKAHEAD):
+            # the first depth only scores the neighbours and always completes
+            lookahead.deadline = None if depth == 0 else deadline
+            try:
+                depthScores, depthExact = [], []
+                alpha = float("inf")
+                for cell, childDistance in moves:
+                    tile = state[cell]
+                    state[zero], state[cell] = tile, 0
+                    try:
+                        score = lookahead.score(state, cell, childDistance, 1, depth, zero, alpha)
+                    finally:
+                        state[zero], state[cell] = 0, tile
+                    depthScores.append(score)
+                    # a move that does not beat alpha was cut off, its score is only a bound
+                    depthExact.append(score < alpha)
+                    alpha = min(alpha, score)
+            except _OutOfTime:
+                break
+            scores, exact = depthScores, depthExact
+            if time.perf_counter() > deadline:
+                break
+
+        # the best move, going back to the previous board only on a tie if nothing else is as good,
+        # the first move with the lowest score always beat the alpha it was scored with, so there is one
+        lowest = min(scores)
+        tied = [index for index in range(len(moves)) if exact[index] and scores[index] == lowest]
+        best = min(tied, key=lambda index: moves[index][0] == previous)
+        currentKey = bytes(state)
+        if scores[best] > learned.get(currentKey, distance):
+            learned.learn(currentKey, scores[best])
+
+        cell, distance = moves[best]
+        tile = state[cell]
+        state[zero], state[cell] = tile, 0
+        previous, zero = zero, cell
+        path.append(tile)
+        if on_move is not None:
+            on_move(tile)
+
+    return path, lookahead.checks
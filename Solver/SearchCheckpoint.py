@@ -0,0 +1,209 @@
+"""
+Provides checkpoints that let an interrupted search resume where it stopped instead of starting over.
+
+A search that supports checkpoints takes a SearchCheckpoint, bound to its algorithm and board.
+When it is interrupted it saves a snapshot of its state (its frontier, the states it reached, its counters,
+the bound of IDDFS) and returns; when the same board is given to the same algorithm again, it loads the
+snapshot and carries on from it. The snapshot is removed once the search ran to completion.
+
+The snapshots are kept in memory, least recently saved first, and written to a directory too if the
+CheckpointStore has one. A search then also saves a snapshot every interval seconds while it runs,
+so a solver process or server worker that is restarted resumes from the directory what an earlier
+one had searched. The files are pickles, the directory must only be writable by the solver.
+
+Classes:
+    - SearchCheckpoint: The checkpoint of one algorithm on one board.
+    - CheckpointStore: Keeps the snapshots of interrupted searches in memory and optionally on disk.
+"""
+
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+import numpy as np
+
+# the number of snapshots kept in memory, a snapshot holds the whole frontier of a search
+DEFAULT_MAX_SNAPSHOTS = 4
+# the seconds between two snapshots of a running search written to the directory
+DEFAULT_INTERVAL = 30.0
+# the suffix of the snapshot files
+CHECKPOINT_SUFFIX = ".ckpt"
+
+
+class SearchCheckpoint:
+    """
+    The checkpoint of one algorithm on one board, the handle a search saves to and loads from.
+
+    Attributes:
+        store (CheckpointStore): The store keeping the snapshot.
+        key (str): The key of the algorithm and board in the store.
+        resumed (bool): True once a snapshot was loaded.
+    """
+
+    def __init__(self, store, key):
+        """
+        Initializes a SearchCheckpoint object. Use CheckpointStore.checkpoint instead of calling this directly.
+
+        Args:
+            store (CheckpointStore): The store keeping the snapshot.
+            key (str): The key of the algorithm and board in the store.
+        """
+        self.store = store
+        self.key = key
+        self.resumed = False
+        self._saved = time.perf_counter()
+
+    def load(self, options=None):
+        """
+        Loads the snapshot of an earlier search.
+
+        Args:
+            options: Anything that changes the search but not its key, such as the heuristic,
+                a snapshot saved with other options is not used.
+
+        Returns:
+            dict: The snapshot, or None if there is none to resume from.
+        """
+        entry = self.store.load(self.key)
+        if entry is None or entry[0] != options:
+            return None
+        self.resumed = True
+        self.store.resumes += 1
+        return entry[1]
+
+    def save(self, snapshot, options=None):
+        """
+        Saves the snapshot of the search.
+
+        Args:
+            snapshot (dict): The state of the search, it must be picklable if the store has a directory.
+            options: The options of the search, see load.
+        """
+        self.store.save(self.key, (options, snapshot))
+        self._saved = time.perf_counter()
+
+    def due(self):
+        """
+        Checks if the running search should save a snapshot, only stores with a directory take them while it runs.
+
+        Returns:
+            bool: True if the interval passed since the last snapshot.
+        """
+        return self.store.directory is not None and time.perf_counter() - self._saved >= self.store.interval
+
+    def clear(self):
+        """ Removes the snapshot, the search ran to completion. """
+        self.store.discard(self.key)
+
+
+class CheckpointStore:
+    """
+    Keeps the snapshots of interrupted searches in memory and optionally on disk.
+    It is safe to use from several threads.
+
+    Attributes:
+        directory (str): The directory the snapshots are written to, None to keep them in memory only.
+        max_snapshots (int): The number of snapshots kept in memory.
+        interval (float): The seconds between two snapshots of a running search written to the directory.
+        snapshots (collections.OrderedDict): The snapshots kept in memory, least recently saved first.
+        saves (int): The number of snapshots saved.
+        resumes (int): The number of snapshots loaded.
+    """
+
+    def __init__(self, directory=None, max_snapshots=DEFAULT_MAX_SNAPSHOTS, interval=DEFAULT_INTERVAL):
+        """
+        Initializes a CheckpointStore object.
+
+        Args:
+            directory (str): The directory the snapshots are written to, None to keep them in memory only.
+            max_snapshots (int): The number of snapshots kept in memory.
+            interval (float): The seconds between two snapshots of a running search written to the directory.
+        """
+        self.directory = directory
+        self.max_snapshots = max_snapshots
+        self.interval = interval
+        self.snapshots = OrderedDict()
+        self.saves = 0
+        self.resumes = 0
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def checkpoint(self, algo_name, board):
+        """
+        Returns the checkpoint of an algorithm on a board.
+
+        Args:
+            algo_name (str): The name of the search algorithm.
+            board (numpy.ndarray): The board the search starts from.
+
+        Returns:
+            SearchCheckpoint: The checkpoint.
+        """
+        board = np.asarray(board, dtype=np.uint8)
+        digest = hashlib.sha1(algo_name.encode("utf-8") + b"\0" + bytes([len(board)]) + board.tobytes())
+        return SearchCheckpoint(self, digest.hexdigest())
+
+    def _path(self, key):
+        """ Returns the file of a snapshot in the directory. """
+        return os.path.join(self.directory, key + CHECKPOINT_SUFFIX)
+
+    def save(self, key, entry):
+        """
+        Keeps a snapshot in memory and writes it to the directory atomically.
+
+        Args:
+            key (str): The key of the algorithm and board.
+            entry (tuple): The options and the snapshot of the search.
+        """
+        with self._lock:
+            self.snapshots.pop(key, None)
+            self.snapshots[key] = entry
+            while len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+            self.saves += 1
+
+        if self.directory is not None:
+            # every writer gets its own temporary file, server workers share the directory and may save the same key
+            handle, partial = tempfile.mkstemp(suffix=".partial", dir=self.directory)
+            with os.fdopen(handle, "wb") as file:
+                pickle.dump(entry, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(partial, self._path(key))
+
+    def load(self, key):
+        """
+        Loads a snapshot from memory, or from the directory if it is not in memory.
+
+        Args:
+            key (str): The key of the algorithm and board.
+
+        Returns:
+            tuple: The options and the snapshot of the search, or None if there is none.
+        """
+        with self._lock:
+            entry = self.snapshots.get(key)
+        if entry is None and self.directory is not None:
+            try:
+                with open(self._path(key), "rb") as file:
+                    entry = pickle.load(file)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                entry = None
+        return entry
+
+    def discard(self, key):
+        """
+        Removes a snapshot from memory and from the directory.
+
+        Args:
+            key (str): The key of the algorithm and board.
+        """
+        with self._lock:
+            self.snapshots.pop(key, None)
+        if self.directory is not None:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,85 @@
+"""
+Provides the one-way channel that carries encoded messages from the solver to the GUI.
+
+The channel is a multiprocessing pipe, so its readable end is a file descriptor the GUI can register
+with Tk's file handler and wake up the moment a message arrives, instead of polling a queue.
+Unlike a multiprocessing.Queue, a message is readable as soon as put returns (there is no feeder thread),
+so a readiness notification can never arrive before its message.
+
+Classes:
+    - SolverChannel: A one-way message channel whose readable end is a file descriptor.
+"""
+
+import multiprocessing
+import queue
+
+
+class SolverChannel:
+    """
+    A one-way message channel whose readable end is a file descriptor.
+    It offers the parts of the queue interface the solver and the GUI use.
+
+    Attributes:
+        reader (multiprocessing.connection.Connection): The readable end.
+        writer (multiprocessing.connection.Connection): The writable end.
+    """
+
+    def __init__(self):
+        """ Initializes a SolverChannel object. """
+        self.reader, self.writer = multiprocessing.Pipe(duplex=False)
+
+    def put(self, message):
+        """
+        Sends a message.
+
+        Args:
+            message (bytes): An encoded message.
+        """
+        self.writer.send_bytes(message)
+
+    def get(self, timeout=None):
+        """
+        Waits for a message.
+
+        Args:
+            timeout (float): The number of seconds to wait, None waits forever.
+
+        Returns:
+            bytes: The message.
+
+        Raises:
+            queue.Empty: If no message arrived in time.
+        """
+        if not self.reader.poll(timeout):
+            raise queue.Empty
+        return self.reader.recv_bytes()
+
+    def get_nowait(self):
+        """
+        Returns a message if one is ready.
+
+        Returns:
+            bytes: The message.
+
+        Raises:
+            queue.Empty: If no message is ready.
+        """
+        return self.get(0)
+
+    def ready(self):
+        """
+        Checks if a message is ready to be read.
+
+        Returns:
+            bool: True if get_nowait would return a message.
+        """
+        return self.reader.poll()
+
+    def fileno(self):
+        """
+        Returns the file descriptor of the readable end, it becomes readable when a message arrives.
+
+        Returns:
+            int: The file descriptor.
+        """
+        return self.reader.fileno()
@@ -0,0 +1,413 @@
+"""
+Provides the counters and histograms the solver process keeps while it runs, in the Prometheus text format.
+
+Metrics are only updated once per task (never inside a search loop), under one lock, so they cost nothing
+measurable next to a search. They can be exposed as a text file rewritten every few seconds
+(for the node exporter's textfile collector) or as a local HTTP endpoint answering GET /metrics.
+
+Classes:
+    - Counter: A monotonically increasing counter with labels.
+    - Gauge: A value read from another object on every render.
+    - Histogram: A histogram with fixed buckets and labels.
+    - SolverMetrics: The metrics of a TilesSolver.
+    - MetricsExporter: Exposes a SolverMetrics as a text file or over HTTP.
+"""
+
+import bisect
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# the bucket bounds of the time histograms, in seconds
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+# the bucket bounds of the nodes per second histogram
+RATE_BUCKETS = (1e3, 1e4, 1e5, 3e5, 1e6, 3e6, 1e7)
+# how often the metrics file is rewritten, in seconds
+DEFAULT_FILE_INTERVAL = 15.0
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(labelnames, labelvalues, extra=()):
+    """
+    Formats the labels of a sample.
+
+    Args:
+        labelnames (tuple of str): The label names.
+        labelvalues (tuple): The label values, in the same order.
+        extra (tuple): More (name, value) pairs.
+
+    Returns:
+        str: The labels in braces, or an empty string when there are none.
+    """
+    pairs = list(zip(labelnames, labelvalues)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    """ Formats a sample value, integers without a decimal point. """
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+class Counter:
+    """
+    A monotonically increasing counter with labels.
+
+    Attributes:
+        name (str): The metric name.
+        help (str): The metric description.
+        labelnames (tuple of str): The label names.
+        values (dict): The value of every label combination seen.
+        collect (function): If given, returns the values instead, for counters kept by another object.
+    """
+
+    def __init__(self, name, help_text, labelnames=(), collect=None):
+        """
+        Initializes a Counter object.
+
+        Args:
+            name (str): The metric name.
+            help_text (str): The metric description.
+            labelnames (tuple of str): The label names.
+            collect (function): If given, returns a dict of label values tuple to value on every render.
+        """
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.collect = collect
+
+    def inc(self, labelvalues=(), amount=1):
+        """
+        Increments the counter.
+
+        Args:
+            labelvalues (tuple): The label values, in the order of labelnames.
+            amount (float): The amount to add.
+        """
+        self.values[labelvalues] = self.values.get(labelvalues, 0) + amount
+
+    def render(self):
+        """ Returns the counter's lines of the text format. """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        values = self.collect() if self.collect is not None else self.values
+        for labelvalues, value in sorted(values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """
+    A value read from another object on every render.
+
+    Attributes:
+        name (str): The metric name.
+        help (str): The metric description.
+        labelnames (tuple of str): The label names.
+        collect (function): Returns a dict of label values tuple to value.
+    """
+
+    def __init__(self, name, help_text, labelnames, collect):
+        """
+        Initializes a Gauge object.
+
+        Args:
+            name (str): The metric name.
+            help_text (str): The metric description.
+            labelnames (tuple of str): The label names.
+            collect (function): Returns a dict of label values tuple to value on every render.
+        """
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self):
+        """ Returns the gauge's lines of the text format. """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labelvalues, value in sorted(self.collect().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    A histogram with fixed buckets and labels.
+
+    Attributes:
+        name (str): The metric name.
+        help (str): The metric description.
+        labelnames (tuple of str): The label names.
+        buckets (tuple of float): The upper bounds of the buckets, +Inf is implied.
+        series (dict): For every label combination seen, its bucket counts, sum and count.
+    """
+
+    def __init__(self, name, help_text, labelnames=(), buckets=TIME_BUCKETS):
+        """
+        Initializes a Histogram object.
+
+        Args:
+            name (str): The metric name.
+            help_text (str): The metric description.
+            labelnames (tuple of str): The label names.
+            buckets (tuple of float): The upper bounds of the buckets, sorted.
+        """
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, value, labelvalues=()):
+        """
+        Adds an observation.
+
+        Args:
+            value (float): The observed value.
+            labelvalues (tuple): The label values, in the order of labelnames.
+        """
+        series = self.series.get(labelvalues)
+        if series is None:
+            # one count per bucket and one for +Inf, then the sum and the count
+            series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self.series[labelvalues] = series
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self):
+        """ Returns the histogram's lines of the text format. """
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labelvalues, (counts, total, count) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                labels = _format_labels(self.labelnames, labelvalues, (("le", le),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class SolverMetrics:
+    """
+    The metrics of a TilesSolver. Every method takes the lock, so the receiver thread and the solving loop
+    can both record.
+
+    Attributes:
+        tasks_received (Counter): The received messages by kind.
+        tasks_solved (Counter): The searches that ran to completion by algorithm and board size.
+        tasks_cancelled (Counter): The searches that were interrupted by algorithm and board size.
+        queue_wait (Histogram): The time tasks waited for the solving loop.
+        solve_time (Histogram): The time of every search by algorithm and board size.
+        nodes (Counter): The states checked by algorithm.
+        nodes_per_second (Histogram): The states checked per second of every search by algorithm.
+        hint_cache (Counter): The hints by how the hint service answered them.
+        table_probes (Counter): The states searches looked up in their transposition table by algorithm.
+        table_hits (Counter): The states searches cut off by their transposition table by algorithm.
+        tasks_trimmed (Counter): The tasks the scheduler merged into another or dropped as superseded.
+        queue_depth (Gauge): The pending tasks of every priority in the scheduler.
+    """
+
+    def __init__(self, hint_service=None, scheduler=None):
+        """
+        Initializes a SolverMetrics object.
+
+        Args:
+            hint_service (HintService): The hint service whose cache is reported, if any.
+            scheduler (TaskScheduler): The scheduler whose queue is reported, if any.
+        """
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.tasks_received = Counter("tiles_solver_tasks_received_total", "Messages received by the solver.",
+                                      ("kind",))
+        self.tasks_solved = Counter("tiles_solver_tasks_solved_total", "Searches that ran to completion.",
+                                    ("algo", "board_size"))
+        self.tasks_cancelled = Counter("tiles_solver_tasks_cancelled_total", "Searches that were interrupted.",
+                                       ("algo", "board_size"))
+        self.queue_wait = Histogram("tiles_solver_queue_wait_seconds",
+                                    "Time tasks waited between being received and being started.")
+        self.solve_time = Histogram("tiles_solver_solve_seconds", "Time of every search.", ("algo", "board_size"))
+        self.nodes = Counter("tiles_solver_nodes_total", "States checked by the searches.", ("algo",))
+        self.nodes_per_second = Histogram("tiles_solver_nodes_per_second", "States checked per second of a search.",
+                                          ("algo",), RATE_BUCKETS)
+        self.hint_cache = Counter("tiles_solver_hint_cache_total",
+                                  "Hints answered from the remembered solution (hit), by splicing it (splice) "
+                                  "or by solving the position (solve).", ("result",),
+                                  collect=self._collect_hint_cache if hint_service is not None else None)
+        self.table_probes = Counter("tiles_solver_table_probes_total",
+                                    "States looked up in the transposition table of a search.", ("algo",))
+        self.table_hits = Counter("tiles_solver_table_hits_total",
+                                  "States cut off by the transposition table of a search.", ("algo",))
+        self.hint_service = hint_service
+        self.scheduler = scheduler
+        self._metrics = [self.tasks_received, self.tasks_solved, self.tasks_cancelled, self.queue_wait,
+                         self.solve_time, self.nodes, self.nodes_per_second, self.hint_cache, self.table_probes,
+                         self.table_hits]
+        if scheduler is not None:
+            self.tasks_trimmed = Counter("tiles_solver_tasks_trimmed_total",
+                                         "Tasks merged into an identical pending task (merged) or dropped for a newer "
+                                         "task with the same board id (superseded).", ("reason",),
+                                         collect=self._collect_trimmed)
+            self.queue_depth = Gauge("tiles_solver_queue_depth", "Tasks waiting for the solving loop.",
+                                     ("priority",), self._collect_depth)
+            self._metrics += [self.tasks_trimmed, self.queue_depth]
+
+    def _collect_hint_cache(self):
+        """ Reads the hint service's counters. """
+        return {("hit",): self.hint_service.hits, ("splice",): self.hint_service.splices,
+                ("solve",): self.hint_service.solves}
+
+    def _collect_trimmed(self):
+        """ Reads the scheduler's counters. """
+        return {("merged",): self.scheduler.merged, ("superseded",): self.scheduler.superseded}
+
+    def _collect_depth(self):
+        """ Reads the scheduler's queue depth. """
+        return {(priority,): count for priority, count in self.scheduler.depth().items()}
+
+    def task_received(self, kind):
+        """
+        Counts a received message.
+
+        Args:
+            kind (str): The kind of the message, "task", "batch" or "hint".
+        """
+        with self._lock:
+            self.tasks_received.inc((kind,))
+
+    def task_started(self, wait_seconds):
+        """
+        Records how long a task waited for the solving loop.
+
+        Args:
+            wait_seconds (float): The wait.
+        """
+        with self._lock:
+            self.queue_wait.observe(wait_seconds)
+
+    def search_finished(self, algo_name, board_size, seconds, checks, cancelled, table=None):
+        """
+        Records a finished search.
+
+        Args:
+            algo_name (str): The name of the search algorithm.
+            board_size (int): The size of the board.
+            seconds (float): The time the search took.
+            checks (int): The number of states the search checked.
+            cancelled (bool): True if the search was interrupted.
+            table (tuple): The lookups and cutoffs of the search's transposition table, if it had one.
+        """
+        labels = (algo_name, str(board_size))
+        with self._lock:
+            (self.tasks_cancelled if cancelled else self.tasks_solved).inc(labels)
+            self.solve_time.observe(seconds, labels)
+            self.nodes.inc((algo_name,), checks)
+            if seconds > 0:
+                self.nodes_per_second.observe(checks / seconds, (algo_name,))
+            if table is not None:
+                self.table_probes.inc((algo_name,), table[0])
+                self.table_hits.inc((algo_name,), table[1])
+
+    def render(self):
+        """
+        Renders every metric in the Prometheus text format.
+
+        Returns:
+            str: The metrics.
+        """
+        with self._lock:
+            lines = ["# HELP tiles_solver_uptime_seconds Time since the solver started.",
+                     "# TYPE tiles_solver_uptime_seconds gauge",
+                     f"tiles_solver_uptime_seconds {time.time() - self.started:.3f}"]
+            for metric in self._metrics:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Exposes a SolverMetrics as a text file rewritten periodically, over HTTP, or both, from daemon threads.
+
+    Attributes:
+        metrics (SolverMetrics): The metrics.
+        http_server (ThreadingHTTPServer): The HTTP server once started.
+    """
+
+    def __init__(self, metrics):
+        """
+        Initializes a MetricsExporter object.
+
+        Args:
+            metrics (SolverMetrics): The metrics.
+        """
+        self.metrics = metrics
+        self.http_server = None
+
+    def write_file(self, path):
+        """
+        Writes the metrics to a file atomically, so a reader never sees half a file.
+
+        Args:
+            path (str): The path of the file.
+        """
+        partial = f"{path}.{os.getpid()}.partial"
+        with open(partial, "w", encoding="utf-8") as file:
+            file.write(self.metrics.render())
+        os.replace(partial, path)
+
+    def start_file_writer(self, path, interval=DEFAULT_FILE_INTERVAL):
+        """
+        Rewrites the metrics file every interval seconds.
+
+        Args:
+            path (str): The path of the file.
+            interval (float): The time between two writes, in seconds.
+        """
+        def write_forever():
+            while True:
+                self.write_file(path)
+                time.sleep(interval)
+
+        threading.Thread(target=write_forever, name="MetricsFileWriter", daemon=True).start()
+
+    def start_http(self, port, host="127.0.0.1"):
+        """
+        Serves the metrics at http://host:port/metrics.
+
+        Args:
+            port (int): The port, 0 picks a free one.
+            host (str): The address to listen on, localhost by default.
+
+        Returns:
+            int: The port the server listens on.
+        """
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                # scrapes are not worth a line on stderr each
+                pass
+
+        self.http_server = ThreadingHTTPServer((host, port), Handler)
+        self.http_server.daemon_threads = True
+        threading.Thread(target=self.http_server.serve_forever, name="MetricsHttpServer", daemon=True).start()
+        return self.http_server.server_address[1]
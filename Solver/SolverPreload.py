@@ -0,0 +1,10 @@
+"""
+The module the forkserver of the solver processes preloads, see TilesSolverProcess.get_solver_context.
+
+Importing it builds the heuristic and finish tables, so every process forked from the forkserver starts with them
+already in memory. Only the forkserver imports it, nothing else should.
+"""
+
+from Solver.TilesSolverProcess import preload_solver_tables
+
+preload_solver_tables()
@@ -0,0 +1,197 @@
+"""
+Provides an opt-in profiler for a single solve.
+
+A profiled solve runs under cProfile and tracemalloc. The report written for it holds the functions that took
+the most time and the source lines holding the most memory close to the peak of the search, next to the peak
+itself. The search's structures are freed as soon as it returns, so a sampler thread takes a memory snapshot
+every time the traced memory grew by a tenth since the last one, and the report lists the last (largest) one.
+The binary cProfile stats are written next to the report, so they can be opened with pstats
+or any viewer that reads them.
+Nothing in this module runs unless a task asks for profiling.
+
+Classes:
+    - ProfileReport: The outcome of a profiled solve.
+
+Functions:
+    - profile_file_stem: Returns the path, without extension, of the files of a board's profile.
+    - profiled_solve: Runs a search algorithm under cProfile and tracemalloc and writes the report.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+
+# where the profiles are written when no directory is given
+DEFAULT_PROFILE_DIR = os.path.join(tempfile.gettempdir(), "tiles_solver_profiles")
+# the number of functions and of allocation sites listed in a report
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 20
+# the number of frames kept for every allocation
+TRACE_FRAMES = 1
+# how often the sampler checks the traced memory, in seconds, and how much it must grow for a new snapshot
+SAMPLE_INTERVAL = 0.05
+SNAPSHOT_GROWTH = 1.1
+
+
+class _PeakSampler:
+    """
+    Takes a memory snapshot, from a daemon thread, every time the traced memory grew by SNAPSHOT_GROWTH.
+
+    Attributes:
+        snapshot (tracemalloc.Snapshot): The last snapshot taken, None before the first.
+    """
+
+    def __init__(self):
+        self.snapshot = None
+        self._snapshot_size = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ProfilePeakSampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            current, _ = tracemalloc.get_traced_memory()
+            if current > self._snapshot_size * SNAPSHOT_GROWTH:
+                self.snapshot = tracemalloc.take_snapshot()
+                self._snapshot_size = current
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """ Stops the sampler and takes a last snapshot if the search was too short for one. """
+        self._stop.set()
+        self._thread.join()
+        current, _ = tracemalloc.get_traced_memory()
+        if self.snapshot is None or current > self._snapshot_size:
+            self.snapshot = tracemalloc.take_snapshot()
+
+
+class ProfileReport:
+    """
+    The outcome of a profiled solve.
+
+    Attributes:
+        peak_memory (int): The peak of the memory traced during the search, in bytes.
+        seconds (float): The time the search took, profiling overhead included.
+        report_path (str): The path of the text report.
+        stats_path (str): The path of the binary cProfile stats.
+    """
+
+    def __init__(self, peak_memory, seconds, report_path, stats_path):
+        """
+        Initializes a ProfileReport object.
+
+        Args:
+            peak_memory (int): The peak of the memory traced during the search, in bytes.
+            seconds (float): The time the search took, profiling overhead included.
+            report_path (str): The path of the text report.
+            stats_path (str): The path of the binary cProfile stats.
+        """
+        self.peak_memory = peak_memory
+        self.seconds = seconds
+        self.report_path = report_path
+        self.stats_path = stats_path
+
+
+def profile_file_stem(board_id, directory=None):
+    """
+    Returns the path, without extension, of the files of a board's profile.
+
+    Args:
+        board_id (str): The identifier of the board, characters that cannot be in a file name are replaced.
+        directory (str): The directory of the profiles, DEFAULT_PROFILE_DIR by default.
+
+    Returns:
+        str: The path.
+    """
+    name = re.sub(r"[^A-Za-z0-9_.-]", "_", str(board_id)) or "board"
+    return os.path.join(directory or DEFAULT_PROFILE_DIR, f"profile_{name}")
+
+
+def profiled_solve(algo, board, interrupt_event, board_id, algo_name, directory=None):
+    """
+    Runs a search algorithm under cProfile and tracemalloc and writes its report.
+    If tracemalloc was already tracing, it is left tracing.
+
+    Args:
+        algo (function): The search algorithm.
+        board (numpy.ndarray): The board to solve.
+        interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+        board_id (str): The identifier of the board, the files are named after it.
+        algo_name (str): The name of the search algorithm, for the report.
+        directory (str): The directory of the profiles, DEFAULT_PROFILE_DIR by default.
+
+    Returns:
+        tuple: The path and the total checks returned by the algorithm, and the ProfileReport.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    profiler = cProfile.Profile()
+    sampler = _PeakSampler()
+
+    sampler.start()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        path, totalChecks = algo(board, interrupt_event)
+    finally:
+        profiler.disable()
+        seconds = time.perf_counter() - start
+        sampler.stop()
+        _, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+
+    stem = profile_file_stem(board_id, directory)
+    os.makedirs(os.path.dirname(stem), exist_ok=True)
+    stats_path = stem + ".prof"
+    profiler.dump_stats(stats_path)
+
+    report = ProfileReport(peak - baseline, seconds, stem + ".txt", stats_path)
+    _write_report(report, profiler, sampler.snapshot, board, board_id, algo_name, path, totalChecks)
+    return (path, totalChecks), report
+
+
+def _write_report(report, profiler, snapshot, board, board_id, algo_name, path, totalChecks):
+    """
+    Writes the text report of a profiled solve.
+
+    Args:
+        report (ProfileReport): The report, its report_path is written.
+        profiler (cProfile.Profile): The profiler of the search.
+        snapshot (tracemalloc.Snapshot): The largest memory snapshot taken during the search.
+        board (numpy.ndarray): The solved board.
+        board_id (str): The identifier of the board.
+        algo_name (str): The name of the search algorithm.
+        path (list or None): The solution.
+        totalChecks (int): The number of states checked.
+    """
+    times = io.StringIO()
+    pstats.Stats(profiler, stream=times).strip_dirs().sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, "<frozen importlib._bootstrap>")))
+    lines = [f"board_id: {board_id}",
+             f"algo: {algo_name}",
+             f"board: {[int(value) for value in board.ravel()]}",
+             f"solution length: {None if path is None else len(path)}",
+             f"checks: {totalChecks}",
+             f"seconds (profiled): {report.seconds:.6f}",
+             f"peak memory: {report.peak_memory} bytes ({report.peak_memory / 2 ** 20:.2f} MiB)",
+             "",
+             f"Top {TOP_ALLOCATIONS} allocation sites at the largest sampled memory:"]
+    for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+        lines.append(f"    {stat}")
+    lines += ["", f"Top {TOP_FUNCTIONS} functions by cumulative time:", times.getvalue()]
+
+    with open(report.report_path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines))
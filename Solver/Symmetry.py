@@ -0,0 +1,109 @@
+"""
+Provides the reflection of boards about their main diagonal, which maps the goal onto itself.
+
+The goal (see TilesBoardCore.generate_goal_state) has the empty tile in the top-left corner and tile v on cell v,
+so transposing a board and renaming every tile v to the tile whose goal is the mirrored cell of v's goal
+turns a board into a board with exactly the same distance to the goal. Positions come in such mirrored pairs
+(a few are their own mirror), so keeping only one of each pair, the canonical one, about halves every table
+keyed by positions, and a solution found for one board is turned into a solution of its mirror move by move.
+
+The same formula mirrors the label states of ConstructiveSolver's finish tables, whose labels are the goal cells
+of the tiles on a goal that is symmetric too.
+
+Functions:
+    - transpose_cells: Returns the mirrored cell of every cell.
+    - mirror_state: Mirrors a board flattened row by row.
+    - mirror_board: Mirrors a square board.
+    - mirror_moves: Turns a solution of a board into the solution of its mirror.
+    - mirror_hashes: Computes the Zobrist hashes of the mirrors of a batch of states.
+"""
+
+import numpy as np
+from Solver.Zobrist import zobrist_key_array
+
+_TRANSPOSES = {}
+
+
+def transpose_cells(board_size):
+    """
+    Returns the mirrored cell of every cell, cell (r, c) is mirrored onto (c, r).
+    On the goal the tile v stands on cell v, so this is also the renaming of the tiles.
+
+    Args:
+        board_size (int): The size of the board.
+
+    Returns:
+        bytes: The mirrored cell of every cell, it is its own inverse.
+    """
+    transpose = _TRANSPOSES.get(board_size)
+    if transpose is None:
+        transpose = bytes((cell % board_size) * board_size + cell // board_size
+                          for cell in range(board_size * board_size))
+        _TRANSPOSES[board_size] = transpose
+    return transpose
+
+
+def mirror_state(state, board_size):
+    """
+    Mirrors a board flattened row by row.
+
+    Args:
+        state (bytes): The value (or label) of every cell, row by row.
+        board_size (int): The size of the board.
+
+    Returns:
+        bytes: The mirrored board, row by row.
+    """
+    transpose = transpose_cells(board_size)
+    return bytes(transpose[state[cell]] for cell in transpose)
+
+
+def mirror_board(board):
+    """
+    Mirrors a square board.
+
+    Args:
+        board (numpy.ndarray): The board.
+
+    Returns:
+        numpy.ndarray: The mirrored board, with the same dtype.
+    """
+    board = np.asarray(board)
+    relabel = np.frombuffer(transpose_cells(len(board)), dtype=np.uint8).astype(board.dtype)
+    return relabel[board.T]
+
+
+def mirror_moves(moves, board_size):
+    """
+    Turns a solution of a board into the solution of its mirror, or back, by renaming every moved tile.
+
+    Args:
+        moves (list of int): The values of the moved tiles, None is passed through.
+        board_size (int): The size of the board.
+
+    Returns:
+        list of int: The values of the moved tiles on the mirrored board.
+    """
+    if moves is None:
+        return None
+    transpose = transpose_cells(board_size)
+    return [transpose[int(move)] for move in moves]
+
+
+def mirror_hashes(states, board_size):
+    """
+    Computes the Zobrist hashes of the mirrors of a batch of states, without mirroring them.
+    A state and its mirror share the smaller of their two hashes as the key of a symmetric duplicate check.
+
+    Args:
+        states (numpy.ndarray): A (count, cells) array of states flattened row by row.
+        board_size (int): The size of the board.
+
+    Returns:
+        numpy.ndarray: A (count,) uint64 array, the hash zobrist_hash gives the mirror of every state.
+    """
+    cells = board_size * board_size
+    transpose = np.frombuffer(transpose_cells(board_size), dtype=np.uint8).astype(np.intp)
+    keys = zobrist_key_array(board_size).reshape((cells, cells))
+    # tile v on cell c of a state is tile transpose[v] on cell transpose[c] of its mirror
+    return np.bitwise_xor.reduce(keys[transpose[np.asarray(states, dtype=np.intp)], transpose], axis=1)
@@ -0,0 +1,209 @@
+"""
+Provides the scheduler that orders the tasks waiting for the TilesSolver's solving loop.
+
+Interactive game tasks always run before batch work, and a batch gives way between two of its boards when a game
+task is waiting, so a game never waits for more than one batch board. Hint requests never enter the scheduler,
+the receiver thread answers them as they arrive.
+
+Pending work is also trimmed before it runs:
+    - a task for the same algorithm and board as a pending task is merged into it, the board is solved once
+      and the solution is sent to every board_id that asked for it.
+    - a task supersedes the pending task with the same board_id (a batch, the pending batch with the same batch_id).
+    - with single_game, a game task supersedes every pending game task, the GUI plays one game at a time.
+
+Classes:
+    - ScheduledTask: A task taken from the scheduler.
+    - TaskScheduler: Orders the pending tasks by priority and trims them.
+"""
+
+import heapq
+import threading
+import numpy as np
+from Solver.TilesSolverMsgs import TilesSolverBatchTask
+
+PRIORITY_GAME = 0
+PRIORITY_BATCH = 1
+PRIORITY_NAMES = {PRIORITY_GAME: "game", PRIORITY_BATCH: "batch"}
+
+
+class ScheduledTask:
+    """
+    A task taken from the scheduler.
+
+    Attributes:
+        task (TilesSolverTask or TilesSolverBatchTask): The first task received for this work.
+        priority (int): PRIORITY_GAME or PRIORITY_BATCH.
+        received (float): The time.monotonic() the first task was received at.
+        board_ids (list of str): The board_ids to send the solution to, merged tasks add theirs.
+        profile (bool): True if any of the merged tasks asked for profiling.
+        boards (list of tuple): The distinct boards of a batch left to solve, each with the indexes it appears at
+            in the batch, None until the batch first ran.
+        resumed (bool): True for a batch that gave way to a game task and was put back.
+        seq (int): The arrival order of the task, a resumed batch keeps its own.
+    """
+
+    def __init__(self, task, priority, received):
+        """
+        Initializes a ScheduledTask object.
+
+        Args:
+            task (TilesSolverTask or TilesSolverBatchTask): The first task received for this work.
+            priority (int): PRIORITY_GAME or PRIORITY_BATCH.
+            received (float): The time.monotonic() the task was received at.
+        """
+        self.task = task
+        self.priority = priority
+        self.received = received
+        self.board_ids = [task.batch_id if priority == PRIORITY_BATCH else task.board_id]
+        self.profile = getattr(task, "profile", False)
+        self.boards = None
+        self.resumed = False
+        self.seq = 0
+
+
+class TaskScheduler:
+    """
+    Orders the pending tasks by priority, then by arrival, and trims them. It is safe to use from several threads.
+
+    Attributes:
+        single_game (bool): True if a game task supersedes every pending game task.
+        merged (int): The number of tasks merged into a pending task.
+        superseded (int): The number of tasks dropped because a newer task superseded them.
+    """
+
+    def __init__(self, single_game=False):
+        """
+        Initializes a TaskScheduler object.
+
+        Args:
+            single_game (bool): True if a game task supersedes every pending game task.
+        """
+        self.single_game = single_game
+        self.merged = 0
+        self.superseded = 0
+        # (priority, seq, entry) with lazy deletion, a dropped entry has no board_ids left
+        self._heap = []
+        self._seq = 0
+        # pending game entries by (algo_name, board) and every pending entry by each of its board_ids
+        self._by_board = {}
+        self._by_id = {}
+        self._depth = {priority: 0 for priority in PRIORITY_NAMES}
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _board_key(task):
+        """ Returns the key under which identical pending game tasks are merged. """
+        board = np.asarray(task.tiles_board, dtype=np.uint8)
+        return task.algo_name, board.shape[0], board.tobytes()
+
+    def push(self, task, received):
+        """
+        Adds a task, merging it into an identical pending task and dropping the tasks it supersedes.
+
+        Args:
+            task (TilesSolverTask or TilesSolverBatchTask): The task.
+            received (float): The time.monotonic() the task was received at.
+        """
+        priority = PRIORITY_BATCH if isinstance(task, TilesSolverBatchTask) else PRIORITY_GAME
+        with self._condition:
+            board_id = task.batch_id if priority == PRIORITY_BATCH else task.board_id
+            self._drop_id(board_id)
+            if priority == PRIORITY_GAME and self.single_game:
+                for pending_id in [pending_id for pending_id, entry in self._by_id.items()
+                                   if entry.priority == PRIORITY_GAME]:
+                    self._drop_id(pending_id)
+
+            if priority == PRIORITY_GAME:
+                key = self._board_key(task)
+                entry = self._by_board.get(key)
+                if entry is not None:
+                    entry.board_ids.append(board_id)
+                    entry.profile = entry.profile or task.profile
+                    self._by_id[board_id] = entry
+                    self.merged += 1
+                    return
+
+            entry = ScheduledTask(task, priority, received)
+            if priority == PRIORITY_GAME:
+                self._by_board[key] = entry
+            self._add(entry)
+
+    def resume(self, entry):
+        """
+        Puts back a batch that gave way to a game task, ahead of the batches that arrived after it.
+
+        Args:
+            entry (ScheduledTask): The batch, with boards set to the boards left.
+        """
+        with self._condition:
+            if entry.board_ids[0] in self._by_id:
+                # a batch with the same batch_id arrived while this one ran
+                self.superseded += 1
+                return
+            entry.resumed = True
+            self._add(entry, entry.seq)
+
+    def _add(self, entry, seq=None):
+        """ Adds an entry to the heap and indexes it, the lock must be held. """
+        if seq is None:
+            self._seq += 1
+            seq = self._seq
+        entry.seq = seq
+        heapq.heappush(self._heap, (entry.priority, seq, entry))
+        for board_id in entry.board_ids:
+            self._by_id[board_id] = entry
+        self._depth[entry.priority] += 1
+        self._condition.notify()
+
+    def _drop_id(self, board_id):
+        """ Stops answering a board_id of a pending entry and drops the entry once nobody waits for it. """
+        entry = self._by_id.pop(board_id, None)
+        if entry is None:
+            return
+        entry.board_ids.remove(board_id)
+        self.superseded += 1
+        if not entry.board_ids:
+            self._forget(entry)
+
+    def _forget(self, entry):
+        """ Removes an entry from the indexes, it stays in the heap until popped, the lock must be held. """
+        for board_id in entry.board_ids:
+            self._by_id.pop(board_id, None)
+        if entry.priority == PRIORITY_GAME:
+            self._by_board.pop(self._board_key(entry.task), None)
+        self._depth[entry.priority] -= 1
+
+    def pop(self, timeout=None):
+        """
+        Takes the pending task with the highest priority, the oldest one first.
+
+        Args:
+            timeout (float): How long to wait for a task, forever by default.
+
+        Returns:
+            ScheduledTask: The task, None if none arrived in time.
+        """
+        with self._condition:
+            while True:
+                while self._heap:
+                    _, _, entry = heapq.heappop(self._heap)
+                    if entry.board_ids:
+                        self._forget(entry)
+                        return entry
+                if not self._condition.wait(timeout):
+                    return None
+
+    def game_waiting(self):
+        """ Returns True if a game task is pending, a running batch should give way to it. """
+        with self._condition:
+            return self._depth[PRIORITY_GAME] > 0
+
+    def depth(self):
+        """
+        Returns the number of pending tasks.
+
+        Returns:
+            dict: The number of pending tasks of every priority name.
+        """
+        with self._condition:
+            return {PRIORITY_NAMES[priority]: count for priority, count in self._depth.items()}
@@ -0,0 +1,151 @@
+"""
+Provides the pure board functions shared by the GUI and the solver.
+
+This module must not import tkinter or any GUI module so that the solver process can use it
+without loading the GUI.
+
+Functions:
+    - generate_num_board: Generates a random yet solvable game board.
+    - generate_goal_state: Generates the goal state of the game board.
+    - make_random_moves: Makes random moves on the game board.
+    - find_possible_moves: Generates a list of possible moves in a square game board.
+    - is_solvable: Checks if a board can reach the goal state.
+"""
+
+import numpy as np
+import random
+from Solver.BoardGenerator import random_solvable_boards
+
+
+def generate_num_board(board_size):
+    """
+    Generates a random yet solvable game board.
+
+    This function draws the board uniformly from all the solvable boards of the specified size,
+    see BoardGenerator.
+
+    Args:
+        board_size (int): The size of the game board (e.g., 3 for a 3x3 board).
+
+    Returns:
+        numpy.ndarray: A randomly generated yet solvable game board represented as a numpy array.
+
+    """
+    return random_solvable_boards(board_size, 1)[0].astype(int)
+
+
+def generate_goal_state(board_size):
+    """
+    Generates the goal state of the game board.
+
+    This function generates the goal state of the game board,
+     which is a board with tiles arranged in ascending order
+    starting from 0.
+
+    Args:
+        board_size (int): The size of the game board (e.g., 3 for a 3x3 board).
+
+    Returns:
+        numpy.ndarray: The goal state of the game board represented as a numpy array.
+
+    """
+    return np.arange(board_size * board_size).reshape((board_size, board_size))
+
+
+def make_random_moves(board, board_size, zero_row, zero_col):
+    """
+    Makes random moves on the game board.
+
+    This function makes random moves on the game board by swapping tiles to increase
+     randomness while keeping the board solvable.
+
+    Args:
+        board (numpy.ndarray): The game board represented as a numpy array.
+        board_size (int): The size of the game board (e.g., 3 for a 3x3 board).
+        zero_row (int): The row index of the empty tile (0) on the game board.
+        zero_col (int): The column index of the empty tile (0) on the game board.
+
+    """
+    for _ in range(100):
+        possible_moves = find_possible_moves(board_size, zero_row, zero_col)
+        random_move = random.choice(possible_moves)
+        # swap tiles
+        row = random_move[0]
+        col = random_move[1]
+        num = board[row, col]
+        board[zero_row, zero_col] = num
+        board[row, col] = 0
+        zero_row = row
+        zero_col = col
+
+
+def find_possible_moves(board_size, zeroRow, zeroCol):
+    """
+    Generates a list of possible moves in a square game board.
+
+    This function creates a list of possible moves in a square game board based on the current location of the empty
+    space marked as 0. The location of the empty space is given by zeroRow and zeroCol.
+
+    Args:
+        board_size (int): The size of the game board (e.g., 3 for a 3x3 board).
+        zeroRow (int): The row index of the empty tile (0) on the game board.
+        zeroCol (int): The column index of the empty tile (0) on the game board.
+
+    Returns:
+        list of tuple: A list of tuples, where each tuple represents
+         a position of a tile on the board that can be moved.
+
+    """
+    possibleMoves = []
+    if zeroRow != 0:
+        # move zero up
+        possibleMoves.append((zeroRow - 1, zeroCol))
+
+    if zeroRow != board_size - 1:
+        # move zero down
+        possibleMoves.append((zeroRow + 1, zeroCol))
+
+    if zeroCol != 0:
+        # move zero left
+        possibleMoves.append((zeroRow, zeroCol - 1))
+
+    if zeroCol != board_size - 1:
+        # move zero right
+        possibleMoves.append((zeroRow, zeroCol + 1))
+
+    return possibleMoves
+
+
+def is_solvable(board):
+    """
+    Checks if a board can reach the goal state.
+
+    Every move swaps the empty tile with a neighbour, so it flips the parity of the permutation of the board
+    and of the empty tile's distance from its goal position (the top-left corner) together.
+    A board is therefore solvable exactly when both parities are equal.
+
+    Args:
+        board (numpy.ndarray): A square board holding every value from 0 to board_size**2 - 1.
+
+    Returns:
+        bool: True if the board is solvable and False otherwise.
+    """
+    board = np.asarray(board, dtype=int)
+    board_size = len(board)
+    flat = board.ravel()
+    if board.shape != (board_size, board_size) or not np.array_equal(np.sort(flat), np.arange(flat.size)):
+        return False
+
+    # the parity of a permutation is the parity of its length minus its number of cycles
+    visited = np.zeros(flat.size, dtype=bool)
+    cycles = 0
+    for start in range(flat.size):
+        if not visited[start]:
+            cycles += 1
+            position = start
+            while not visited[position]:
+                visited[position] = True
+                position = flat[position]
+
+    zero_row, zero_col = divmod(int(np.argmax(flat == 0)), board_size)
+    return (flat.size - cycles) % 2 == (zero_row + zero_col) % 2
@@ -9,12 +9,30 @@ provided as command-line arguments.
 """
 
 import argparse
+import functools
 import sys
 import heapq
-from Components import TilesBoard
+import time
+from Solver import TilesBoardCore
+from Solver import Heuristics
+from Solver.ConstructiveSolver import constructive_solve
+from Solver.FrontierSearch import frontier_bfs
+from Solver.MovePruning import move_pruning, PRUNED
+from Solver.PortfolioSolver import portfolio_solve, PORTFOLIO_ANY, PORTFOLIO_OPTIMAL, QUALITY_OPTIMAL
+from Solver.RealTimeSearch import realtime_solve, LearnedHeuristic, REALTIME_ALGO
+from Solver.SearchCheckpoint import CheckpointStore
+from Solver.Symmetry import mirror_hashes
+from Solver.Zobrist import (zobrist_keys, zobrist_key_array, zobrist_hash, move_key, TranspositionTable,
+                            DEFAULT_TABLE_SIZE)
 import numpy as np
 import queue
-from Solver.TilesSolverMsgs import TilesSolverSolution
+import threading
+from Solver.HintService import HintService
+from Solver.SolverMetrics import SolverMetrics
+from Solver.TaskScheduler import TaskScheduler, PRIORITY_BATCH
+from Solver.TilesSolverMsgs import (TilesSolverSolution, TilesSolverBatchTask, TilesSolverHintRequest, TilesSolverMove,
+                                   batch_board_id)
+from Solver.TilesSolverProtocol import decode_message, encode_solution, encode_hint, encode_move, SharedBoardBatch
 
 
 def find_child_states(currState):
@@ -32,7 +50,7 @@ def find_child_states(currState):
     board_size = currState.shape[0]
     # find the coordinates of the zero tile
     zeroRow, zeroCol = find_zero(currState)
-    possibleMoves = TilesBoard.find_possible_moves(board_size, zeroRow, zeroCol)
+    possibleMoves = TilesBoardCore.find_possible_moves(board_size, zeroRow, zeroCol)
 
     # generate child states by making moves
     for move in possibleMoves:
@@ -45,6 +63,34 @@ def find_child_states(currState):
     return childStates
 
 
+def find_hashed_child_states(currState, currHash):
+    """
+    Finds the child states of a state together with their Zobrist hashes,
+    each child's hash is the parent's hash updated with the two keys of its move.
+
+    Parameters:
+    - currState (numpy.ndarray): The current state of the sliding tile board.
+    - currHash (int): The Zobrist hash of the current state.
+
+    Returns:
+    - list: A list of tuples (childState, childHash, childMove).
+    """
+    childStates = []
+    board_size = currState.shape[0]
+    cells = board_size * board_size
+    keys = zobrist_keys(board_size)
+    zeroRow, zeroCol = find_zero(currState)
+    zeroCell = zeroRow * board_size + zeroCol
+
+    for move in TilesBoardCore.find_possible_moves(board_size, zeroRow, zeroCol):
+        childState = np.copy(currState)
+        movedTileValue = make_move(childState, move, zeroRow, zeroCol)
+        childHash = currHash ^ move_key(keys, cells, int(movedTileValue), zeroCell, move[0] * board_size + move[1])
+        childStates.append((childState, childHash, movedTileValue))
+
+    return childStates
+
+
 def make_move(board, move, zeroRow, zeroCol):
     """
     Makes a move on the board by swapping the zero tile with the specified tile.
@@ -68,30 +114,67 @@ def find_zero(board):
     return np.argwhere(board == 0)[0]
 
 
-def BFS(board, interrupt_event):
+def symmetric_key(state, stateHash):
+    """
+    Returns the key a state shares with its mirror about the main diagonal (see Symmetry),
+    the smaller of their Zobrist hashes.
+
+    Parameters:
+    - state (numpy.ndarray): The state.
+    - stateHash (int): The Zobrist hash of the state.
+
+    Returns:
+    - int: The key.
+    """
+    board_size = state.shape[0]
+    return min(stateHash, int(mirror_hashes(state.reshape((1, -1)), board_size)[0]))
+
+
+def BFS(board, interrupt_event, symmetric=False, checkpoint=None):
     """
     Performs Breadth-First Search (BFS) for the sliding tile problem.
 
+    With symmetric, a state and its mirror are one entry of the duplicate check: the goal is its own mirror,
+    so the mirror of a state is as deep and only the first of the two reached is expanded.
+
     Parameters:
     - board (numpy.ndarray): The current state of the sliding tile board.
     - interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+    - symmetric (bool): True to share the duplicate check between mirrored states.
+    - checkpoint (SearchCheckpoint): If given, the search resumes from its snapshot,
+      and saves its frontier and reached states to it when interrupted (see SearchCheckpoint).
 
     Returns:
     - tuple: A tuple containing the path (list) and the total number of states evaluated during the search.
     """
-    goal = TilesBoard.generate_goal_state(len(board))
+    goal = TilesBoardCore.generate_goal_state(len(board))
     totalChecks = 0
-    # a dict containing a state as key and a (parentState ,move ) tuple as value
+    # a dict containing a state's key (its Zobrist hash, or its symmetric key) and a (parentKey ,move ) tuple as value
     reached = {}
-    # the queue contains tuples of states their parent and the tile that moved from parent
-    # to the current state
+    # the queue contains tuples of states their hash their key their parent's key and the tile that moved
+    # from parent to the current state
     frontier = queue.Queue()
-    # set initial frontier to the starting board state with None parent and None move
-    frontier.put((board, None, None))
+    snapshot = checkpoint.load(symmetric) if checkpoint is not None else None
+    if snapshot is None:
+        # set initial frontier to the starting board state with None parent and None move
+        boardHash = zobrist_hash(board)
+        frontier.put((board, boardHash, symmetric_key(board, boardHash) if symmetric else boardHash, None, None))
+    else:
+        totalChecks, reached = snapshot["checks"], snapshot["reached"]
+        # the queue's deque is filled at once, a put per state would take longer than the search it resumes
+        frontier.queue.extend(snapshot["frontier"])
+
+    def save_checkpoint():
+        checkpoint.save({"checks": totalChecks, "reached": reached, "frontier": list(frontier.queue)}, symmetric)
 
     while (not frontier.empty()) and (not interrupt_event.is_set()):
+        if checkpoint is not None and checkpoint.due():
+            save_checkpoint()
 
-        currState, parent, parentMove = frontier.get()
+        currState, currHash, currKey, parent, parentMove = frontier.get()
+        if symmetric and currKey in reached:
+            # the state's mirror was expanded, its children are the mirrors of this state's children
+            continue
         totalChecks += 1
 
         if np.array_equal(goal, currState):
@@ -99,151 +182,383 @@ def BFS(board, interrupt_event):
             return path, totalChecks
 
         # adding the current state to the reached dict
-        # we convert the current state to a tuple because dictionary keys must be Hashable
-        currStateTuple = state_to_tuple(currState)
-        reached[currStateTuple] = (parent, parentMove)
+        reached[currKey] = (parent, parentMove)
 
-        childStates = find_child_states(currState)
+        childStates = find_hashed_child_states(currState, currHash)
         # add child states to the frontier queue
-        for childState, childMove in childStates:
-            # we convert the childState to a tuple because dictionary keys must Hashable
-            childStateTuple = state_to_tuple(childState)
-            if childStateTuple not in reached:
-                frontier.put((childState, currStateTuple, childMove))
+        for childState, childHash, childMove in childStates:
+            childKey = symmetric_key(childState, childHash) if symmetric else childHash
+            if childKey not in reached:
+                frontier.put((childState, childHash, childKey, currKey, childMove))
 
+    if checkpoint is not None and interrupt_event.is_set():
+        save_checkpoint()
     return None, totalChecks
 
 
-def IDDFS(board, interrupt_event):
+# the largest number of moves any solvable board of a given size needs, where it is known
+BOARD_DIAMETERS = {2: 6, 3: 31, 4: 80}
+# how many states IDDFS checks between two checks of the interrupt event
+INTERRUPT_CHECK_INTERVAL = 1024
+
+
+def neighbour_table(board_size):
+    """
+    Lists the cells next to every cell of a board, cells are numbered row by row.
+
+    Parameters:
+    - board_size (int): The size of the board.
+
+    Returns:
+    - list: For every cell, the list of its neighbouring cells.
+    """
+    table = []
+    for cell in range(board_size * board_size):
+        row, col = divmod(cell, board_size)
+        table.append([move[0] * board_size + move[1]
+                      for move in TilesBoardCore.find_possible_moves(board_size, row, col)])
+    return table
+
+
+def iddfs_depth_cap(board):
+    """
+    Finds a depth IDDFS never has to search beyond.
+    A board's shortest solution is never longer than the diameter of its size's graph (where it is known)
+    or than any solution of the board, so the constructive solver's path bounds it for every size.
+
+    Parameters:
+    - board (numpy.ndarray): A solvable board.
+
+    Returns:
+    - tuple: The depth cap, the constructive path and True if the cap is the length of that path, then the path
+      is a shortest solution once every shallower depth failed. False if the cap is the diameter, which the path
+      is longer than, so the cap must be searched like any other depth.
+    """
+    constructive_path, _ = constructive_solve(board, DummyEvent())
+    diameter = BOARD_DIAMETERS.get(len(board), len(constructive_path))
+    if len(constructive_path) <= diameter:
+        return len(constructive_path), constructive_path, True
+    return diameter, constructive_path, False
+
+
+def IDDFS(board, interrupt_event, stats=None, table_size=DEFAULT_TABLE_SIZE, prune_moves=True, checkpoint=None):
     """
      Performs Iterative Deepening Depth-First Search (IDDFS) for the sliding tile problem.
 
+     The search runs on a single flat list of the board that is changed and restored in place.
+     The move pruning automaton of the board size (see MovePruning) skips the move sequences that lead
+     to the same board as an earlier sequence, which includes moving a tile straight back to where it came from.
+     A bounded transposition table cuts off states the running iteration already expanded with no more moves.
+     Unsolvable boards are rejected before searching and the depth is capped by iddfs_depth_cap.
+
      Parameters:
      - board (numpy.ndarray): The current state of the sliding tile board.
      - interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+     - stats (list): If given, a dict with the depth, states checked, states looked up in and cut off by
+       the transposition table and seconds of every iteration is appended to it.
+     - table_size (int): The number of entries of the transposition table, 0 searches without one.
+     - prune_moves (bool): False to only skip the moves that undo the last move.
+     - checkpoint (SearchCheckpoint): If given, the search resumes at the depth of its snapshot, every shallower
+       depth having failed, and saves the depth it is at to it after every iteration and when interrupted.
 
      Returns:
      - tuple: A tuple containing the path (list) and the total number of states evaluated during the search.
      """
-    # reached set is added for faster lookup of reached states
-    # even thou reached states are already saved to path this does not
-    # increase the asymptotic memory consumption
-    # because depthLimitedSearch makes sure that 'path' and 'reached' have the same elements
-    goal = TilesBoard.generate_goal_state(len(board))
-    reached = set()
-    path = []
-    depth = 0
+    if not TilesBoardCore.is_solvable(board):
+        # couldn't reach goal state from given board state
+        return None, 0
+
+    depth_cap, constructive_path, path_is_cap = iddfs_depth_cap(board)
+    board_size = len(board)
+    state = [int(value) for value in np.asarray(board).ravel()]
+    neighbours = neighbour_table(board_size)
+    table = TranspositionTable(table_size) if table_size > 0 else None
+    pruning = move_pruning(board_size) if prune_moves else None
     totalChecks = 0
-    # IDDFS needs to stop somewhere if there is no solution so 30 seams as good as any
-    while depth < 30 and (not interrupt_event.is_set()):
-
-        foundSolution, currChecks = depth_limited_search(board, goal, path, reached, depth)
-        depth += 1
+    firstDepth = 0
+    snapshot = checkpoint.load() if checkpoint is not None else None
+    if snapshot is not None:
+        firstDepth, totalChecks = snapshot["depth"], snapshot["checks"]
+
+    for depth in range(firstDepth, depth_cap + 1):
+        if interrupt_event.is_set():
+            break
+
+        start = time.perf_counter()
+        prev_hits = table.hits if table is not None else 0
+        prev_probes = table.probes if table is not None else 0
+        if depth == depth_cap and path_is_cap:
+            # every shallower depth failed, so the constructive path is a shortest one
+            path, currChecks = list(constructive_path), 0
+        else:
+            path, currChecks = depth_limited_search(state, neighbours, depth, interrupt_event, table, pruning)
         totalChecks += currChecks
 
-        if foundSolution:
+        if stats is not None:
+            stats.append({"depth": depth, "checks": currChecks,
+                          "probes": (table.probes if table is not None else 0) - prev_probes,
+                          "cutoffs": (table.hits if table is not None else 0) - prev_hits,
+                          "seconds": time.perf_counter() - start})
+
+        if path is not None:
             return path, totalChecks
+        if checkpoint is not None:
+            # an interrupted iteration is searched again, a finished one is not
+            checkpoint.save({"depth": depth if interrupt_event.is_set() else depth + 1, "checks": totalChecks})
 
-    # couldn't reach goal state from given board state
+    # the search was interrupted
     return None, totalChecks
 
 
-def depth_limited_search(currState, goal, path, reached, maxDepth):
+def depth_limited_search(state, neighbours, maxDepth, interrupt_event, table=None, pruning=None):
     """
     Performs a depth-limited search to find a path from the current state to the goal state.
 
-    :param currState: (numpy.ndarray) The current state of the 3*3 board.
-    :param goal: (numpy.ndarray) The state of the 3*3 board we want to get to.
-    :param path: (list) A list to insert the move order to once a path is found.
-    :param reached: (set) A set of states that have been visited to prevent looping over states
-        that have already been explored on the way to the current state.
+    The search keeps an explicit stack of the cells the zero tile went through and makes and unmakes every move
+    on the state in place. The goal test uses a count of misplaced cells and the transposition table
+    the state's Zobrist hash, both are updated with each move, and so is the state of the pruning automaton.
+
+    :param state: (list) The board as a flat list, row by row. It is restored before returning.
+    :param neighbours: (list) The neighbour table of the board's size, see neighbour_table.
     :param maxDepth: The maximum depth to explore in the search.
-    :return: A tuple (foundSolution, totalChecks).
-             foundSolution (bool): True if a solution is found and False otherwise.
+    :param interrupt_event: (multiprocessing.Event) An event to interrupt the search process.
+    :param table: (TranspositionTable) If given, states it already holds for this depth are not expanded again.
+    :param pruning: (MovePruning) If given, the moves its automaton prunes are skipped,
+                    otherwise only the moves that undo the last move are.
+    :return: A tuple (path, totalChecks).
+             path (list): The values of the moved tiles if a solution is found and None otherwise.
              totalChecks (int): The total number of states checked during the search.
     """
-
+    zero = state.index(0)
+    misplaced = sum(1 for cell, value in enumerate(state) if cell != value)
     totalChecks = 1
-    # check if the current state is the goal state
-    if np.array_equal(goal, currState):
-        return True, totalChecks
-    # check if the maximum depth has been reached
+    if misplaced == 0:
+        return [], totalChecks
     if maxDepth == 0:
-        return False, totalChecks
+        return None, totalChecks
+
+    cells = len(state)
+    keys = zobrist_keys(round(cells ** 0.5))
+    # zeros[i] is the cell of the zero tile after i moves, children[i] the cells it can still move to from there,
+    # hashes[i] the hash of the state after i moves and automaton[i] the pruning automaton's state after them
+    zeros = [zero]
+    hashes = [zobrist_hash(state)]
+    automaton = [0]
+    if pruning is not None:
+        transitions, directions = pruning.transitions, pruning.directions
+    if table is not None:
+        table.visit(hashes[0], 0, maxDepth)
+    children = [iter(neighbours[zero])]
+    path = []
+    found = False
+
+    while children:
+        cell = next(children[-1], None)
+        if cell is None:
+            children.pop()
+            if path:
+                # unmake the last move
+                prev_zero = zeros.pop()
+                hashes.pop()
+                automaton.pop()
+                zero = zeros[-1]
+                tile = path.pop()
+                misplaced -= (state[zero] != zero) + (state[prev_zero] != prev_zero)
+                state[prev_zero] = tile
+                state[zero] = 0
+                misplaced += (state[zero] != zero) + (state[prev_zero] != prev_zero)
+            continue
+
+        zero = zeros[-1]
+        if pruning is not None:
+            nextState = transitions[automaton[-1]][directions[zero * cells + cell]]
+            if nextState == PRUNED:
+                # an earlier sequence of moves leads to the same state
+                continue
+        elif len(zeros) > 1 and cell == zeros[-2]:
+            # moving the tile that was just moved would undo the last move
+            continue
+        else:
+            nextState = 0
+
+        # make the move
+        tile = state[cell]
+        misplaced -= (state[zero] != zero) + (state[cell] != cell)
+        state[zero] = tile
+        state[cell] = 0
+        misplaced += (state[zero] != zero) + (state[cell] != cell)
+        zeros.append(cell)
+        hashes.append(hashes[-1] ^ move_key(keys, cells, tile, zero, cell))
+        automaton.append(nextState)
+        path.append(tile)
+        totalChecks += 1
+
+        if misplaced == 0:
+            found = True
+            break
+
+        if totalChecks % INTERRUPT_CHECK_INTERVAL == 0 and interrupt_event.is_set():
+            break
 
-    # convert the current state to a tuple because elements of a set must be hashable
-    currStateTuple = state_to_tuple(currState)
-    reached.add(currStateTuple)
+        if len(path) < maxDepth and (table is None or not table.visit(hashes[-1], len(path), maxDepth)):
+            children.append(iter(neighbours[cell]))
+        else:
+            # a leaf or a cut off state, children[-1] is still the parent's iterator
+            # so push an exhausted one to unmake the move
+            children.append(iter(()))
 
-    childStates = find_child_states(currState)
-    # Explore child states
-    for childState, childMove in childStates:
-        # convert the childState to a tuple because elements of a set must be hashable
-        childStateTuple = state_to_tuple(childState)
-        # check if the child state has not been visited
-        if childStateTuple not in reached:
-            # recursively perform depth-limited search on the child state
-            foundSolution, checks = depth_limited_search(childState, goal, path, reached, maxDepth - 1)
-            totalChecks += checks
+    solution = list(path) if found else None
+    # restore the state for the caller
+    while path:
+        prev_zero = zeros.pop()
+        state[prev_zero] = path.pop()
+        state[zeros[-1]] = 0
 
-            # if a solution is found, update the path and return
-            if foundSolution:
-                path.insert(0, childMove)
-                return foundSolution, totalChecks
+    return solution, totalChecks
 
-    # we get here only if we didn't find the solution in any of the current state's descendants,
-    # so before we exit we remove the current state from the path and reached states as we go back up the
-    # graph to try a different route
-    reached.remove(currStateTuple)
-    return False, totalChecks
 
+# the largest number of open list entries GBFS and A* pop and expand together
+DEFAULT_BATCH_SIZE = 64
 
-def GBFS(board, interrupt_event):
+_MOVE_TABLES = {}
+
+
+def move_table(board_size):
+    """
+    Returns the neighbours of every cell as a padded array, for expanding many states at once.
+
+    Parameters:
+    - board_size (int): The size of the board.
+
+    Returns:
+    - numpy.ndarray: A (cells, 4) array of the cells next to every cell, padded with -1.
+    """
+    table = _MOVE_TABLES.get(board_size)
+    if table is None:
+        table = np.full((board_size * board_size, 4), -1, dtype=np.intp)
+        for cell, cells in enumerate(neighbour_table(board_size)):
+            table[cell, :len(cells)] = cells
+        table.setflags(write=False)
+        _MOVE_TABLES[board_size] = table
+
+    return table
+
+
+def expand_batch(states, hashes, board_size):
+    """
+    Generates every child of a batch of states with a few NumPy operations.
+
+    Parameters:
+    - states (numpy.ndarray): A (count, cells) uint8 array of states flattened row by row.
+    - hashes (numpy.ndarray): A (count,) uint64 array of the states' Zobrist hashes.
+    - board_size (int): The size of the board.
+
+    Returns:
+    - tuple: (parents, children, childHashes, childMoves), the index of every child's parent in states,
+      a (children, cells) uint8 array of the children, their Zobrist hashes and the values of the moved tiles.
+    """
+    cells = board_size * board_size
+    zeros = np.argmax(states == 0, axis=1)
+    tileCells = move_table(board_size)[zeros]
+    parents, directions = np.nonzero(tileCells >= 0)
+    tileCells = tileCells[parents, directions]
+    zeros = zeros[parents]
+
+    children = states[parents]
+    rows = np.arange(len(children))
+    childMoves = children[rows, tileCells]
+    children[rows, zeros] = childMoves
+    children[rows, tileCells] = 0
+
+    keys = zobrist_key_array(board_size)
+    tileKeys = childMoves.astype(np.intp) * cells
+    childHashes = hashes[parents] ^ keys[tileKeys + zeros] ^ keys[tileKeys + tileCells]
+    return parents, children, childHashes, childMoves
+
+
+def GBFS(board, interrupt_event, heuristic_func=None, batch_size=DEFAULT_BATCH_SIZE, checkpoint=None):
     """
     Performs Greedy Best-First Search (GBFS) for the sliding tile problem.
 
+    The best batch_size states of the open list are popped together, all of their children are generated
+    and scored as one NumPy batch, so the interpreter's per state overhead is shared by the batch.
+
     Parameters:
     - board (numpy.ndarray): The current state of the sliding tile board.
     - interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+    - heuristic_func (function): The heuristic to use, one of Heuristics.HEURISTIC_MAP,
+      defaults to the misplaced axes heuristic.
+    - batch_size (int): The number of states popped together, 1 expands one state at a time.
+    - checkpoint (SearchCheckpoint): If given, the search resumes from its snapshot,
+      and saves its open list and reached states to it when interrupted (see SearchCheckpoint).
 
     Returns:
     - tuple: A tuple containing the path (list) and the total number of states evaluated during the search.
     """
-    goal = TilesBoard.generate_goal_state(len(board))
+    heuristic_func = heuristic_func or Heuristics.board_heuristic
+    board_size = len(board)
+    cells = board_size * board_size
+    goal = bytes(range(cells))
     totalChecks = 0
     count = 0
-    # a dict containing a state as key and a (parentState ,move ) tuple as value
+    # a dict containing a state's Zobrist hash as key and a (parentHash ,move ) tuple as value
     reached = {}
     frontier = []
-    # heapq sorts elements in the min heap based on the first value of the tuple
-    heapq.heappush(frontier, (heuristic(board), count, board, None, None))
+    snapshot = checkpoint.load(heuristic_func.__name__) if checkpoint is not None else None
+    if snapshot is None:
+        # heapq sorts elements in the min heap based on the first value of the tuple,
+        # states are kept as bytes so a batch of them turns into one array at once
+        heapq.heappush(frontier, (heuristic_func(board), count, zobrist_hash(board), None, None,
+                                  np.asarray(board, dtype=np.uint8).tobytes()))
+    else:
+        totalChecks, count, reached, frontier = (snapshot["checks"], snapshot["count"], snapshot["reached"],
+                                                 snapshot["frontier"])
+
+    def save_checkpoint():
+        checkpoint.save({"checks": totalChecks, "count": count, "reached": reached, "frontier": frontier},
+                        heuristic_func.__name__)
 
     while (len(frontier) > 0) and (not interrupt_event.is_set()):
+        if checkpoint is not None and checkpoint.due():
+            save_checkpoint()
+
+        batch = []
+        while frontier and len(batch) < batch_size:
+            _, _, currHash, parent, parentMove, currState = heapq.heappop(frontier)
+            # a state can be pushed by several parents before it is expanded
+            if currHash in reached:
+                continue
+            # adding the current state to the reached dict
+            reached[currHash] = (parent, parentMove)
+            totalChecks += 1
 
-        _, _, currState, parent, parentMove = heapq.heappop(frontier)
-        totalChecks += 1
+            if currState == goal:
+                path = reconstruct_path(parent, parentMove, reached)
+                return path, totalChecks
 
-        if np.array_equal(goal, currState):
-            path = reconstruct_path(parent, parentMove, reached)
-            return path, totalChecks
-        # adding the current state to the reached dict
-        # we convert the current state to a tuple because dictionary keys must be Hashable
-        currStateTuple = state_to_tuple(currState)
-        reached[currStateTuple] = (parent, parentMove)
+            batch.append((currHash, currState))
 
-        childStates = find_child_states(currState)
-        # add child states to the frontier heap
-        for childState, childMove in childStates:
-            # we convert the childState to a tuple because dictionary keys must Hashable
-            childStateTuple = state_to_tuple(childState)
-            if childStateTuple not in reached:
-                priority = heuristic(childState)
-                # a count is added to the tuple that is inserted into frontier as a tiebreaker
-                # in case of 2 child states with the same priority
-                # as it does not matter which child is checked if they have the same priority
-                count += 1
-                heapq.heappush(frontier, (priority, count, childState, currStateTuple, childMove))
+        if not batch:
+            continue
 
+        states = np.frombuffer(b"".join(state for _, state in batch), dtype=np.uint8).reshape((len(batch), cells))
+        hashes = np.array([currHash for currHash, _ in batch], dtype=np.uint64)
+        parents, children, childHashes, childMoves = expand_batch(states, hashes, board_size)
+
+        childHashes = childHashes.tolist()
+        keep = np.array([childHash not in reached for childHash in childHashes], dtype=bool)
+        priorities = Heuristics.batch_scores(children[keep], board_size, heuristic_func).tolist()
+        # add child states to the frontier heap
+        for index, priority in zip(np.flatnonzero(keep).tolist(), priorities):
+            # a count is added to the tuple that is inserted into frontier as a tiebreaker
+            # in case of 2 child states with the same priority
+            # as it does not matter which child is checked if they have the same priority
+            count += 1
+            heapq.heappush(frontier, (priority, count, childHashes[index], batch[parents[index]][0],
+                                      int(childMoves[index]), children[index].tobytes()))
+
+    if checkpoint is not None and interrupt_event.is_set():
+        save_checkpoint()
     return None, totalChecks
 
 
@@ -258,64 +573,170 @@ class Node:
      Nodes are sorted by their priority as seen in the __lt__ method
 
      the node class wraps the state with its parent the move from the parent to the state the cost
-     to get to the state and its priority
+     to get to the state and its priority, and the state's Zobrist hash (self.stateHash)
+     and the key of its duplicate check (self.stateKey)
     """
 
-    def __init__(self, state, parent, parentMove, cost, priority):
+    def __init__(self, state, parent, parentMove, cost, priority, stateHash=None, stateKey=None):
         self.state = state
         self.parent = parent
         self.parentMove = parentMove
         self.cost = cost
         self.priority = priority
+        self.stateHash = stateHash
+        # the key of the duplicate check, the hash unless mirrored states share their key
+        self.stateKey = stateHash if stateKey is None else stateKey
 
     def __lt__(self, other):
         return self.priority < other.priority
 
 
-def AStar(board, interrupt_event):
+def flatten_nodes(frontier):
+    """
+    Turns a frontier of Nodes and their ancestors into flat tuples that pickle without deep recursion.
+
+    Parameters:
+    - frontier (list of Node): The frontier.
+
+    Returns:
+    - tuple: The nodes as (state, parentIndex, parentMove, cost, priority, stateHash, stateKey) tuples,
+      every parent before its children, and the index of every frontier node among them.
+    """
+    indexes = {}
+    nodes = []
+    for node in frontier:
+        chain = []
+        while node is not None and id(node) not in indexes:
+            chain.append(node)
+            node = node.parent
+        for node in reversed(chain):
+            indexes[id(node)] = len(nodes)
+            parentIndex = -1 if node.parent is None else indexes[id(node.parent)]
+            nodes.append((node.state, parentIndex, node.parentMove, node.cost, node.priority, node.stateHash,
+                          node.stateKey))
+    return nodes, [indexes[id(node)] for node in frontier]
+
+
+def restore_nodes(nodes, frontierIndexes):
+    """
+    Rebuilds the frontier flattened by flatten_nodes.
+
+    Parameters:
+    - nodes (list of tuple): The flat nodes.
+    - frontierIndexes (list of int): The index of every frontier node, in the order of the heap.
+
+    Returns:
+    - list of Node: The frontier, still a heap.
+    """
+    restored = []
+    for state, parentIndex, parentMove, cost, priority, stateHash, stateKey in nodes:
+        parent = None if parentIndex < 0 else restored[parentIndex]
+        restored.append(Node(state, parent, parentMove, cost, priority, stateHash, stateKey))
+    return [restored[index] for index in frontierIndexes]
+
+
+def AStar(board, interrupt_event, heuristic_func=None, batch_size=DEFAULT_BATCH_SIZE, symmetric=False,
+          checkpoint=None):
     """
     Performs A* Search for the sliding tile problem.
 
+    Up to batch_size nodes that share the lowest priority are popped together, and all of their children are
+    generated and scored as one NumPy batch. Children never have a lower priority than their parent
+    with the heuristics of Heuristics.HEURISTIC_MAP, so the first goal found is still a shortest solution.
+    States are expanded once, the first expansion of a state already has its lowest cost.
+    With symmetric, a state and its mirror about the main diagonal are expanded once between them:
+    the goal is its own mirror and the heuristics score mirrored states alike, so the mirror of a state
+    never leads to a shorter solution.
+
     Parameters:
     - board (numpy.ndarray): The current state of the sliding tile board.
     - interrupt_event (multiprocessing.Event): An event to interrupt the search process.
+    - heuristic_func (function): The heuristic to use, one of Heuristics.HEURISTIC_MAP,
+      defaults to the misplaced axes heuristic.
+    - batch_size (int): The largest number of nodes popped together, 1 expands one node at a time.
+    - symmetric (bool): True to share the duplicate check between mirrored states.
+    - checkpoint (SearchCheckpoint): If given, the search resumes from its snapshot,
+      and saves its frontier and expanded states to it when interrupted (see SearchCheckpoint).
 
     Returns:
     - tuple: A tuple containing the path (list) and the total number of states evaluated during the search.
     """
-    goal = TilesBoard.generate_goal_state(len(board))
+    heuristic_func = heuristic_func or Heuristics.board_heuristic
+    options = (heuristic_func.__name__, symmetric)
+    board_size = len(board)
+    cells = board_size * board_size
+    goal = bytes(range(cells))
     totalChecks = 0
+    # the keys of the expanded states
+    expanded = set()
     # frontier is a min heap that contains a Node object
     frontier = []
-    # heapq sorts elements in the min heap based on the priority of the node value of the tuple
-    boardNode = Node(board, None, None, 0, heuristic(board))
-    heapq.heappush(frontier, boardNode)
-    # because this is a tree search I added a last minute stopping condition in case there isn't a solution
+    snapshot = checkpoint.load(options) if checkpoint is not None else None
+    if snapshot is None:
+        # heapq sorts elements in the min heap based on the priority of the node value of the tuple
+        boardState = np.asarray(board, dtype=np.uint8)
+        boardHash = zobrist_hash(board)
+        boardNode = Node(boardState.tobytes(), None, None, 0, heuristic_func(board), boardHash,
+                         symmetric_key(boardState, boardHash) if symmetric else None)
+        heapq.heappush(frontier, boardNode)
+    else:
+        totalChecks, expanded = snapshot["checks"], snapshot["expanded"]
+        frontier = restore_nodes(snapshot["nodes"], snapshot["frontier"])
+
+    def save_checkpoint():
+        nodes, frontierIndexes = flatten_nodes(frontier)
+        checkpoint.save({"checks": totalChecks, "expanded": expanded, "nodes": nodes, "frontier": frontierIndexes},
+                        options)
+
+    # the frontier runs out when there isn't a solution
     while (len(frontier) > 0) and (not interrupt_event.is_set()):
+        if checkpoint is not None and checkpoint.due():
+            save_checkpoint()
+
+        batch = []
+        lowest = frontier[0].priority
+        while frontier and frontier[0].priority == lowest and len(batch) < batch_size:
+            currStateNode = heapq.heappop(frontier)
+            if currStateNode.stateKey in expanded:
+                continue
+            expanded.add(currStateNode.stateKey)
+            totalChecks += 1
 
-        currStateNode = heapq.heappop(frontier)
-        currState = currStateNode.state
-        totalChecks += 1
+            if currStateNode.state == goal:
+                path = []
+                # reconstruct path to starting node
+                while currStateNode.parent is not None:
+                    move = currStateNode.parentMove
+                    path.insert(0, move)
+                    currStateNode = currStateNode.parent
 
-        if np.array_equal(goal, currState):
-            path = []
-            # reconstruct path to starting node
-            while currStateNode.parent is not None:
-                move = currStateNode.parentMove
-                path.insert(0, move)
-                currStateNode = currStateNode.parent
+                return path, totalChecks
 
-            return path, totalChecks
+            batch.append(currStateNode)
 
-        childStates = find_child_states(currState)
+        if not batch:
+            continue
+
+        states = np.frombuffer(b"".join(node.state for node in batch), dtype=np.uint8).reshape((len(batch), cells))
+        hashes = np.array([node.stateHash for node in batch], dtype=np.uint64)
+        parents, children, childHashes, childMoves = expand_batch(states, hashes, board_size)
+
+        childKeys = np.minimum(childHashes, mirror_hashes(children, board_size)) if symmetric else childHashes
+        childKeys = childKeys.tolist()
+        childHashes = childHashes.tolist()
+        keep = np.array([childKey not in expanded for childKey in childKeys], dtype=bool)
+        scores = Heuristics.batch_scores(children[keep], board_size, heuristic_func).tolist()
         # add child states to the frontier heap
-        for childState, childMove in childStates:
+        for index, score in zip(np.flatnonzero(keep).tolist(), scores):
+            parentNode = batch[parents[index]]
             # the cost of any move is the cost of its parent + 1
-            childCost = currStateNode.cost + 1
-            priority = heuristic(childState) + childCost
-            childNode = Node(childState, currStateNode, childMove, childCost, priority)
+            childCost = parentNode.cost + 1
+            childNode = Node(children[index].tobytes(), parentNode, int(childMoves[index]), childCost,
+                             score + childCost, childHashes[index], childKeys[index])
             heapq.heappush(frontier, childNode)
 
+    if checkpoint is not None and interrupt_event.is_set():
+        save_checkpoint()
     # if we did not find the solution we exit
     return None, totalChecks
 
@@ -330,21 +751,9 @@ def heuristic(board):
     Returns:
     - int: The heuristic score for the board.
     """
-    score = 0
-    for row in range(len(board)):
-        for column in range(len(board)):  # assume square matrix
-            currTile = board[row][column]
-            if currTile == 0:
-                # skip count for 0 tile
-                continue
-            currTileGoalRow = currTile // 3
-            currTileGoalColumn = currTile % 3
-            if row != currTileGoalRow:  # currTile is not in its goal row
-                score += 1
-            if column != currTileGoalColumn:  # currTile is not in its goal column
-                score += 1
-
-    return score
+    # the per tile scores (1 for being out of the goal row and 1 for being out of the goal column)
+    # are precomputed per board size in Heuristics
+    return Heuristics.board_heuristic(board)
 
 
 def reconstruct_path(parent, parentMove, reached):
@@ -352,9 +761,9 @@ def reconstruct_path(parent, parentMove, reached):
     Reconstructs the path from the initial state to the goal state based on the parent-child relationships.
 
     Parameters:
-    - parent: The parent state from which the reconstruction begins.
+    - parent: The hash of the parent state from which the reconstruction begins.
     - parentMove (int): The move (the value of the tile) that led from the parent state to the current state.
-    - reached (dict): A dictionary mapping states to their parent states and corresponding moves.
+    - reached (dict): A dictionary mapping state hashes to their parent state hashes and corresponding moves.
 
     Returns:
     - list: The reconstructed path from the initial state to the goal state.
@@ -420,7 +829,7 @@ def get_user_board():
         sys.exit()
 
     # Convert the list of numbers to a 2D board
-    board = np.empty([3, 3])
+    board = np.empty([3, 3], dtype=int)
     for i in range(3):
         for j in range(3):
             board[i, j] = numbers[j + i * 3]
@@ -428,46 +837,197 @@ def get_user_board():
     return board
 
 
-ALGO_MAP = {"BFS": BFS, "IDDFS": IDDFS, "GBFS": GBFS, "A*": AStar}
+ALGO_MAP = {"BFS": BFS, "Frontier BFS": frontier_bfs, "IDDFS": IDDFS, "GBFS": GBFS, "A*": AStar,
+            "Constructive": constructive_solve, PORTFOLIO_ANY: portfolio_solve,
+            PORTFOLIO_OPTIMAL: functools.partial(portfolio_solve, quality=QUALITY_OPTIMAL),
+            REALTIME_ALGO: realtime_solve}
+# the algorithms that save their search to a checkpoint when interrupted and resume it on the same board
+CHECKPOINT_ALGOS = {"BFS", "IDDFS", "GBFS", "A*"}
 
 
 class TilesSolver:
     """
     A class that solves sliding tile problems using various search algorithms.
+
+    A receiver thread reads the incoming messages, it answers hint requests right away from the hint service
+    and hands every other task to the scheduler, so hints never wait for a running search.
+    The solving loop takes the tasks from the scheduler, game tasks first (see TaskScheduler).
+    Every task is counted and timed in metrics.
+    The real-time search of a game streams its moves as it commits them and learns into the same heuristic
+    from game to game, saved to learned_path after every game.
+    The searches of CHECKPOINT_ALGOS keep their state in checkpoints when they are interrupted, so asking for
+    the same board again resumes them, from checkpoint_dir after a restart if one is given.
     """
 
-    def __init__(self, interrupt_event, gui_to_solver_queue, solver_to_gui_queue):
+    def __init__(self, interrupt_event, gui_to_solver_queue, solver_to_gui_queue, metrics=None, profile_dir=None,
+                 scheduler=None, learned_path=None, checkpoint_dir=None):
         self.interrupt_event = interrupt_event
         self.gui_to_solver_queue = gui_to_solver_queue
         self.solver_to_gui_queue = solver_to_gui_queue
+        self.hint_service = HintService()
+        # the tasks read by the receiver thread that the solving loop did not take yet
+        self.scheduler = scheduler or TaskScheduler()
+        self.metrics = metrics or SolverMetrics(self.hint_service, self.scheduler)
+        # where the reports of profiled tasks are written, SolverProfiler.DEFAULT_PROFILE_DIR by default
+        self.profile_dir = profile_dir
+        # the heuristic learned by the real-time search, kept in memory only without a path
+        self.learned = LearnedHeuristic(learned_path)
+        # the snapshots of interrupted searches, kept in memory only without a directory
+        self.checkpoints = CheckpointStore(checkpoint_dir)
+        # the receiver thread and the solving loop both send messages
+        self._send_lock = threading.Lock()
+
+    def send(self, message):
+        """
+        Sends an encoded message to the GUI.
+
+        Parameters:
+        - message (bytes): The encoded message.
+        """
+        with self._send_lock:
+            self.solver_to_gui_queue.put(message)
+
+    def receive_tasks(self):
+        """
+        Reads the incoming messages until the process is terminated,
+        answering hint requests and queueing every other task for solve_tiles.
+        """
+        while True:
+            task = decode_message(self.gui_to_solver_queue.get())
+            if isinstance(task, TilesSolverHintRequest):
+                self.metrics.task_received("hint")
+                self.send(encode_hint(self.hint_service.hint(task)))
+            else:
+                self.metrics.task_received("batch" if isinstance(task, TilesSolverBatchTask) else "task")
+                self.scheduler.push(task, time.monotonic())
 
     def solve_tiles(self):
         """
         Solves sliding tile problems based on the received tasks.
+
+        Tasks arrive encoded with the binary protocol of TilesSolverProtocol and solutions are sent back
+        encoded the same way.
         """
+        threading.Thread(target=self.receive_tasks, name="TilesSolverReceiver", daemon=True).start()
+
         #  Consumer for tile boards to solve
         while True:
-            try:
-                task = self.gui_to_solver_queue.get(timeout=1)
-
-                if self.interrupt_event.is_set():
-                    # The event is to be set to interrupt a running calculation
-                    # and not to prevent from a calculation to start running
-                    self.interrupt_event.clear()
-
-                print(f"Got task from GUI {task}")
-                algo = ALGO_MAP.get(task.algo_name)
-                solution, _ = algo(task.tiles_board, self.interrupt_event)
-
-                if self.interrupt_event.is_set():
-                    # Allow GUI to interrupt process again
-                    print(f"Process interrupted {self.interrupt_event.is_set()}")
-                    self.interrupt_event.clear()
-                else:
-                    self.solver_to_gui_queue.put(TilesSolverSolution(solution, task.board_id))
-
-            except queue.Empty:
-                pass
+            scheduled = self.scheduler.pop()
+            if not scheduled.resumed:
+                self.metrics.task_started(time.monotonic() - scheduled.received)
+
+            if self.interrupt_event.is_set():
+                # The event is to be set to interrupt a running calculation
+                # and not to prevent from a calculation to start running
+                self.interrupt_event.clear()
+
+            if scheduled.priority == PRIORITY_BATCH:
+                self.solve_batch(scheduled)
+            else:
+                task = scheduled.task
+                self.solve_board(task.algo_name, task.tiles_board, scheduled.board_ids, scheduled.profile,
+                                 task.move_time, stream_moves=True)
+
+    def solve_board(self, algo_name, board, board_ids, profile=False, move_time=None, stream_moves=False):
+        """
+        Solves a single board and sends the solution back unless the search was interrupted.
+
+        Parameters:
+        - algo_name (str): The name of the search algorithm to be used.
+        - board (numpy.ndarray): The board to solve.
+        - board_ids (list of str): The identifiers the solution is sent to, one message each.
+        - profile (bool): True to run the search under the profiler and report its peak memory in the solution.
+        - move_time (float): The time a real-time search may think about every move, None for its default.
+        - stream_moves (bool): True to send every move of a real-time search as soon as it is committed.
+
+        Returns:
+        - bool: True if the search ran to completion and False if it was interrupted.
+        """
+        algo = ALGO_MAP.get(algo_name)
+        checkpoint = None
+        if algo_name in CHECKPOINT_ALGOS:
+            checkpoint = self.checkpoints.checkpoint(algo_name, board)
+            algo = functools.partial(algo, checkpoint=checkpoint)
+        elif algo_name == REALTIME_ALGO:
+            options = {"learned": self.learned}
+            if move_time is not None:
+                options["move_time"] = move_time
+            if stream_moves:
+                def send_move(move):
+                    for board_id in board_ids:
+                        self.send(encode_move(TilesSolverMove(move, board_id)))
+                options["on_move"] = send_move
+            algo = functools.partial(algo, **options)
+        iterations = None
+        if algo_name == "IDDFS":
+            # the transposition table's lookups and cutoffs of every iteration, for the metrics
+            iterations = []
+            algo = functools.partial(algo, stats=iterations)
+        report = None
+        start = time.perf_counter()
+        if profile:
+            # imported only when asked for, so cProfile, pstats and tracemalloc stay out of unprofiled solvers
+            from Solver.SolverProfiler import profiled_solve
+            (solution, totalChecks), report = profiled_solve(algo, board, self.interrupt_event, board_ids[0],
+                                                             algo_name, self.profile_dir)
+        else:
+            solution, totalChecks = algo(board, self.interrupt_event)
+        interrupted = self.interrupt_event.is_set()
+        table = None
+        if iterations is not None:
+            table = (sum(iteration["probes"] for iteration in iterations),
+                     sum(iteration["cutoffs"] for iteration in iterations))
+        self.metrics.search_finished(algo_name, len(board), time.perf_counter() - start, totalChecks, interrupted,
+                                     table)
+        if algo_name == REALTIME_ALGO:
+            # what was learned is kept even when the game was interrupted
+            self.learned.save()
+
+        if interrupted:
+            # Allow GUI to interrupt process again, the search saved its checkpoint
+            self.interrupt_event.clear()
+            return False
+        if checkpoint is not None:
+            checkpoint.clear()
+
+        for board_id in board_ids:
+            if report is None:
+                self.send(encode_solution(TilesSolverSolution(solution, board_id)))
+            else:
+                self.send(encode_solution(TilesSolverSolution(solution, board_id, report.peak_memory,
+                                                              report.report_path)))
+        return True
+
+    def solve_batch(self, scheduled):
+        """
+        Solves every board of a batch stored in shared memory, identical boards once.
+        An interrupt stops the whole batch. When a game task is waiting, the batch gives way to it
+        between two boards and is put back into the scheduler with the boards left.
+
+        Parameters:
+        - scheduled (ScheduledTask): The batch, as taken from the scheduler.
+        """
+        batch_task = scheduled.task
+        if scheduled.boards is None:
+            shared_batch = SharedBoardBatch.attach(batch_task)
+            boards = shared_batch.copy_boards()
+            shared_batch.close()
+
+            # every distinct board with the indexes it appears at, in the order of first appearance
+            indexes = {}
+            for index, board in enumerate(boards):
+                indexes.setdefault(board.tobytes(), (board, []))[1].append(index)
+            scheduled.boards = list(indexes.values())
+
+        for offset, (board, board_indexes) in enumerate(scheduled.boards):
+            if self.scheduler.game_waiting():
+                scheduled.boards = scheduled.boards[offset:]
+                self.scheduler.resume(scheduled)
+                return
+
+            board_ids = [batch_board_id(batch_task.batch_id, index) for index in board_indexes]
+            if not self.solve_board(batch_task.algo_name, board, board_ids):
+                break
 
 
 class DummyEvent:
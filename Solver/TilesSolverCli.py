@@ -0,0 +1,222 @@
+"""
+Headless batch solver for sliding tile boards.
+
+Reads boards of any size from a file or stdin, one board per line as its tile values row by row
+(separated by spaces or commas, blank lines and lines starting with # are skipped),
+solves them on a pool of worker processes and writes one JSON line per board to stdout
+as soon as that board is done, so results may come out of input order (use the "line" field to match them).
+
+Usage:
+    python -m Solver.TilesSolverCli boards.txt --algo A* --heuristic manhattan --workers 4
+    cat boards.txt | python -m Solver.TilesSolverCli --algo IDDFS
+    python -m Solver.TilesSolverCli slow_board.txt --algo BFS --profile /tmp/profiles
+    python -m Solver.TilesSolverCli boards.txt --algo "Portfolio (optimal)" --engines BFS,IDDFS,A*
+
+With --profile every board is solved under cProfile and tracemalloc, its report is written to the given directory
+(named after the input line) and its result gets the peak memory and the report's path.
+The portfolio algorithms race their engines in processes of their own, so their boards are solved one at a time
+in this process whatever the number of workers.
+
+Functions:
+    - parse_board_line: Parses one input line into a board.
+    - solve_job: Solves one board and returns its JSON ready result.
+    - main: Runs the command line interface.
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+import sys
+import time
+import numpy as np
+from Solver import Heuristics
+from Solver import TilesBoardCore
+from Solver.PortfolioSolver import DEFAULT_ENGINES, PORTFOLIO_ANY, PORTFOLIO_OPTIMAL
+from Solver.TilesSolver import ALGO_MAP, DummyEvent
+from Solver.TilesSolverProcess import get_solver_context, preload_solver_tables
+
+# the algorithms that accept a heuristic
+HEURISTIC_ALGOS = {"GBFS", "A*"}
+# the algorithms that start processes of their own, they cannot run in the pool's daemonic workers
+PORTFOLIO_ALGOS = {PORTFOLIO_ANY, PORTFOLIO_OPTIMAL}
+
+
+def parse_board_line(line):
+    """
+    Parses one input line into a board.
+
+    Args:
+        line (str): The tile values of the board row by row.
+
+    Returns:
+        numpy.ndarray: The board.
+
+    Raises:
+        ValueError: If the line is not a valid square board.
+    """
+    numbers = [int(token) for token in line.replace(",", " ").split()]
+    board_size = math.isqrt(len(numbers))
+    if board_size < 2 or board_size * board_size != len(numbers):
+        raise ValueError(f"expected a square number of at least 4 tiles but got {len(numbers)}")
+
+    board = np.array(numbers, dtype=int).reshape((board_size, board_size))
+    if not np.array_equal(np.sort(board.ravel()), np.arange(board.size)):
+        raise ValueError(f"a {board_size}x{board_size} board must hold every number from 0 to {board.size - 1}")
+
+    return board
+
+
+def read_jobs(stream):
+    """
+    Reads the jobs from an input stream.
+
+    Args:
+        stream: A text stream with one board per line.
+
+    Yields:
+        tuple: The line number and the stripped line of every line that holds a board.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line_number, line
+
+
+def solve_job(job, algo_name, heuristic_name, profile_dir=None, engines=DEFAULT_ENGINES):
+    """
+    Solves one board.
+    This is the function the worker processes run so every error is turned into a result.
+
+    Args:
+        job (tuple): The line number and the line of the board.
+        algo_name (str): The name of the search algorithm to be used.
+        heuristic_name (str): The name of the heuristic to be used by the algorithms that take one.
+        profile_dir (str): If given, the search is profiled and its report is written to this directory.
+        engines (iterable of str): The algorithms the portfolio algorithms race.
+
+    Returns:
+        dict: The JSON ready result.
+    """
+    line_number, line = job
+    result = {"line": line_number, "algo": algo_name}
+    try:
+        board = parse_board_line(line)
+    except ValueError as error:
+        result["error"] = str(error)
+        return result
+
+    result["board"] = board.ravel().tolist()
+    if not TilesBoardCore.is_solvable(board):
+        result["error"] = "board is not solvable"
+        return result
+
+    algo = ALGO_MAP.get(algo_name)
+    if algo_name in HEURISTIC_ALGOS:
+        algo = functools.partial(algo, heuristic_func=Heuristics.HEURISTIC_MAP.get(heuristic_name))
+        result["heuristic"] = heuristic_name
+
+    iterations = None
+    if algo_name == "IDDFS":
+        iterations = []
+        algo = functools.partial(algo, stats=iterations)
+
+    portfolio = None
+    if algo_name in PORTFOLIO_ALGOS:
+        portfolio = {}
+        algo = functools.partial(algo, engines=engines, stats=portfolio)
+
+    report = None
+    start = time.perf_counter()
+    if profile_dir is None:
+        path, total_checks = algo(board, DummyEvent())
+    else:
+        # imported only when asked for, so cProfile, pstats and tracemalloc stay out of unprofiled runs
+        from Solver.SolverProfiler import profiled_solve
+        (path, total_checks), report = profiled_solve(algo, board, DummyEvent(), f"line{line_number}", algo_name,
+                                                      profile_dir)
+    seconds = time.perf_counter() - start
+
+    result["path"] = None if path is None else [int(move) for move in path]
+    result["length"] = None if path is None else len(path)
+    result["stats"] = {"checks": total_checks, "seconds": round(seconds, 6),
+                       "checks_per_second": round(total_checks / seconds) if seconds > 0 else None}
+    if iterations is not None:
+        result["stats"]["iterations"] = [dict(iteration, seconds=round(iteration["seconds"], 6))
+                                         for iteration in iterations]
+    if portfolio is not None:
+        result["stats"]["winner"] = portfolio["winner"]
+    if report is not None:
+        result["stats"]["peak_memory"] = report.peak_memory
+        result["profile"] = report.report_path
+    return result
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line arguments.
+
+    Args:
+        argv (list of str): The arguments, defaults to sys.argv.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Solves many sliding tile boards, one per input line, "
+                                                 "and streams one JSON line per result.")
+    parser.add_argument("input", nargs="?", default="-", help="A file with one board per line, - for stdin")
+    parser.add_argument("--algo", default="A*", choices=list(ALGO_MAP.keys()), help="The search algorithm")
+    parser.add_argument("--heuristic", default="misplaced-axes", choices=list(Heuristics.HEURISTIC_MAP.keys()),
+                        help="The heuristic used by GBFS and A*")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="The number of worker processes, 1 solves in this process")
+    parser.add_argument("--profile", metavar="DIR", default=None,
+                        help="Profile every search with cProfile and tracemalloc and write the reports to DIR")
+    parser.add_argument("--engines", default=",".join(DEFAULT_ENGINES),
+                        help="The comma separated algorithms the portfolio algorithms race")
+    return parser.parse_args(argv)
+
+
+def write_result(result, out):
+    """
+    Writes one result as a JSON line and flushes it so it can be consumed right away.
+
+    Args:
+        result (dict): The result.
+        out: The output text stream.
+    """
+    out.write(json.dumps(result) + "\n")
+    out.flush()
+
+
+def main(argv=None, out=sys.stdout):
+    """
+    Runs the command line interface.
+
+    Args:
+        argv (list of str): The arguments, defaults to sys.argv.
+        out: The output text stream.
+    """
+    args = parse_args(argv)
+    stream = sys.stdin if args.input == "-" else open(args.input)
+    solve = functools.partial(solve_job, algo_name=args.algo, heuristic_name=args.heuristic,
+                              profile_dir=args.profile, engines=args.engines.split(","))
+
+    try:
+        if args.workers <= 1 or args.algo in PORTFOLIO_ALGOS:
+            for job in read_jobs(stream):
+                write_result(solve(job), out)
+        else:
+            context = get_solver_context()
+            with context.Pool(args.workers, initializer=preload_solver_tables) as pool:
+                # imap_unordered reads the input lazily and hands back every result as soon as it is ready
+                for result in pool.imap_unordered(solve, read_jobs(stream)):
+                    write_result(result, out)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Provides a small blocking client for the TilesSolverServer.
+
+The client owns one connection and a reader thread. Requests are pipelined: submit returns at once with
+a request id and answers are collected as they arrive, in any order.
+It also exposes the same queue and event interface the GUI uses with a local solver process,
+so MultiprocessingClient can use a shared server in place of its private queues.
+
+Classes:
+    - TilesSolverClient: A connection to a TilesSolverServer.
+"""
+
+import itertools
+import queue
+import socket
+import threading
+from Solver.SolverChannel import SolverChannel
+from Solver.TilesSolverMsgs import TilesSolverTask, TilesSolverSolution, TilesSolverHintRequest, TilesSolverHint
+from Solver.TilesSolverProtocol import (encode_task, encode_solution, encode_hint, decode_message, pack_frame,
+                                        unpack_frame_header, FRAME_HEADER, FRAME_SOLVE, FRAME_CANCEL, FRAME_RESULT,
+                                        FRAME_ERROR)
+
+
+def connect(address):
+    """
+    Opens a socket to a TilesSolverServer.
+
+    Args:
+        address (str or tuple): A Unix domain socket path, a "host:port" string or a (host, port) tuple.
+
+    Returns:
+        socket.socket: The connected socket.
+    """
+    if isinstance(address, str) and ":" in address:
+        host, port = address.rsplit(":", 1)
+        address = (host, int(port))
+
+    if isinstance(address, tuple):
+        return socket.create_connection(address)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.connect(address)
+    return sock
+
+
+class _TaskQueue:
+    """
+    The queue-like object the GUI puts encoded tasks into. Every put is sent as a solve request.
+    Requests are on the server as soon as they are put, so the queue always looks empty.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def put(self, encoded_task):
+        """ Sends an encoded task as a solve request. """
+        self.client.submit_encoded(encoded_task)
+
+    def empty(self):
+        """ Always True, requests never wait on the client side. """
+        return True
+
+    def get(self, *args, **kwargs):
+        """ Always raises queue.Empty, see empty. """
+        raise queue.Empty
+
+
+class _CancelAllEvent:
+    """
+    The event-like object the GUI sets to interrupt the solver. Setting it cancels every request
+    of this client that has not been answered yet.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def set(self):
+        """ Cancels every pending request. """
+        self.client.cancel_all()
+
+    def is_set(self):
+        """ Always False, cancelling takes effect at once. """
+        return False
+
+    def clear(self):
+        """ Does nothing, see is_set. """
+        pass
+
+
+class TilesSolverClient:
+    """
+    A connection to a TilesSolverServer.
+
+    Attributes:
+        sock (socket.socket): The connection.
+        solutions (SolverChannel): Encoded TilesSolverSolution messages in the order they arrived.
+        task_queue: A queue-like object for encoded tasks, a drop in for the GUI's gui_to_solver_queue.
+        interrupt_event: An event-like object that cancels all pending requests, a drop in for the GUI's event.
+        pending (dict): The requests that were not answered yet, by id, with the encoded answer of each
+            that tells the GUI there is no solution, put in solutions if the request fails or the connection drops.
+    """
+
+    def __init__(self, address):
+        """
+        Initializes a TilesSolverClient object and connects to the server.
+
+        Args:
+            address (str or tuple): A Unix domain socket path, a "host:port" string or a (host, port) tuple.
+        """
+        self.sock = connect(address)
+        self.solutions = SolverChannel()
+        self.task_queue = _TaskQueue(self)
+        self.interrupt_event = _CancelAllEvent(self)
+        self.pending = {}
+        self._request_ids = itertools.count(1)
+        # sending and the pending set have separate locks so a slow send never stalls the reader thread
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_frames, name="TilesSolverClient", daemon=True)
+        self._reader.start()
+
+    def _send(self, kind, request_id, payload=b""):
+        """ Sends one frame. """
+        with self._send_lock:
+            self.sock.sendall(pack_frame(kind, request_id, payload))
+
+    def _recv_exactly(self, size):
+        """ Reads exactly size bytes from the connection. """
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("solver server closed the connection")
+            data.extend(chunk)
+        return bytes(data)
+
+    def _read_frames(self):
+        """ Reads the server's answers until the connection is closed. """
+        try:
+            while True:
+                payload_length, kind, request_id = unpack_frame_header(self._recv_exactly(FRAME_HEADER.size))
+                payload = self._recv_exactly(payload_length)
+                with self._lock:
+                    failure = self.pending.pop(request_id, None)
+                if kind == FRAME_RESULT:
+                    self.solutions.put(payload)
+                elif kind == FRAME_ERROR and failure is not None:
+                    # the server rejected the request or its search failed, the board gets no solution
+                    self.solutions.put(failure)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            # nobody answers the pending requests anymore
+            with self._lock:
+                failures = list(self.pending.values())
+                self.pending.clear()
+            for failure in failures:
+                self.solutions.put(failure)
+
+    def submit_encoded(self, encoded_task):
+        """
+        Sends an encoded task as a solve request.
+
+        Args:
+            encoded_task (bytes): A task encoded with TilesSolverProtocol.encode_task,
+                or a hint request encoded with encode_hint_request.
+
+        Returns:
+            int: The id of the request.
+        """
+        request = decode_message(encoded_task)
+        if isinstance(request, TilesSolverHintRequest):
+            failure = encode_hint(TilesSolverHint(None, None, request.board_id))
+        else:
+            failure = encode_solution(TilesSolverSolution(None, request.board_id))
+        request_id = next(self._request_ids)
+        with self._lock:
+            self.pending[request_id] = failure
+        try:
+            self._send(FRAME_SOLVE, request_id, encoded_task)
+        except OSError:
+            # the connection is gone, answer the request at once unless the reader thread already did
+            with self._lock:
+                failure = self.pending.pop(request_id, None)
+            if failure is not None:
+                self.solutions.put(failure)
+        return request_id
+
+    def submit(self, algo_name, board, board_id):
+        """
+        Sends a solve request.
+
+        Args:
+            algo_name (str): The name of the search algorithm to be used.
+            board (numpy.ndarray): The board to solve.
+            board_id (str): The identifier of the board, it is returned with the solution.
+
+        Returns:
+            int: The id of the request.
+        """
+        return self.submit_encoded(encode_task(TilesSolverTask(algo_name, board, board_id)))
+
+    def cancel(self, request_id):
+        """
+        Cancels a request. The request is dropped from the pending set when the server confirms.
+
+        Args:
+            request_id (int): The id of the request.
+        """
+        self._send(FRAME_CANCEL, request_id)
+
+    def cancel_all(self):
+        """ Cancels every pending request. """
+        with self._lock:
+            request_ids = list(self.pending)
+        for request_id in request_ids:
+            self.cancel(request_id)
+
+    def get_solution(self, timeout=None):
+        """
+        Waits for the next solution.
+
+        Args:
+            timeout (float): The number of seconds to wait, None waits forever.
+
+        Returns:
+            TilesSolverSolution: The solution.
+
+        Raises:
+            queue.Empty: If no solution arrived in time.
+        """
+        return decode_message(self.solutions.get(timeout=timeout))
+
+    def close(self):
+        """ Closes the connection, the server cancels every pending request. """
+        self.sock.close()
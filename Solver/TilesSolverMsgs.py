@@ -4,6 +4,13 @@ Provides classes for representing tasks and solutions in the TilesSolver.
 Classes:
     - TilesSolverTask: Represents a task to be solved by the TilesSolver.
     - TilesSolverSolution: Represents a solution provided by the TilesSolver.
+    - TilesSolverBatchTask: Represents a batch of boards, stored in shared memory, to be solved by the TilesSolver.
+    - TilesSolverHintRequest: Asks the TilesSolver for the next move of a board.
+    - TilesSolverHint: Represents the next move of a board provided by the TilesSolver.
+    - TilesSolverMove: Represents one move committed by a real-time search, sent before its solution.
+
+Functions:
+    - batch_board_id: Returns the board identifier used in the solution of one board of a batch.
 """
 
 
@@ -15,9 +22,12 @@ class TilesSolverTask:
         algo_name (str): The name of the search algorithm to be used.
         tiles_board (numpy.ndarray): The initial state of the tiles board.
         board_id (int): The identifier of the board.
+        profile (bool): True to run the search under cProfile and tracemalloc, see SolverProfiler.
+        move_time (float or None): The time a real-time search may think about every move, in seconds,
+            None for its default.
     """
 
-    def __init__(self, algo_name, tiles_board, board_id):
+    def __init__(self, algo_name, tiles_board, board_id, profile=False, move_time=None):
         """
         Initializes a TilesSolverTask object.
 
@@ -25,10 +35,15 @@ class TilesSolverTask:
             algo_name (str): The name of the search algorithm to be used.
             tiles_board (numpy.ndarray): The initial state of the tiles board.
             board_id (int): The identifier of the board.
+            profile (bool): True to run the search under cProfile and tracemalloc, see SolverProfiler.
+            move_time (float or None): The time a real-time search may think about every move, in seconds,
+                None for its default.
         """
         self.algo_name = algo_name
         self.tiles_board = tiles_board
         self.board_id = board_id
+        self.profile = profile
+        self.move_time = move_time
 
 
 class TilesSolverSolution:
@@ -38,15 +53,137 @@ class TilesSolverSolution:
     Attributes:
         solution (list or None): The solution path or None if no solution is found.
         board_id (int): The identifier of the board associated with the solution.
+        peak_memory (int or None): The peak memory of a profiled search in bytes, None if it was not profiled.
+        profile_path (str or None): The path of the profile report of a profiled search.
     """
 
-    def __init__(self, solution, board_id):
+    def __init__(self, solution, board_id, peak_memory=None, profile_path=None):
         """
         Initializes a TilesSolverSolution object.
 
         Args:
             solution (list or None): The solution path or None if no solution is found.
             board_id (int): The identifier of the board associated with the solution.
+            peak_memory (int or None): The peak memory of a profiled search in bytes, None if it was not profiled.
+            profile_path (str or None): The path of the profile report of a profiled search.
         """
         self.solution = solution
         self.board_id = board_id
+        self.peak_memory = peak_memory
+        self.profile_path = profile_path
+
+
+class TilesSolverBatchTask:
+    """
+    Represents a batch of boards, stored in shared memory, to be solved by the TilesSolver.
+
+    Every board of the batch is answered with its own TilesSolverSolution whose board_id is
+    batch_board_id(batch_id, index).
+
+    Attributes:
+        algo_name (str): The name of the search algorithm to be used.
+        shm_name (str): The name of the shared memory block holding the boards.
+        board_size (int): The size of every board in the batch.
+        count (int): The number of boards in the batch.
+        batch_id (str): The identifier of the batch.
+    """
+
+    def __init__(self, algo_name, shm_name, board_size, count, batch_id):
+        """
+        Initializes a TilesSolverBatchTask object.
+
+        Args:
+            algo_name (str): The name of the search algorithm to be used.
+            shm_name (str): The name of the shared memory block holding the boards.
+            board_size (int): The size of every board in the batch.
+            count (int): The number of boards in the batch.
+            batch_id (str): The identifier of the batch.
+        """
+        self.algo_name = algo_name
+        self.shm_name = shm_name
+        self.board_size = board_size
+        self.count = count
+        self.batch_id = batch_id
+
+
+class TilesSolverHintRequest:
+    """
+    Asks the TilesSolver for the next move of a board.
+
+    Attributes:
+        tiles_board (numpy.ndarray): The current state of the tiles board.
+        board_id (str): The identifier of the board, consecutive positions of one game share it.
+    """
+
+    def __init__(self, tiles_board, board_id):
+        """
+        Initializes a TilesSolverHintRequest object.
+
+        Args:
+            tiles_board (numpy.ndarray): The current state of the tiles board.
+            board_id (str): The identifier of the board, consecutive positions of one game share it.
+        """
+        self.tiles_board = tiles_board
+        self.board_id = board_id
+
+
+class TilesSolverHint:
+    """
+    Represents the next move of a board provided by the TilesSolver.
+
+    Attributes:
+        move (int or None): The value of the tile to move, None if the board is solved or cannot be solved.
+        remaining (int or None): The number of moves left after the hinted one is played,
+            None if the board cannot be solved.
+        board_id (str): The identifier of the board associated with the hint.
+    """
+
+    def __init__(self, move, remaining, board_id):
+        """
+        Initializes a TilesSolverHint object.
+
+        Args:
+            move (int or None): The value of the tile to move, None if the board is solved or cannot be solved.
+            remaining (int or None): The number of moves left after the hinted one is played,
+                None if the board cannot be solved.
+            board_id (str): The identifier of the board associated with the hint.
+        """
+        self.move = move
+        self.remaining = remaining
+        self.board_id = board_id
+
+
+class TilesSolverMove:
+    """
+    Represents one move committed by a real-time search, sent as soon as it is committed.
+    The TilesSolverSolution of the board still follows with every move once the search is done.
+
+    Attributes:
+        move (int): The value of the moved tile.
+        board_id (int): The identifier of the board associated with the move.
+    """
+
+    def __init__(self, move, board_id):
+        """
+        Initializes a TilesSolverMove object.
+
+        Args:
+            move (int): The value of the moved tile.
+            board_id (int): The identifier of the board associated with the move.
+        """
+        self.move = move
+        self.board_id = board_id
+
+
+def batch_board_id(batch_id, index):
+    """
+    Returns the board identifier used in the solution of one board of a batch.
+
+    Args:
+        batch_id (str): The identifier of the batch.
+        index (int): The index of the board in the batch.
+
+    Returns:
+        str: The board identifier.
+    """
+    return f"{batch_id}:{index}"
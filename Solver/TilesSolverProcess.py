@@ -0,0 +1,147 @@
+"""
+Provides the entry point of the TilesSolver process.
+
+The solver process is started with the forkserver start method where it is available and with spawn
+otherwise, so it never inherits the GUI's memory or Tk state. The forkserver preloads SolverPreload,
+which builds the heuristic and finish tables once, so every solver process forked from it starts with the tables
+already in memory. Importing this module builds nothing, so the GUI and the command line entry points that
+import it start at once. Nothing in this module (or the modules it imports) may import tkinter.
+The solver process can expose its metrics (see SolverMetrics) as a Prometheus text file, a local HTTP endpoint,
+or both.
+
+The solver process is not daemonic, so the portfolio algorithm can start its engine processes from it.
+Whoever starts it must stop it with stop_tiles_solver_process.
+
+Functions:
+    - preload_solver_tables: Builds the tables every solver process needs.
+    - get_solver_context: Returns the multiprocessing context the solver processes are started with.
+    - run_tiles_solver: The target function of the solver process.
+    - start_tiles_solver_process: Starts a solver process.
+    - stop_tiles_solver_process: Stops a solver process and the engine processes it started.
+"""
+
+import multiprocessing
+import signal
+import sys
+from Solver import Heuristics
+from Solver.ConstructiveSolver import finish_table, FINISH_SIZE
+from Solver.RealTimeSearch import DEFAULT_LEARNED_PATH
+from Solver.SolverMetrics import MetricsExporter
+from Solver.TaskScheduler import TaskScheduler
+from Solver.TilesSolver import TilesSolver
+
+# modules the forkserver imports once, before forking any solver process
+FORKSERVER_PRELOAD = ["Solver.SolverPreload"]
+
+
+def preload_solver_tables(preload_sizes=Heuristics.DEFAULT_PRELOAD_SIZES):
+    """
+    Builds the tables every solver process needs, a no-op for the tables already built or inherited
+    from the forkserver.
+
+    Args:
+        preload_sizes (iterable of int): The board sizes to build heuristic tables for.
+    """
+    Heuristics.preload_tables(preload_sizes)
+    finish_table(FINISH_SIZE)
+
+
+def get_solver_context(start_method=None):
+    """
+    Returns the multiprocessing context the solver processes are started with.
+    Queues and events shared with a solver process must be created from this context.
+
+    Args:
+        start_method (str): "forkserver" or "spawn", by default forkserver is used when the platform supports it.
+
+    Returns:
+        multiprocessing.context.BaseContext: The context.
+    """
+    if start_method is None:
+        available = multiprocessing.get_all_start_methods()
+        start_method = "forkserver" if "forkserver" in available else "spawn"
+
+    context = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        # preload only the solver, by default the forkserver would import the GUI's __main__ module
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+
+    return context
+
+
+def run_tiles_solver(interrupt_event, gui_to_solver_queue, solver_to_gui_queue,
+                     preload_sizes=Heuristics.DEFAULT_PRELOAD_SIZES, metrics_file=None, metrics_port=None,
+                     learned_file=None, checkpoint_dir=None):
+    """
+    The target function of the solver process, solves tasks until the process is terminated.
+
+    Args:
+        interrupt_event: A multiprocessing.Event to interrupt a running search.
+        gui_to_solver_queue: A multiprocessing.Queue of encoded tasks.
+        solver_to_gui_queue: A SolverChannel for encoded solutions.
+        preload_sizes (iterable of int): The board sizes to build heuristic tables for before taking tasks.
+        metrics_file (str): If given, the metrics are rewritten to this file every few seconds.
+        metrics_port (int): If given, the metrics are served at http://127.0.0.1:metrics_port/metrics.
+        learned_file (str): The file the real-time search keeps its learned heuristic in between runs,
+            RealTimeSearch.DEFAULT_LEARNED_PATH by default.
+        checkpoint_dir (str): If given, interrupted searches are saved there and resumed by later runs too.
+    """
+    # exit through SystemExit on terminate, so multiprocessing stops the engine processes of a running portfolio
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    preload_solver_tables(preload_sizes)
+    # the GUI plays one game at a time, so a new game makes every pending game task stale
+    tiles_solver = TilesSolver(interrupt_event, gui_to_solver_queue, solver_to_gui_queue,
+                               scheduler=TaskScheduler(single_game=True),
+                               learned_path=learned_file or DEFAULT_LEARNED_PATH, checkpoint_dir=checkpoint_dir)
+
+    exporter = MetricsExporter(tiles_solver.metrics)
+    if metrics_file is not None:
+        exporter.start_file_writer(metrics_file)
+    if metrics_port is not None:
+        exporter.start_http(metrics_port)
+
+    tiles_solver.solve_tiles()
+
+
+def start_tiles_solver_process(context, interrupt_event, gui_to_solver_queue, solver_to_gui_queue,
+                               metrics_file=None, metrics_port=None, learned_file=None, checkpoint_dir=None):
+    """
+    Starts a solver process, it must be stopped with stop_tiles_solver_process.
+
+    Args:
+        context: The context returned by get_solver_context that the queues and event were created from.
+        interrupt_event: A multiprocessing.Event to interrupt a running search.
+        gui_to_solver_queue: A multiprocessing.Queue of encoded tasks.
+        solver_to_gui_queue: A SolverChannel for encoded solutions.
+        metrics_file (str): If given, the solver rewrites its metrics to this file every few seconds.
+        metrics_port (int): If given, the solver serves its metrics on this localhost port.
+        learned_file (str): The file the real-time search keeps its learned heuristic in between runs.
+        checkpoint_dir (str): If given, the solver saves interrupted searches there to resume them after a restart.
+
+    Returns:
+        multiprocessing.Process: The started process.
+    """
+    tiles_solver_process = context.Process(target=run_tiles_solver,
+                                           args=(interrupt_event, gui_to_solver_queue, solver_to_gui_queue),
+                                           kwargs={"metrics_file": metrics_file, "metrics_port": metrics_port,
+                                                   "learned_file": learned_file, "checkpoint_dir": checkpoint_dir},
+                                           name="TilesSolver")
+    tiles_solver_process.start()
+    return tiles_solver_process
+
+
+def stop_tiles_solver_process(tiles_solver_process, timeout=5.0):
+    """
+    Stops a solver process started by start_tiles_solver_process and the engine processes it started.
+
+    Args:
+        tiles_solver_process (multiprocessing.Process): The solver process.
+        timeout (float): How long the process gets to exit before it is killed, in seconds.
+    """
+    if tiles_solver_process.is_alive():
+        tiles_solver_process.terminate()
+        tiles_solver_process.join(timeout)
+    if tiles_solver_process.is_alive():
+        tiles_solver_process.kill()
+        tiles_solver_process.join()
@@ -0,0 +1,643 @@
+"""
+Provides a compact, versioned binary wire format for the messages exchanged between the GUI
+and the TilesSolver process.
+
+Boards are packed as one unsigned byte per tile and solution moves (the values of the moved tiles)
+are packed as one byte per move, so a 3x3 task is a few dozen bytes instead of a pickled numpy object
+array. Batches of boards are placed in a multiprocessing.shared_memory block and only a small control
+message carrying the block name travels through the queue.
+
+Messages sent over a stream (see TilesSolverServer) are wrapped in frames that carry the frame kind
+and the request id, so several requests can be in flight on one connection and answered out of order.
+The coordinator and workers of a cluster (see ClusterCoordinator) use the same frames, with the job id
+as the request id and payloads of their own: units of work, their results and the steals moving them.
+
+Classes:
+    - SharedBoardBatch: Owns or attaches to a shared memory block holding a batch of packed boards.
+
+Functions:
+    - encode_task: Encodes a TilesSolverTask into bytes.
+    - encode_solution: Encodes a TilesSolverSolution into bytes.
+    - encode_batch: Encodes a TilesSolverBatchTask control message into bytes.
+    - encode_hint_request: Encodes a TilesSolverHintRequest into bytes.
+    - encode_hint: Encodes a TilesSolverHint into bytes.
+    - encode_move: Encodes a TilesSolverMove into bytes.
+    - decode_message: Decodes bytes produced by any of the encode functions.
+    - pack_frame: Wraps a payload in a stream frame.
+    - unpack_frame_header: Reads the header of a stream frame.
+    - encode_cluster_job, decode_cluster_job: The job a cluster coordinator starts on its workers.
+    - encode_units, decode_units: Units of work, sent to a worker or given away by one.
+    - encode_steal, decode_steal: A request to give units to an idle worker.
+    - encode_unit_result, decode_unit_result: The result of one unit.
+"""
+
+import struct
+import numpy as np
+from multiprocessing import shared_memory
+from Solver.TilesSolverMsgs import (TilesSolverTask, TilesSolverSolution, TilesSolverBatchTask,
+                                   TilesSolverHintRequest, TilesSolverHint, TilesSolverMove)
+
+PROTOCOL_VERSION = 1
+MAGIC = b"TS"
+
+MSG_TASK = 1
+MSG_SOLUTION = 2
+MSG_BATCH = 3
+MSG_HINT_REQUEST = 4
+MSG_HINT = 5
+MSG_MOVE = 6
+
+# a tile value (and therefore a move) must fit in a single byte
+MAX_BOARD_SIZE = 15
+BOARD_DTYPE = np.uint8
+
+# magic, version, message type
+_HEADER = struct.Struct("<2sBB")
+# board size
+_BOARD_SIZE = struct.Struct("<B")
+# has solution flag, number of moves
+_SOLUTION_INFO = struct.Struct("<BI")
+# board size, number of boards
+_BATCH_INFO = struct.Struct("<BI")
+# has move flag, move, remaining moves (-1 when the board cannot be solved)
+_HINT_INFO = struct.Struct("<BBi")
+# task flags, after the board, a task without them has no flags set
+_TASK_FLAGS = struct.Struct("<B")
+TASK_FLAG_PROFILE = 1
+TASK_FLAG_MOVE_TIME = 2
+# the move time of a real-time search in seconds, after the task flags when TASK_FLAG_MOVE_TIME is set
+_MOVE_TIME = struct.Struct("<f")
+# the value of the moved tile
+_MOVE_INFO = struct.Struct("<B")
+# peak memory of a profiled search, followed by the path of its report, after the moves of a solution
+_PROFILE_INFO = struct.Struct("<Q")
+
+# stream frames, the payload of a solve frame is an encoded task and of a result frame an encoded solution
+FRAME_SOLVE = 1
+FRAME_CANCEL = 2
+FRAME_RESULT = 3
+FRAME_CANCELLED = 4
+FRAME_ERROR = 5
+# payload length, frame kind, request id
+FRAME_HEADER = struct.Struct("<IBI")
+MAX_FRAME_PAYLOAD = 1 << 24
+
+# cluster frames, coordinator to worker
+FRAME_JOB = 16
+FRAME_UNITS = 17
+FRAME_STEAL = 18
+FRAME_STOP = 19
+# cluster frames, worker to coordinator
+FRAME_UNIT_DONE = 20
+FRAME_IDLE = 21
+FRAME_GIVE = 22
+# cluster job modes, one IDA* iteration split into move prefixes or a batch of boards
+JOB_IDA = 1
+JOB_BATCH = 2
+# the bound of an IDA* job that no bound exceeds
+NO_BOUND = 0xFFFF
+# job mode, IDA* bound, board size (0 for a batch job)
+_JOB_INFO = struct.Struct("<BHB")
+# number of units
+_UNITS_COUNT = struct.Struct("<I")
+# unit id, length of its data
+_UNIT_INFO = struct.Struct("<II")
+# thief worker id, number of units created by splitting a running search, before the units of a give frame
+_GIVE_INFO = struct.Struct("<II")
+# thief worker id of a steal frame
+_STEAL_INFO = struct.Struct("<I")
+# unit id, has solution flag, next IDA* bound, states checked, seconds, number of moves
+_UNIT_RESULT_INFO = struct.Struct("<IBHQdI")
+
+
+class ProtocolError(ValueError):
+    """ Raised when a message cannot be encoded or decoded. """
+
+
+def _pack_str(value):
+    """
+    Packs a string with a 2 byte length prefix.
+
+    Args:
+        value (str): The string to pack.
+
+    Returns:
+        bytes: The packed string.
+    """
+    raw = str(value).encode("utf-8")
+    if len(raw) > 0xFFFF:
+        raise ProtocolError("string field is too long to be packed")
+    return struct.pack("<H", len(raw)) + raw
+
+
+def _unpack_str(data, offset):
+    """
+    Unpacks a string packed by _pack_str.
+
+    Args:
+        data (bytes): The message bytes.
+        offset (int): The offset of the length prefix.
+
+    Returns:
+        tuple: The string and the offset right after it.
+    """
+    (length,) = struct.unpack_from("<H", data, offset)
+    offset += 2
+    return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+
+def pack_board(board):
+    """
+    Packs a square board into one byte per tile.
+
+    Args:
+        board (numpy.ndarray): A square board of tile values, of any integer or object dtype.
+
+    Returns:
+        bytes: The packed board.
+    """
+    board_size = len(board)
+    if board_size > MAX_BOARD_SIZE:
+        raise ProtocolError(f"boards larger than {MAX_BOARD_SIZE}x{MAX_BOARD_SIZE} are not supported")
+    return np.asarray(board, dtype=BOARD_DTYPE).tobytes()
+
+
+def unpack_board(data, offset, board_size):
+    """
+    Unpacks a board packed by pack_board.
+
+    Args:
+        data (bytes): The message bytes.
+        offset (int): The offset of the first tile.
+        board_size (int): The size of the board.
+
+    Returns:
+        tuple: The board as an int numpy array and the offset right after it.
+    """
+    end = offset + board_size * board_size
+    board = np.frombuffer(data, dtype=BOARD_DTYPE, count=board_size * board_size, offset=offset)
+    return board.reshape((board_size, board_size)).astype(int), end
+
+
+def encode_task(task):
+    """
+    Encodes a task to be sent to the solver.
+
+    Args:
+        task (TilesSolverTask): The task to encode.
+
+    Returns:
+        bytes: The encoded task.
+    """
+    flags = (TASK_FLAG_PROFILE if task.profile else 0) | (TASK_FLAG_MOVE_TIME if task.move_time is not None else 0)
+    parts = [_HEADER.pack(MAGIC, PROTOCOL_VERSION, MSG_TASK),
+             _pack_str(task.algo_name),
+             _pack_str(task.board_id),
+             _BOARD_SIZE.pack(len(task.tiles_board)),
+             pack_board(task.tiles_board),
+             _TASK_FLAGS.pack(flags)]
+    if task.move_time is not None:
+        parts.append(_MOVE_TIME.pack(task.move_time))
+    return b"".join(parts)
+
+
+def encode_solution(solution_msg):
+    """
+    Encodes a solution to be sent back to the GUI.
+    The profile fields are only written for a profiled search.
+
+    Args:
+        solution_msg (TilesSolverSolution): The solution to encode.
+
+    Returns:
+        bytes: The encoded solution.
+    """
+    solution = solution_msg.solution
+    moves = b"" if solution is None else np.asarray(solution, dtype=BOARD_DTYPE).tobytes()
+    parts = [_HEADER.pack(MAGIC, PROTOCOL_VERSION, MSG_SOLUTION),
+             _pack_str(solution_msg.board_id),
+             _SOLUTION_INFO.pack(solution is not None, len(moves)),
+             moves]
+    if solution_msg.peak_memory is not None:
+        parts += [_PROFILE_INFO.pack(solution_msg.peak_memory), _pack_str(solution_msg.profile_path or "")]
+    return b"".join(parts)
+
+
+def encode_batch(batch_task):
+    """
+    Encodes the control message of a batch task. The boards themselves stay in shared memory.
+
+    Args:
+        batch_task (TilesSolverBatchTask): The batch task to encode.
+
+    Returns:
+        bytes: The encoded control message.
+    """
+    return b"".join([_HEADER.pack(MAGIC, PROTOCOL_VERSION, MSG_BATCH),
+                     _pack_str(batch_task.algo_name),
+                     _pack_str(batch_task.batch_id),
+                     _pack_str(batch_task.shm_name),
+                     _BATCH_INFO.pack(batch_task.board_size, batch_task.count)])
+
+
+def encode_hint_request(hint_request):
+    """
+    Encodes a hint request to be sent to the solver.
+
+    Args:
+        hint_request (TilesSolverHintRequest): The hint request to encode.
+
+    Returns:
+        bytes: The encoded hint request.
+    """
+    return b"".join([_HEADER.pack(MAGIC, PROTOCOL_VERSION, MSG_HINT_REQUEST),
+                     _pack_str(hint_request.board_id),
+                     _BOARD_SIZE.pack(len(hint_request.tiles_board)),
+                     pack_board(hint_request.tiles_board)])
+
+
+def encode_hint(hint):
+    """
+    Encodes a hint to be sent back to the GUI.
+
+    Args:
+        hint (TilesSolverHint): The hint to encode.
+
+    Returns:
+        bytes: The encoded hint.
+    """
+    return b"".join([_HEADER.pack(MAGIC, PROTOCOL_VERSION, MSG_HINT),
+                     _pack_str(hint.board_id),
+                     _HINT_INFO.pack(hint.move is not None, hint.move or 0,
+                                     -1 if hint.remaining is None else hint.remaining)])
+
+
+def encode_move(move_msg):
+    """
+    Encodes a move of a real-time search to be sent back to the GUI.
+
+    Args:
+        move_msg (TilesSolverMove): The move to encode.
+
+    Returns:
+        bytes: The encoded move.
+    """
+    return b"".join([_HEADER.pack(MAGIC, PROTOCOL_VERSION, MSG_MOVE),
+                     _pack_str(move_msg.board_id),
+                     _MOVE_INFO.pack(move_msg.move)])
+
+
+def decode_message(data):
+    """
+    Decodes a message produced by one of the encode functions.
+
+    Args:
+        data (bytes): The encoded message.
+
+    Returns:
+        TilesSolverTask, TilesSolverSolution, TilesSolverBatchTask, TilesSolverHintRequest, TilesSolverHint
+            or TilesSolverMove: The decoded message.
+
+    Raises:
+        ProtocolError: If the message is not a message of this protocol version, or is truncated or malformed.
+    """
+    try:
+        return _decode_message(data)
+    except ProtocolError:
+        raise
+    except (struct.error, ValueError) as error:
+        # a short buffer fails in struct or numpy, a cut string fails to decode
+        raise ProtocolError(f"truncated or malformed message: {error}") from error
+
+
+def _decode_message(data):
+    """ Decodes a message for decode_message, which turns the errors of a truncated message into ProtocolError. """
+    magic, version, msg_type = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ProtocolError("message does not start with the protocol magic")
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"unsupported protocol version {version}")
+    offset = _HEADER.size
+
+    if msg_type == MSG_TASK:
+        algo_name, offset = _unpack_str(data, offset)
+        board_id, offset = _unpack_str(data, offset)
+        (board_size,) = _BOARD_SIZE.unpack_from(data, offset)
+        board, offset = unpack_board(data, offset + _BOARD_SIZE.size, board_size)
+        # tasks encoded before the flags byte was added end with the board
+        (flags,) = _TASK_FLAGS.unpack_from(data, offset) if offset < len(data) else (0,)
+        move_time = None
+        if flags & TASK_FLAG_MOVE_TIME:
+            (move_time,) = _MOVE_TIME.unpack_from(data, offset + _TASK_FLAGS.size)
+        return TilesSolverTask(algo_name, board, board_id, profile=bool(flags & TASK_FLAG_PROFILE),
+                               move_time=move_time)
+
+    if msg_type == MSG_SOLUTION:
+        board_id, offset = _unpack_str(data, offset)
+        has_solution, moves_count = _SOLUTION_INFO.unpack_from(data, offset)
+        offset += _SOLUTION_INFO.size
+        solution = list(data[offset:offset + moves_count]) if has_solution else None
+        offset += moves_count
+        if offset == len(data):
+            return TilesSolverSolution(solution, board_id)
+        (peak_memory,) = _PROFILE_INFO.unpack_from(data, offset)
+        profile_path, _ = _unpack_str(data, offset + _PROFILE_INFO.size)
+        return TilesSolverSolution(solution, board_id, peak_memory, profile_path or None)
+
+    if msg_type == MSG_BATCH:
+        algo_name, offset = _unpack_str(data, offset)
+        batch_id, offset = _unpack_str(data, offset)
+        shm_name, offset = _unpack_str(data, offset)
+        board_size, count = _BATCH_INFO.unpack_from(data, offset)
+        return TilesSolverBatchTask(algo_name, shm_name, board_size, count, batch_id)
+
+    if msg_type == MSG_HINT_REQUEST:
+        board_id, offset = _unpack_str(data, offset)
+        (board_size,) = _BOARD_SIZE.unpack_from(data, offset)
+        board, _ = unpack_board(data, offset + _BOARD_SIZE.size, board_size)
+        return TilesSolverHintRequest(board, board_id)
+
+    if msg_type == MSG_HINT:
+        board_id, offset = _unpack_str(data, offset)
+        has_move, move, remaining = _HINT_INFO.unpack_from(data, offset)
+        return TilesSolverHint(move if has_move else None, None if remaining < 0 else remaining, board_id)
+
+    if msg_type == MSG_MOVE:
+        board_id, offset = _unpack_str(data, offset)
+        (move,) = _MOVE_INFO.unpack_from(data, offset)
+        return TilesSolverMove(move, board_id)
+
+    raise ProtocolError(f"unknown message type {msg_type}")
+
+
+def pack_frame(kind, request_id, payload=b""):
+    """
+    Wraps a payload in a stream frame.
+
+    Args:
+        kind (int): One of the FRAME_ constants.
+        request_id (int): The id the client gave the request.
+        payload (bytes): An encoded message, the utf-8 text of a FRAME_ERROR or nothing.
+
+    Returns:
+        bytes: The frame.
+    """
+    return FRAME_HEADER.pack(len(payload), kind, request_id) + payload
+
+
+def unpack_frame_header(header):
+    """
+    Reads the header of a stream frame.
+
+    Args:
+        header (bytes): The first FRAME_HEADER.size bytes of a frame.
+
+    Returns:
+        tuple: The payload length, the frame kind and the request id.
+    """
+    payload_length, kind, request_id = FRAME_HEADER.unpack(header)
+    if payload_length > MAX_FRAME_PAYLOAD:
+        raise ProtocolError(f"frame payload of {payload_length} bytes is too large")
+    return payload_length, kind, request_id
+
+
+class SharedBoardBatch:
+    """
+    A batch of packed boards that lives in a multiprocessing.shared_memory block.
+
+    The producer creates the batch, sends the control message from make_task through the queue,
+    and keeps the batch alive until every board has been answered, then calls release.
+    The solver attaches to the block by name, copies the boards out and closes its handle.
+
+    Attributes:
+        shm (multiprocessing.shared_memory.SharedMemory): The shared memory block.
+        board_size (int): The size of every board in the batch.
+        count (int): The number of boards in the batch.
+        boards (numpy.ndarray): A (count, board_size, board_size) uint8 view over the block.
+    """
+
+    def __init__(self, shm, board_size, count):
+        """
+        Initializes a SharedBoardBatch object. Use create or attach instead of calling this directly.
+
+        Args:
+            shm (multiprocessing.shared_memory.SharedMemory): The shared memory block.
+            board_size (int): The size of every board in the batch.
+            count (int): The number of boards in the batch.
+        """
+        self.shm = shm
+        self.board_size = board_size
+        self.count = count
+        self.boards = np.ndarray((count, board_size, board_size), dtype=BOARD_DTYPE, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, boards):
+        """
+        Creates a shared memory block and copies the boards into it.
+
+        Args:
+            boards (numpy.ndarray): A (count, board_size, board_size) array of boards.
+
+        Returns:
+            SharedBoardBatch: The new batch, owned by the caller.
+        """
+        boards = np.asarray(boards)
+        count, board_size = boards.shape[0], boards.shape[1]
+        if board_size > MAX_BOARD_SIZE:
+            raise ProtocolError(f"boards larger than {MAX_BOARD_SIZE}x{MAX_BOARD_SIZE} are not supported")
+        # a zero sized block is not allowed so always ask for at least one byte
+        shm = shared_memory.SharedMemory(create=True, size=max(1, boards.size))
+        batch = cls(shm, board_size, count)
+        batch.boards[:] = boards
+        return batch
+
+    @classmethod
+    def attach(cls, batch_task):
+        """
+        Attaches to the shared memory block described by a batch task.
+
+        Args:
+            batch_task (TilesSolverBatchTask): The decoded batch control message.
+
+        Returns:
+            SharedBoardBatch: A view over the existing batch.
+        """
+        shm = shared_memory.SharedMemory(name=batch_task.shm_name)
+        return cls(shm, batch_task.board_size, batch_task.count)
+
+    def make_task(self, algo_name, batch_id):
+        """
+        Creates the control message describing this batch.
+
+        Args:
+            algo_name (str): The name of the search algorithm to be used.
+            batch_id (str): The identifier of the batch.
+
+        Returns:
+            TilesSolverBatchTask: The control message.
+        """
+        return TilesSolverBatchTask(algo_name, self.shm.name, self.board_size, self.count, batch_id)
+
+    def copy_boards(self):
+        """
+        Copies the boards out of shared memory so the block can be closed.
+
+        Returns:
+            numpy.ndarray: A (count, board_size, board_size) int array of boards.
+        """
+        return self.boards.astype(int)
+
+    def close(self):
+        """ Closes this process's handle to the block. """
+        # drop the numpy view first, the block cannot be closed while it is exported
+        self.boards = None
+        self.shm.close()
+
+    def release(self):
+        """ Closes and frees the block. Only the producer that created the batch should call this. """
+        self.close()
+        self.shm.unlink()
+
+
+def encode_cluster_job(mode, algo_name, bound=NO_BOUND, board=None):
+    """
+    Encodes the job a cluster coordinator starts on its workers.
+
+    Args:
+        mode (int): JOB_IDA or JOB_BATCH.
+        algo_name (str): The algorithm the boards of a batch job are solved with.
+        bound (int): The f bound of an IDA* job.
+        board (numpy.ndarray): The board of an IDA* job, the prefixes of its units start from it.
+
+    Returns:
+        bytes: The payload of a FRAME_JOB frame.
+    """
+    board_size = 0 if board is None else len(board)
+    parts = [_JOB_INFO.pack(mode, bound, board_size), _pack_str(algo_name)]
+    if board is not None:
+        parts.append(pack_board(board))
+    return b"".join(parts)
+
+
+def decode_cluster_job(data):
+    """
+    Decodes a job encoded by encode_cluster_job.
+
+    Args:
+        data (bytes): The payload of a FRAME_JOB frame.
+
+    Returns:
+        tuple: The mode, the algorithm name, the bound and the board (None for a batch job).
+    """
+    mode, bound, board_size = _JOB_INFO.unpack_from(data, 0)
+    algo_name, offset = _unpack_str(data, _JOB_INFO.size)
+    board = unpack_board(data, offset, board_size)[0] if board_size else None
+    return mode, algo_name, bound, board
+
+
+def encode_units(units, thief=None, created=0):
+    """
+    Encodes units of work. A unit of an IDA* job is a move prefix, of a batch job a packed board.
+
+    Args:
+        units (list of tuple): The id and the data (bytes) of every unit.
+        thief (int): The worker the units are given to, for the payload of a FRAME_GIVE frame.
+        created (int): The number of the units that were split from a running search, counted as new work.
+
+    Returns:
+        bytes: The payload of a FRAME_UNITS frame, or of a FRAME_GIVE frame if thief is given.
+    """
+    parts = [] if thief is None else [_GIVE_INFO.pack(thief, created)]
+    parts.append(_UNITS_COUNT.pack(len(units)))
+    for unit_id, data in units:
+        parts += [_UNIT_INFO.pack(unit_id, len(data)), bytes(data)]
+    return b"".join(parts)
+
+
+def decode_units(data, give=False):
+    """
+    Decodes units encoded by encode_units.
+
+    Args:
+        data (bytes): The payload of a FRAME_UNITS or FRAME_GIVE frame.
+        give (bool): True for the payload of a FRAME_GIVE frame.
+
+    Returns:
+        tuple: The units, and for a give frame the thief and the number of created units before them.
+    """
+    offset = 0
+    if give:
+        thief, created = _GIVE_INFO.unpack_from(data, 0)
+        offset = _GIVE_INFO.size
+    (count,) = _UNITS_COUNT.unpack_from(data, offset)
+    offset += _UNITS_COUNT.size
+    units = []
+    for _ in range(count):
+        unit_id, length = _UNIT_INFO.unpack_from(data, offset)
+        offset += _UNIT_INFO.size
+        units.append((unit_id, bytes(data[offset:offset + length])))
+        offset += length
+    return (thief, created, units) if give else units
+
+
+def encode_steal(thief):
+    """
+    Encodes a steal request.
+
+    Args:
+        thief (int): The idle worker the units should be given to.
+
+    Returns:
+        bytes: The payload of a FRAME_STEAL frame.
+    """
+    return _STEAL_INFO.pack(thief)
+
+
+def decode_steal(data):
+    """
+    Decodes a steal request encoded by encode_steal.
+
+    Args:
+        data (bytes): The payload of a FRAME_STEAL frame.
+
+    Returns:
+        int: The idle worker the units should be given to.
+    """
+    return _STEAL_INFO.unpack_from(data, 0)[0]
+
+
+def encode_unit_result(unit_id, path, checks, seconds, next_bound=NO_BOUND):
+    """
+    Encodes the result of one unit.
+
+    Args:
+        unit_id (int): The id of the unit.
+        path (list of int): The values of the moved tiles of the solution found, from the board of the job
+            (IDA*) or of the unit (batch), None if there is none.
+        checks (int): The number of states the unit checked.
+        seconds (float): The time the unit took.
+        next_bound (int): The smallest f above the bound of an IDA* job the unit saw.
+
+    Returns:
+        bytes: The payload of a FRAME_UNIT_DONE frame.
+    """
+    moves = b"" if path is None else np.asarray(path, dtype=BOARD_DTYPE).tobytes()
+    info = _UNIT_RESULT_INFO.pack(unit_id, path is not None, min(next_bound, NO_BOUND), checks, seconds, len(moves))
+    return info + moves
+
+
+def decode_unit_result(data):
+    """
+    Decodes the result of a unit encoded by encode_unit_result.
+
+    Args:
+        data (bytes): The payload of a FRAME_UNIT_DONE frame.
+
+    Returns:
+        tuple: The unit id, the path (None if there is none), the number of checks, the seconds
+            and the next bound.
+    """
+    unit_id, has_path, next_bound, checks, seconds, length = _UNIT_RESULT_INFO.unpack_from(data, 0)
+    offset = _UNIT_RESULT_INFO.size
+    path = list(data[offset:offset + length]) if has_path else None
+    return unit_id, path, checks, seconds, next_bound
@@ -0,0 +1,420 @@
+"""
+Provides a local asyncio solver server that several front-ends can share.
+
+The server listens on a Unix domain socket or on a localhost TCP port and keeps one warm pool of solver
+processes (started through TilesSolverProcess so their heuristic tables are loaded once).
+Clients pipeline solve and cancel frames (see TilesSolverProtocol) on one connection and the server
+answers every request with a result, cancelled or error frame as soon as it is ready,
+in whatever order the requests finish.
+
+Usage:
+    python -m Solver.TilesSolverServer --unix /tmp/tiles_solver.sock
+    python -m Solver.TilesSolverServer --port 8765 --workers 4
+    python -m Solver.TilesSolverServer --port 8765 --checkpoint-dir /tmp/tiles_checkpoints
+    python -m Solver.TilesSolverServer --port 8765 --learned-file /tmp/tiles_learned.npz
+
+Every solver process learns the real-time search's heuristic into a file of its own, named after the learned file
+and the process's number, so the learning persists across requests and server restarts without locking.
+
+Classes:
+    - SlotEvent: An interrupt event backed by one byte of shared memory.
+    - TilesSolverServer: The asyncio solver server.
+
+Functions:
+    - worker_learned_path: Returns the file a worker process keeps its learned heuristic in.
+"""
+
+import argparse
+import asyncio
+import functools
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from Solver.TilesSolver import ALGO_MAP, CHECKPOINT_ALGOS
+from Solver.HintService import HintService
+from Solver.RealTimeSearch import REALTIME_ALGO, DEFAULT_LEARNED_PATH, LearnedHeuristic
+from Solver.SearchCheckpoint import CheckpointStore
+from Solver.TilesSolverMsgs import TilesSolverTask, TilesSolverSolution, TilesSolverHintRequest
+from Solver.TilesSolverProcess import get_solver_context, preload_solver_tables
+from Solver.TilesSolverProtocol import (decode_message, encode_solution, encode_hint, pack_frame,
+                                        unpack_frame_header, FRAME_HEADER, FRAME_SOLVE, FRAME_CANCEL, FRAME_RESULT,
+                                        FRAME_CANCELLED, FRAME_ERROR, ProtocolError)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# the number of requests that can be running or waiting in the pool at the same time
+DEFAULT_SLOTS = 1024
+
+# the cancel flags, the checkpoints and the learned heuristic of the worker process, set by _init_worker
+_cancel_flags = None
+_checkpoints = None
+_learned = None
+
+
+class SlotEvent:
+    """
+    An interrupt event backed by one byte of a shared array, so checking it in the search loop
+    costs a memory read and not a round trip to a manager process.
+
+    Attributes:
+        flags (multiprocessing.RawArray): The cancel flags shared by the server and its workers.
+        slot (int): The index of this event's flag.
+    """
+
+    def __init__(self, flags, slot):
+        """
+        Initializes a SlotEvent object.
+
+        Args:
+            flags (multiprocessing.RawArray): The cancel flags shared by the server and its workers.
+            slot (int): The index of this event's flag.
+        """
+        self.flags = flags
+        self.slot = slot
+
+    def is_set(self):
+        """
+        Checks if the event is set.
+
+        Returns:
+            bool: True if the request of this slot was cancelled.
+        """
+        return self.flags[self.slot] != 0
+
+    def set(self):
+        """ Sets the event. """
+        self.flags[self.slot] = 1
+
+    def clear(self):
+        """ Clears the event. """
+        self.flags[self.slot] = 0
+
+
+def worker_learned_path(learned_file, index):
+    """
+    Returns the file a worker process keeps its learned heuristic in.
+
+    Args:
+        learned_file (str): The learned file of the server.
+        index (int): The number of the worker process.
+
+    Returns:
+        str: The file of the worker.
+    """
+    root, extension = os.path.splitext(learned_file)
+    return f"{root}.worker{index}{extension}"
+
+
+def _init_worker(cancel_flags, checkpoint_dir, learned_file, worker_count):
+    """
+    Initializes a worker process of the pool.
+
+    Args:
+        cancel_flags (multiprocessing.RawArray): The cancel flags shared by the server and its workers.
+        checkpoint_dir (str): The directory the workers share the checkpoints of cancelled searches in,
+            None to keep them in the memory of the worker that ran the search.
+        learned_file (str): The file the workers' learned heuristic files are named after.
+        worker_count (multiprocessing.Value): The number of workers started, it numbers this one.
+    """
+    global _cancel_flags, _checkpoints, _learned
+    _cancel_flags = cancel_flags
+    _checkpoints = CheckpointStore(checkpoint_dir)
+    with worker_count.get_lock():
+        index = worker_count.value
+        worker_count.value += 1
+    _learned = LearnedHeuristic(worker_learned_path(learned_file, index))
+    preload_solver_tables()
+
+
+def _solve_in_worker(task, slot):
+    """
+    Solves a board inside a worker process, under the profiler if the task asks for it.
+
+    Args:
+        task (TilesSolverTask): The task to solve.
+        slot (int): The cancel flag of the request.
+
+    Returns:
+        tuple: The TilesSolverSolution and True if the search was cancelled.
+    """
+    interrupt_event = SlotEvent(_cancel_flags, slot)
+    algo = ALGO_MAP.get(task.algo_name)
+    checkpoint = None
+    if task.algo_name in CHECKPOINT_ALGOS:
+        checkpoint = _checkpoints.checkpoint(task.algo_name, task.tiles_board)
+        algo = functools.partial(algo, checkpoint=checkpoint)
+    elif task.algo_name == REALTIME_ALGO:
+        # a worker learns into its own heuristic, the moves are only sent back with the solution
+        algo = functools.partial(algo, learned=_learned)
+        if task.move_time is not None:
+            algo = functools.partial(algo, move_time=task.move_time)
+    report = None
+    if task.profile:
+        # imported only when asked for, so cProfile, pstats and tracemalloc stay out of unprofiled workers
+        from Solver.SolverProfiler import profiled_solve
+        (solution, _), report = profiled_solve(algo, task.tiles_board, interrupt_event, task.board_id,
+                                               task.algo_name)
+    else:
+        solution, _ = algo(task.tiles_board, interrupt_event)
+    cancelled = interrupt_event.is_set()
+    if checkpoint is not None and not cancelled:
+        checkpoint.clear()
+    if task.algo_name == REALTIME_ALGO:
+        # what was learned is kept even when the search was cancelled
+        _learned.save()
+
+    if report is None:
+        return TilesSolverSolution(solution, task.board_id), cancelled
+    return TilesSolverSolution(solution, task.board_id, report.peak_memory, report.report_path), cancelled
+
+
+class TilesSolverServer:
+    """
+    The asyncio solver server.
+
+    Attributes:
+        workers (int): The number of solver processes.
+        slots (int): The number of requests that can be running or waiting in the pool at once.
+        cancel_flags (multiprocessing.RawArray): One cancel flag per slot, shared with the workers.
+        free_slots (list): The slots not used by any request.
+        pool (concurrent.futures.ProcessPoolExecutor): The solver processes.
+        hint_service (HintService): Answers hint requests in the server process, they take milliseconds at most.
+        server (asyncio.AbstractServer): The listening server once started.
+    """
+
+    def __init__(self, workers=None, slots=DEFAULT_SLOTS, start_method=None, checkpoint_dir=None,
+                 learned_file=DEFAULT_LEARNED_PATH):
+        """
+        Initializes a TilesSolverServer object.
+
+        Args:
+            workers (int): The number of solver processes, defaults to the number of CPUs.
+            slots (int): The number of requests that can be running or waiting in the pool at once.
+            start_method (str): The start method of the solver processes, see get_solver_context.
+            checkpoint_dir (str): If given, cancelled searches are saved there, so any worker resumes them,
+                also after the server restarted.
+            learned_file (str): The file the workers' learned heuristic files are named after, see worker_learned_path.
+        """
+        context = get_solver_context(start_method)
+        self.workers = workers or os.cpu_count() or 1
+        self.slots = slots
+        self.cancel_flags = context.RawArray("b", slots)
+        self.free_slots = list(range(slots))
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                        initargs=(self.cancel_flags, checkpoint_dir, learned_file,
+                                                  context.Value("i", 0)))
+        self.hint_service = HintService()
+        self.server = None
+
+    async def start_unix(self, path):
+        """
+        Starts listening on a Unix domain socket.
+
+        Args:
+            path (str): The path of the socket, an existing socket file is replaced.
+        """
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = await asyncio.start_unix_server(self.handle_connection, path=path)
+
+    async def start_tcp(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Starts listening on a TCP port.
+
+        Args:
+            host (str): The address to listen on, keep it a local address.
+            port (int): The port to listen on, 0 picks a free port.
+
+        Returns:
+            int: The port the server listens on.
+        """
+        self.server = await asyncio.start_server(self.handle_connection, host=host, port=port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """ Serves clients until the server is closed. """
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        """ Stops listening, cancels every running request and shuts the solver processes down. """
+        if self.server is not None:
+            self.server.close()
+        for slot in range(self.slots):
+            self.cancel_flags[slot] = 1
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Serves one client connection until it is closed.
+
+        Args:
+            reader (asyncio.StreamReader): The connection's reader.
+            writer (asyncio.StreamWriter): The connection's writer.
+        """
+        # request id -> (slot, pool future) of the requests of this connection that are not answered yet
+        in_flight = {}
+        write_lock = asyncio.Lock()
+
+        async def send(kind, request_id, payload=b""):
+            async with write_lock:
+                writer.write(pack_frame(kind, request_id, payload))
+                await writer.drain()
+
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                payload_length, kind, request_id = unpack_frame_header(header)
+                payload = await reader.readexactly(payload_length)
+
+                if kind == FRAME_SOLVE:
+                    self.submit(request_id, payload, in_flight, send)
+                elif kind == FRAME_CANCEL:
+                    self.cancel(request_id, in_flight)
+                else:
+                    await send(FRAME_ERROR, request_id, f"unexpected frame kind {kind}".encode("utf-8"))
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # the server is shutting down
+            pass
+        except ProtocolError as error:
+            await send(FRAME_ERROR, 0, str(error).encode("utf-8"))
+        finally:
+            # the client is gone so nobody wants its results anymore
+            for request_id in list(in_flight):
+                self.cancel(request_id, in_flight)
+            writer.close()
+
+    def submit(self, request_id, payload, in_flight, send):
+        """
+        Starts solving a request.
+
+        Args:
+            request_id (int): The id the client gave the request.
+            payload (bytes): The encoded TilesSolverTask or TilesSolverHintRequest.
+            in_flight (dict): The unanswered requests of the connection.
+            send (function): Sends a frame to the connection.
+        """
+        try:
+            task = decode_message(payload)
+        except ProtocolError as error:
+            # only this request is bad, the frame boundaries are intact so the connection is kept
+            asyncio.ensure_future(send(FRAME_ERROR, request_id, str(error).encode("utf-8")))
+            return
+        if isinstance(task, TilesSolverHintRequest):
+            asyncio.ensure_future(send(FRAME_RESULT, request_id, encode_hint(self.hint_service.hint(task))))
+            return
+        if not isinstance(task, TilesSolverTask) or task.algo_name not in ALGO_MAP:
+            asyncio.ensure_future(send(FRAME_ERROR, request_id, b"expected a task for a known algorithm"))
+            return
+        if request_id in in_flight or not self.free_slots:
+            asyncio.ensure_future(send(FRAME_ERROR, request_id, b"request id in use or server busy"))
+            return
+
+        slot = self.free_slots.pop()
+        self.cancel_flags[slot] = 0
+        future = self.pool.submit(_solve_in_worker, task, slot)
+        in_flight[request_id] = (slot, future)
+        asyncio.ensure_future(self.answer(request_id, slot, asyncio.wrap_future(future), in_flight, send))
+
+    async def answer(self, request_id, slot, future, in_flight, send):
+        """
+        Waits for a request to be solved and sends its result.
+
+        Args:
+            request_id (int): The id the client gave the request.
+            slot (int): The cancel flag of the request.
+            future (asyncio.Future): The future of the solve in the pool.
+            in_flight (dict): The unanswered requests of the connection.
+            send (function): Sends a frame to the connection.
+        """
+        kind, payload = FRAME_CANCELLED, b""
+        try:
+            try:
+                solution, cancelled = await future
+                if not cancelled:
+                    kind, payload = FRAME_RESULT, encode_solution(solution)
+            except asyncio.CancelledError:
+                # cancelled before a worker picked it up
+                pass
+            except Exception as error:
+                kind, payload = FRAME_ERROR, str(error).encode("utf-8")
+            await send(kind, request_id, payload)
+        except ConnectionError:
+            # the client is gone
+            pass
+        finally:
+            in_flight.pop(request_id, None)
+            self.free_slots.append(slot)
+
+    def cancel(self, request_id, in_flight):
+        """
+        Cancels a request whether it is waiting for a worker or already running.
+        The request is still answered, with a cancelled frame.
+
+        Args:
+            request_id (int): The id the client gave the request.
+            in_flight (dict): The unanswered requests of the connection.
+        """
+        entry = in_flight.get(request_id)
+        if entry is not None:
+            slot, future = entry
+            # a waiting request leaves the pool's queue, a running search sees the flag on its next check of
+            # the interrupt event and keeps its slot until it returns
+            future.cancel()
+            self.cancel_flags[slot] = 1
+
+
+async def _run(args):
+    """
+    Runs the server until it is interrupted or terminated.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+    """
+    server = TilesSolverServer(args.workers, checkpoint_dir=args.checkpoint_dir, learned_file=args.learned_file)
+    try:
+        if args.unix:
+            await server.start_unix(args.unix)
+            print(f"Tiles solver listening on {args.unix}", flush=True)
+        else:
+            port = await server.start_tcp(args.host, args.port)
+            print(f"Tiles solver listening on {args.host}:{port}", flush=True)
+        # stop serving on SIGTERM too, so the finally shuts the solver processes down instead of leaving them behind
+        serving = asyncio.ensure_future(server.serve_forever())
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, serving.cancel)
+        try:
+            await serving
+        except asyncio.CancelledError:
+            pass
+    finally:
+        server.close()
+
+
+def main(argv=None):
+    """
+    Runs the server from the command line.
+
+    Args:
+        argv (list of str): The arguments, defaults to sys.argv.
+    """
+    parser = argparse.ArgumentParser(description="A local sliding tiles solver server.")
+    parser.add_argument("--unix", help="Listen on this Unix domain socket path instead of TCP")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="The TCP address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="The TCP port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="The number of solver processes")
+    parser.add_argument("--checkpoint-dir", default=None,
+                        help="Save cancelled searches to this directory and resume them when asked again")
+    parser.add_argument("--learned-file", default=DEFAULT_LEARNED_PATH,
+                        help="The file every worker's learned real-time heuristic file is named after")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
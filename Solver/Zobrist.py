@@ -0,0 +1,174 @@
+"""
+Provides Zobrist hashing of boards and a bounded transposition table for the searches.
+
+A board's hash is the XOR of one random 64-bit key per (tile, cell) pair of its non-empty tiles.
+The empty tile is left out, its cell is the only one no key covers, so a move changes the hash
+with just two XORs: the moved tile's key on the cell it left and its key on the cell it entered.
+Keys come from a fixed seed, so a board has the same hash in every process.
+
+Functions:
+    - zobrist_keys: Returns the Zobrist keys of a board size.
+    - zobrist_key_array: Returns the Zobrist keys of a board size as a NumPy array, for batches of boards.
+    - zobrist_hash: Computes the hash of a board.
+    - move_key: Returns the value a move XORs into the hash.
+
+Classes:
+    - TranspositionTable: A fixed-size table of searched states.
+"""
+
+import numpy as np
+
+# the seed of the keys, fixed so hashes agree across processes and runs
+ZOBRIST_SEED = 0x5A0B
+# the number of entries of a transposition table, a power of two
+DEFAULT_TABLE_SIZE = 1 << 18
+
+_KEYS = {}
+_KEY_ARRAYS = {}
+
+
+def zobrist_keys(board_size):
+    """
+    Returns the Zobrist keys of a board size, drawn on first use.
+
+    Args:
+        board_size (int): The size of the board.
+
+    Returns:
+        list of int: The key of tile value v on cell c is at index v * cells + c, the keys of the empty tile are 0.
+    """
+    keys = _KEYS.get(board_size)
+    if keys is not None:
+        return keys
+
+    cells = board_size * board_size
+    rng = np.random.default_rng([ZOBRIST_SEED, board_size])
+    table = rng.integers(0, 2 ** 64, size=(cells, cells), dtype=np.uint64)
+    table[0, :] = 0
+    table = table.ravel()
+    table.setflags(write=False)
+    keys = [int(key) for key in table]
+    _KEYS[board_size] = keys
+    _KEY_ARRAYS[board_size] = table
+    return keys
+
+
+def zobrist_key_array(board_size):
+    """
+    Returns the Zobrist keys of a board size as a NumPy array, so the hashes of many moves can be updated at once.
+
+    Args:
+        board_size (int): The size of the board.
+
+    Returns:
+        numpy.ndarray: A read only uint64 array laid out like the list returned by zobrist_keys.
+    """
+    zobrist_keys(board_size)
+    return _KEY_ARRAYS[board_size]
+
+
+def zobrist_hash(board):
+    """
+    Computes the hash of a board from scratch.
+
+    Args:
+        board (numpy.ndarray or list): The board, either square or flattened row by row.
+
+    Returns:
+        int: The 64-bit hash.
+    """
+    values = [int(value) for value in np.asarray(board).ravel()]
+    cells = len(values)
+    keys = zobrist_keys(int(round(cells ** 0.5)))
+    board_hash = 0
+    for cell, value in enumerate(values):
+        board_hash ^= keys[value * cells + cell]
+    return board_hash
+
+
+def move_key(keys, cells, tile, zero_cell, tile_cell):
+    """
+    Returns the value a move XORs into the hash, XORing it again undoes the move.
+
+    Args:
+        keys (list of int): The keys returned by zobrist_keys.
+        cells (int): The number of cells of the board.
+        tile (int): The value of the moved tile.
+        zero_cell (int): The cell of the empty tile before the move, where the tile moves to.
+        tile_cell (int): The cell the tile moves from.
+
+    Returns:
+        int: The XOR of the tile's keys on both cells.
+    """
+    return keys[tile * cells + zero_cell] ^ keys[tile * cells + tile_cell]
+
+
+class TranspositionTable:
+    """
+    A fixed-size table of the states a depth-bounded search already expanded.
+
+    Every entry holds a state's hash, the number of moves (g) it was reached with and the bound of the iteration
+    it was stored in. The entry of a hash lives in a single slot chosen by the hash's low bits.
+    A slot is replaced when it holds an entry of an older iteration or one that was reached with at least as many
+    moves, so the table keeps the states closest to the root, which head the largest subtrees.
+    Memory stays at size entries however many states are searched, a lost entry only costs a re-expansion.
+
+    Attributes:
+        size (int): The number of entries.
+        hashes (list of int): The hash of every slot's state.
+        costs (list of int): The g of every slot's state.
+        bounds (list of int): The bound every slot's entry was stored under, -1 for an empty slot.
+        hits (int): The number of states cut off.
+        probes (int): The number of states looked up.
+    """
+
+    def __init__(self, size=DEFAULT_TABLE_SIZE):
+        """
+        Initializes a TranspositionTable object.
+
+        Args:
+            size (int): The number of entries, rounded up to a power of two.
+        """
+        self.size = 1 << max(0, int(size) - 1).bit_length()
+        self._mask = self.size - 1
+        self.hashes = [0] * self.size
+        self.costs = [0] * self.size
+        self.bounds = [-1] * self.size
+        self.hits = 0
+        self.probes = 0
+
+    def visit(self, state_hash, cost, bound):
+        """
+        Records a state about to be expanded, or tells that it needs no expansion.
+        A state needs no expansion when the same iteration already expanded it with no more moves:
+        everything below it was searched then with at least as much depth left.
+
+        Args:
+            state_hash (int): The state's hash.
+            cost (int): The number of moves the state was reached with.
+            bound (int): The bound of the running iteration.
+
+        Returns:
+            bool: True if the state can be cut off.
+        """
+        self.probes += 1
+        slot = state_hash & self._mask
+        if self.bounds[slot] == bound:
+            if self.hashes[slot] == state_hash:
+                if self.costs[slot] <= cost:
+                    self.hits += 1
+                    return True
+            elif self.costs[slot] < cost:
+                # keep the entry closer to the root
+                return False
+
+        self.hashes[slot] = state_hash
+        self.costs[slot] = cost
+        self.bounds[slot] = bound
+        return False
+
+    def clear(self):
+        """ Empties the table. """
+        self.bounds = [-1] * self.size
+        self.hits = 0
+        self.probes = 0
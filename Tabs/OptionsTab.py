@@ -48,6 +48,7 @@ class OptionsTab(Tab):
         selected_algorithm (tk.StringVar): The selected search algorithm.
         theme_var (tk.StringVar): The selected GUI theme.
         size_var (tk.IntVar): The selected size for the board.
+        move_time_var (tk.IntVar): The time the real-time opponent thinks about every move, in milliseconds.
         options (dict): Dictionary containing configurable options.
         set_theme (function): Function for setting the GUI theme.
         pad_y (int): Vertical padding between widgets.
@@ -67,7 +68,9 @@ class OptionsTab(Tab):
         self.selected_algorithm = tk.StringVar(value="BFS")
         self.theme_var = tk.StringVar(value=theme_name)
         self.size_var = tk.IntVar(value=3)
-        self.options = {"algo": self.selected_algorithm, "theme": self.theme_var, "size": self.size_var}
+        self.move_time_var = tk.IntVar(value=100)
+        self.options = {"algo": self.selected_algorithm, "theme": self.theme_var, "size": self.size_var,
+                        "move_time": self.move_time_var}
         self.set_theme = set_theme
         self.pad_y = 24
         self.pad_x = 24
@@ -96,6 +99,12 @@ class OptionsTab(Tab):
         size_spinbox = ttb.Spinbox(self, from_=2, to=10, textvariable=self.size_var, width=5, font=("Helvetica", 24))
         size_spinbox.grid(row=1, column=2, sticky="w", pady=self.pad_y, padx=self.pad_x)
 
+        move_time_label = ttb.Label(self, text="Move time (ms):", font=("Helvetica", 24))
+        move_time_label.grid(row=2, column=2, sticky="w", pady=self.pad_y)
+        move_time_spinbox = ttb.Spinbox(self, from_=10, to=2000, increment=10, textvariable=self.move_time_var,
+                                        width=5, font=("Helvetica", 24))
+        move_time_spinbox.grid(row=3, column=2, sticky="w", pady=self.pad_y, padx=self.pad_x)
+
         theme_label = ttb.Label(self, text="Theme:", font=("Helvetica", 24))
         theme_label.grid(row=0, column=1, sticky="w", pady=self.pad_y, padx=self.pad_x)
 
@@ -10,6 +10,7 @@ import ttkbootstrap as ttb
 from Tabs.GameTab import GameTab
 from Tabs.OptionsTab import OptionsTab
 import queue
+from Solver.TilesSolverProtocol import decode_message
 
 
 class Window(ttb.Window):
@@ -17,7 +18,7 @@ class Window(ttb.Window):
     Window class represents the main application window.
 
     Attributes:
-    - solver_to_gui_queue: A queue for messages from the solver process to the GUI.
+    - solver_to_gui_queue: A SolverChannel for messages from the solver process to the GUI.
     - gui_to_solver_queue: A queue for messages from the GUI to the solver process.
     - title: A string representing the title of the window.
     - theme_name: A string representing a ttkbootstrap theme for the GUI.
@@ -33,7 +34,7 @@ class Window(ttb.Window):
 
         Args:
         - gui_to_solver_queue: A queue for messages from the GUI to the solver process.
-        - solver_to_gui_queue: A queue for messages from the solver process to the GUI.
+        - solver_to_gui_queue: A SolverChannel for messages from the solver process to the GUI.
         - process_interrupt_event: An event to interrupt the solver process.
         - title: A string representing the title of the window.
         - theme_name: A string representing a ttkbootstrap theme for the GUI.
@@ -93,16 +94,34 @@ class Window(ttb.Window):
         """
         self.style.theme_use(theme_name)
 
+    def watch_solver_channel(self):
+        """
+        Registers the solver channel's file descriptor with Tk so that processIncoming runs
+        as soon as a message arrives and the GUI stays idle otherwise.
+
+        Returns:
+        - bool: True if the channel is watched and False if Tk cannot watch file descriptors on this platform,
+          in which case the caller must poll processIncoming.
+        """
+        try:
+            self.tk.createfilehandler(self.solver_to_gui_queue.fileno(), tk.READABLE,
+                                      lambda fd, mask: self.processIncoming())
+        except (AttributeError, tk.TclError):
+            # Tk on Windows has no file handlers
+            return False
+
+        return True
+
     def processIncoming(self):
         """
         Handles messages from the solver process.
 
-        This method processes all messages currently in the solver_to_GUI queue,
+        This method processes all messages currently in the solver_to_GUI channel,
         updating the game tab accordingly.
         """
-        while self.solver_to_gui_queue.qsize():
+        while self.solver_to_gui_queue.ready():
             try:
-                msg = self.solver_to_gui_queue.get_nowait()
+                msg = decode_message(self.solver_to_gui_queue.get_nowait())
                 self.game_tab.process_incoming(msg)
             except queue.Empty:
                 # Handle empty queue